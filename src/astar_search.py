@@ -15,11 +15,25 @@ Reference: Russell & Norvig, Chapter 3 - Solving Problems by Searching
 """
 
 import heapq
-from typing import Dict, List, Tuple, Optional, Set
+import mmap
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Set, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; matrix results fall back to lists
+    np = None
+
 
 @dataclass
 class Location:
@@ -63,11 +77,73 @@ class SearchNode:
         return self.f_score - self.g_score
 
 
+@dataclass
+class AnytimeSolution:
+    """
+    One improvement reported by AStarSearch.search_anytime().
+    
+    cost <= bound * optimal cost, as long as the heuristic is admissible.
+    """
+    path: List[str]
+    cost: float
+    epsilon: float    # heuristic inflation used for this pass
+    bound: float      # proven suboptimality bound
+    elapsed: float    # seconds since the search started
+
+
 class HeuristicType(Enum):
     """Different heuristic functions for A*."""
     MANHATTAN = "manhattan"
     EUCLIDEAN = "euclidean"
     COMPASSION = "compassion"  # Custom heuristic considering human factors
+    LANDMARK = "landmark"      # ALT: triangle-inequality bound from landmarks
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over 2D points.
+    
+    Points are bucketed into square cells of cell_size, so a radius query
+    only looks at the few cells the query circle overlaps instead of every
+    point on the map.
+    """
+    
+    def __init__(self, points: Iterable[Tuple[object, float, float]], cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Tuple[object, float, float]]] = {}
+        for key, x, y in points:
+            cell = (int(x // cell_size), int(y // cell_size))
+            self.cells.setdefault(cell, []).append((key, x, y))
+    
+    def within(self, x: float, y: float, radius: float) -> List[object]:
+        """Keys of all points strictly closer than radius to (x, y)."""
+        size = self.cell_size
+        reach = int(radius // size) + 1
+        cx, cy = int(x // size), int(y // size)
+        limit = radius * radius
+        found = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for key, px, py in self.cells.get((i, j), ()):
+                    if (px - x) ** 2 + (py - y) ** 2 < limit:
+                        found.append(key)
+        return found
+
+
+def _compassion_factors(nodes: GridIndex, residents: Iterable[Tuple[float, float, int]],
+                        radius: float) -> Dict[object, float]:
+    """
+    Compassion factor for every node near an unvisited resident.
+    
+    Mirrors CommunityMap.compassion_heuristic: each resident within radius
+    lowers the factor by 0.1 * min(days, 7) / 7, floored at 0.5. Nodes not
+    in the result have factor 1.0.
+    """
+    factors: Dict[object, float] = {}
+    for x, y, days in residents:
+        for key in nodes.within(x, y, radius):
+            factors[key] = factors.get(key, 1.0) - 0.1 * min(days, 7) / 7
+    return {key: max(factor, 0.5) for key, factor in factors.items()}
 
 
 class CommunityMap:
@@ -81,11 +157,26 @@ class CommunityMap:
     - Sometimes the "suboptimal" path saves a life (Mrs. Garcia story)
     """
     
+    COMPASSION_RADIUS = 3  # residents closer than this pull the route toward them
+    DAY_MINUTES = 24 * 60  # time profiles repeat daily
+    
     def __init__(self, width: int = 10, height: int = 10):
         self.width = width
         self.height = height
         self.locations: Dict[str, Location] = {}
         self.edges: Dict[str, List[Tuple[str, float]]] = {}  # adjacency list
+        self._edge_costs: Dict[Tuple[str, str], float] = {}  # (from, to) -> cheapest cost
+        self._compact: Optional['CompactGraph'] = None
+        self.version = 0  # bumped on every edge or location change
+        self._edge_listeners: List[Callable[[str, str, Optional[float], Optional[float]], None]] = []
+        self._location_index: Optional[GridIndex] = None
+        self._resident_index: Optional[GridIndex] = None
+        # Time-dependent costs: edge -> index into _profiles, where each
+        # profile is (breakpoints in minutes after midnight, cost factors).
+        # Edges sharing a traffic pattern share one profile.
+        self.edge_profiles: Dict[Tuple[str, str], int] = {}
+        self._profiles: List[Tuple[array, array]] = []
+        self._profile_ids: Dict[Tuple[Tuple[int, ...], Tuple[float, ...]], int] = {}
         self._initialize_community()
     
     def _initialize_community(self):
@@ -128,11 +219,176 @@ class CommunityMap:
         
         self.edges[loc1_id].append((loc2_id, cost))
         self.edges[loc2_id].append((loc1_id, cost))
+        for key in ((loc1_id, loc2_id), (loc2_id, loc1_id)):
+            self._edge_costs[key] = min(cost, self._edge_costs.get(key, cost))
+        self._edge_changed(loc1_id, loc2_id, None, cost)
+    
+    def edge_cost(self, loc1_id: str, loc2_id: str) -> Optional[float]:
+        """Cost of the edge loc1 -> loc2 (cheapest if repeated), or None."""
+        return self._edge_costs.get((loc1_id, loc2_id))
+    
+    def update_edge_cost(self, loc1_id: str, loc2_id: str, cost: float):
+        """Change the travel cost of an existing edge (both directions)."""
+        old_cost = self.edge_cost(loc1_id, loc2_id)
+        if old_cost is None:
+            raise KeyError(f"No edge between {loc1_id} and {loc2_id}")
+        for a, b in ((loc1_id, loc2_id), (loc2_id, loc1_id)):
+            self.edges[a] = [(n, cost if n == b else c) for n, c in self.edges[a]]
+            self._edge_costs[(a, b)] = cost
+        self._edge_changed(loc1_id, loc2_id, old_cost, cost)
+    
+    def remove_edge(self, loc1_id: str, loc2_id: str):
+        """Remove the edge between two locations, e.g. a road closure."""
+        old_cost = self.edge_cost(loc1_id, loc2_id)
+        if old_cost is None:
+            raise KeyError(f"No edge between {loc1_id} and {loc2_id}")
+        for a, b in ((loc1_id, loc2_id), (loc2_id, loc1_id)):
+            self.edges[a] = [(n, c) for n, c in self.edges[a] if n != b]
+            self._edge_costs.pop((a, b), None)
+            self.edge_profiles.pop((a, b), None)
+        self._edge_changed(loc1_id, loc2_id, old_cost, None)
+    
+    def add_location(self, location: Location):
+        """Add a location, or replace the one with the same id."""
+        self.locations[location.id] = location
+        self._locations_changed()
+    
+    def update_location(self, loc_id: str, **changes):
+        """
+        Change fields of a location in place, e.g. move it with x=, y= or
+        record a new resident with has_resident=True, resident_name=...
+        """
+        loc = self.locations[loc_id]
+        for field in changes:
+            if field == 'id' or not hasattr(loc, field):
+                raise AttributeError(f"Location has no updatable field {field!r}")
+        for field, value in changes.items():
+            setattr(loc, field, value)
+        self._locations_changed()
+    
+    def set_time_profile(self, loc1_id: str, loc2_id: str, breakpoints: List[int],
+                         factors: List[float], bidirectional: bool = True):
+        """
+        Make an edge's cost depend on the time of day.
+        
+        From breakpoints[i] minutes after midnight until the next
+        breakpoint, the edge costs factors[i] times its static cost.
+        breakpoints must start at 0 and increase; the profile repeats daily.
+        Static searches keep using the static cost.
+        """
+        if self.edge_cost(loc1_id, loc2_id) is None:
+            raise KeyError(f"No edge between {loc1_id} and {loc2_id}")
+        if (not breakpoints or breakpoints[0] != 0 or len(breakpoints) != len(factors)
+                or any(b <= a for a, b in zip(breakpoints, breakpoints[1:]))
+                or breakpoints[-1] >= self.DAY_MINUTES or min(factors) <= 0):
+            raise ValueError("breakpoints must rise from 0 within one day, "
+                             "with one positive factor each")
+        key = (tuple(breakpoints), tuple(float(f) for f in factors))
+        if key not in self._profile_ids:
+            self._profile_ids[key] = len(self._profiles)
+            self._profiles.append((array('l', key[0]), array('d', key[1])))
+        self.edge_profiles[(loc1_id, loc2_id)] = self._profile_ids[key]
+        if bidirectional:
+            self.edge_profiles[(loc2_id, loc1_id)] = self._profile_ids[key]
+    
+    def travel_time(self, loc1_id: str, loc2_id: str, depart: float) -> float:
+        """
+        Time from leaving loc1 at minute depart until arriving at loc2.
+        
+        Waiting at loc1 for a cheaper period is allowed, so leaving later
+        never means arriving earlier (the FIFO property time-dependent
+        A* needs to stay correct).
+        """
+        base = self.edge_cost(loc1_id, loc2_id)
+        if base is None:
+            raise KeyError(f"No edge between {loc1_id} and {loc2_id}")
+        profile = self.edge_profiles.get((loc1_id, loc2_id))
+        if profile is None:
+            return base
+        breakpoints, factors = self._profiles[profile]
+        day, minute = divmod(depart, self.DAY_MINUTES)
+        i = bisect_right(breakpoints, minute) - 1
+        arrive = depart + base * factors[i]
+        offset = day * self.DAY_MINUTES
+        while True:
+            i += 1
+            if i == len(breakpoints):
+                i, offset = 0, offset + self.DAY_MINUTES
+            period_start = offset + breakpoints[i]
+            if period_start >= arrive:
+                return arrive - depart
+            arrive = min(arrive, period_start + base * factors[i])
+    
+    def min_time_factor(self) -> float:
+        """Smallest cost factor any edge reaches during the day (at most 1)."""
+        return min([1.0] + [min(self._profiles[p][1]) for p in set(self.edge_profiles.values())])
+    
+    def cheapest_factor(self, loc1_id: str, loc2_id: str, start: float, end: float) -> float:
+        """Smallest cost factor of an edge between minutes start and end."""
+        profile = self.edge_profiles.get((loc1_id, loc2_id))
+        if profile is None:
+            return 1.0
+        breakpoints, factors = self._profiles[profile]
+        if end - start >= self.DAY_MINUTES:
+            return min(factors)
+        day, minute = divmod(start, self.DAY_MINUTES)
+        i = bisect_right(breakpoints, minute) - 1
+        offset = day * self.DAY_MINUTES
+        cheapest = factors[i]
+        while True:
+            i += 1
+            if i == len(breakpoints):
+                i, offset = 0, offset + self.DAY_MINUTES
+            if offset + breakpoints[i] > end:
+                return cheapest
+            cheapest = min(cheapest, factors[i])
+    
+    def add_edge_listener(self, listener: Callable[[str, str, Optional[float], Optional[float]], None]):
+        """
+        Register listener(loc1_id, loc2_id, old_cost, new_cost), called after
+        every edge change. old_cost is None for a new edge and new_cost is
+        None for a removed one.
+        """
+        self._edge_listeners.append(listener)
+    
+    def remove_edge_listener(self, listener: Callable[[str, str, Optional[float], Optional[float]], None]):
+        """Unregister a listener added with add_edge_listener (no-op if it is not registered)."""
+        if listener in self._edge_listeners:
+            self._edge_listeners.remove(listener)
+    
+    def _edge_changed(self, loc1_id: str, loc2_id: str,
+                      old_cost: Optional[float], new_cost: Optional[float]):
+        """Bump the map version and tell listeners which edge changed."""
+        # The new edge may join a location added straight to self.locations.
+        self._locations_changed()
+        for listener in list(self._edge_listeners):
+            listener(loc1_id, loc2_id, old_cost, new_cost)
+    
+    def _locations_changed(self):
+        """Drop the compact graph and grid indexes and bump the map version."""
+        self._compact = None
+        self._location_index = None
+        self._resident_index = None
+        self.version += 1
     
     def get_neighbors(self, loc_id: str) -> List[Tuple[str, float]]:
         """Get neighboring locations and travel costs."""
         return self.edges.get(loc_id, [])
     
+    def resident_ids(self) -> List[str]:
+        """IDs of all locations with a resident who receives deliveries."""
+        return [loc.id for loc in self.locations.values() if loc.has_resident]
+    
+    def to_compact(self) -> 'CompactGraph':
+        """
+        Return the array-backed form of this map.
+        
+        The compact graph is built once and cached until the edges change.
+        """
+        if self._compact is None:
+            self._compact = CompactGraph.from_community_map(self)
+        return self._compact
+    
     def manhattan_distance(self, loc1: Location, loc2: Location) -> float:
         """Manhattan distance heuristic."""
         return abs(loc1.x - loc2.x) + abs(loc1.y - loc2.y)
@@ -157,14 +413,877 @@ class CommunityMap:
         
         # Reduce estimated cost if there are unvisited residents nearby
         compassion_factor = 1.0
-        for loc_id, days in days_since_visit.items():
-            loc = self.locations.get(loc_id)
-            if loc and loc.has_resident:
-                if self.euclidean_distance(loc1, loc) < 3:
-                    # Nearby resident hasn't been visited
-                    compassion_factor -= 0.1 * min(days, 7) / 7
+        for loc_id in self.resident_index().within(loc1.x, loc1.y, self.COMPASSION_RADIUS):
+            days = days_since_visit.get(loc_id)
+            if days is not None:
+                # Nearby resident hasn't been visited
+                compassion_factor -= 0.1 * min(days, 7) / 7
         
         return base_distance * max(compassion_factor, 0.5)
+    
+    def location_index(self) -> GridIndex:
+        """Grid index over all locations (built on first use)."""
+        if self._location_index is None:
+            self._location_index = GridIndex(
+                ((loc.id, loc.x, loc.y) for loc in self.locations.values()),
+                self.COMPASSION_RADIUS)
+        return self._location_index
+    
+    def resident_index(self) -> GridIndex:
+        """Grid index over locations with has_resident=True."""
+        if self._resident_index is None:
+            self._resident_index = GridIndex(
+                ((loc.id, loc.x, loc.y) for loc in self.locations.values() if loc.has_resident),
+                self.COMPASSION_RADIUS)
+        return self._resident_index
+    
+    def compassion_factors(self, days_since_visit: Dict[str, int]) -> Dict[str, float]:
+        """
+        Precompute the compassion factor of every location for one search.
+        
+        The cost is proportional to the residents in days_since_visit and
+        the locations around them, after which the heuristic is a dict
+        lookup per expanded node. Locations missing from the result have
+        factor 1.0.
+        """
+        residents = [(loc.x, loc.y, days)
+                     for loc_id, days in days_since_visit.items()
+                     for loc in (self.locations.get(loc_id),)
+                     if loc and loc.has_resident]
+        return _compassion_factors(self.location_index(), residents, self.COMPASSION_RADIUS)
+
+
+class CompactGraph:
+    """
+    Array-backed (CSR) form of a community map for large street networks.
+    
+    Nodes are dense integer ids 0..n-1. The neighbors of node i are
+    targets[offsets[i]:offsets[i + 1]] with the matching entries of costs.
+    Coordinates and resident flags are parallel arrays, and all names live
+    in one UTF-8 blob that is decoded (and interned) only on lookup, so a
+    node costs a few dozen bytes instead of a Location object plus a list
+    of tuples.
+    
+    The string-id methods (get_neighbors, index_of, name) are a thin
+    mapping layer over the integer core used by AStarSearch.
+    """
+    
+    def __init__(self, names_blob: bytes, name_offsets, name_order,
+                 xs, ys, resident, offsets, targets, costs):
+        self.names_blob = names_blob
+        self.name_offsets = name_offsets    # 'q', n + 1 entries
+        self.name_order = name_order        # 'i', node ids sorted by name
+        self.xs = xs                        # 'd'
+        self.ys = ys                        # 'd'
+        self.resident = resident            # 'B', 1 if has_resident
+        self.offsets = offsets              # 'q', n + 1 entries
+        self.targets = targets              # 'i'
+        self.costs = costs                  # 'd'
+        self._reverse: Optional['CompactGraph'] = None
+        self._node_index: Optional[GridIndex] = None
+        self._arc_table: Optional[Tuple[array, array]] = None
+        self._fingerprint: Optional[int] = None
+        self._mapped: Optional[mmap.mmap] = None  # set by open()
+    
+    @classmethod
+    def build(cls, nodes: Iterable[Tuple[str, float, float, bool]],
+              arcs: Iterable[Tuple[str, str, float]]) -> 'CompactGraph':
+        """
+        Build a compact graph from (id, x, y, has_resident) nodes and
+        directed (from_id, to_id, cost) arcs.
+        
+        Arcs are grouped per source with a counting sort, so the only
+        per-edge Python objects are the ones the caller streams in.
+        """
+        index: Dict[str, int] = {}
+        name_offsets = array('q', [0])
+        blob = bytearray()
+        xs, ys, resident = array('d'), array('d'), array('B')
+        for node_id, x, y, has_resident in nodes:
+            index[node_id] = len(index)
+            blob += node_id.encode('utf-8')
+            name_offsets.append(len(blob))
+            xs.append(x)
+            ys.append(y)
+            resident.append(1 if has_resident else 0)
+        
+        sources, targets, costs = array('i'), array('i'), array('d')
+        for from_id, to_id, cost in arcs:
+            u = index.get(from_id)
+            v = index.get(to_id)
+            if u is None or v is None:
+                continue
+            sources.append(u)
+            targets.append(v)
+            costs.append(cost)
+        return cls.from_arrays(bytes(blob), name_offsets, xs, ys, resident,
+                               sources, targets, costs)
+    
+    @classmethod
+    def from_arrays(cls, names_blob: bytes, name_offsets: array, xs: array, ys: array,
+                    resident: array, sources: array, targets: array,
+                    costs: array) -> 'CompactGraph':
+        """
+        Build a compact graph from node arrays and unsorted arcs given as
+        parallel sources/targets/costs arrays (used by build() and by the
+        streaming importer in map_import).
+        """
+        n = len(xs)
+        offsets = array('q', bytes(8 * (n + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        
+        m = len(sources)
+        csr_targets = array('i', bytes(4 * m))
+        csr_costs = array('d', bytes(8 * m))
+        cursor = array('q', offsets[:n])
+        for k in range(m):
+            u = sources[k]
+            slot = cursor[u]
+            cursor[u] = slot + 1
+            csr_targets[slot] = targets[k]
+            csr_costs[slot] = costs[k]
+        
+        order = array('i', sorted(
+            range(n), key=lambda i: names_blob[name_offsets[i]:name_offsets[i + 1]]))
+        return cls(names_blob, name_offsets, order, xs, ys, resident,
+                   offsets, csr_targets, csr_costs)
+    
+    @classmethod
+    def from_community_map(cls, community_map: 'CommunityMap') -> 'CompactGraph':
+        """Compile a CommunityMap (locations + adjacency dict) to CSR form."""
+        nodes = [(loc.id, loc.x, loc.y, loc.has_resident)
+                 for loc in community_map.locations.values()]
+        arcs = ((from_id, to_id, cost)
+                for from_id, neighbors in community_map.edges.items()
+                for to_id, cost in neighbors)
+        return cls.build(nodes, arcs)
+    
+    @property
+    def node_count(self) -> int:
+        return len(self.offsets) - 1
+    
+    @property
+    def edge_count(self) -> int:
+        """Number of directed arcs (a two-way street counts twice)."""
+        return len(self.targets)
+    
+    def name(self, node: int) -> str:
+        """Location id of an integer node."""
+        start, end = self.name_offsets[node], self.name_offsets[node + 1]
+        return sys.intern(bytes(self.names_blob[start:end]).decode('utf-8'))
+    
+    def _name_key(self, node: int) -> bytes:
+        return bytes(self.names_blob[self.name_offsets[node]:self.name_offsets[node + 1]])
+    
+    def index_of(self, loc_id: str) -> Optional[int]:
+        """Integer node of a location id, or None if it is not on the map."""
+        key = loc_id.encode('utf-8')
+        pos = bisect_left(self.name_order, key, key=self._name_key)
+        if pos < len(self.name_order):
+            node = self.name_order[pos]
+            if self._name_key(node) == key:
+                return node
+        return None
+    
+    def arcs(self, node: int) -> range:
+        """Positions of node's outgoing arcs in targets/costs."""
+        return range(self.offsets[node], self.offsets[node + 1])
+    
+    def get_neighbors(self, loc_id: str) -> List[Tuple[str, float]]:
+        """Get neighboring locations and travel costs (string-id API)."""
+        node = self.index_of(loc_id)
+        if node is None:
+            return []
+        return [(self.name(self.targets[k]), self.costs[k]) for k in self.arcs(node)]
+    
+    def arc_table(self) -> Tuple[array, array]:
+        """
+        Sorted arc keys u * n + v ('q') and the cheapest cost of each ('d').
+        
+        Built on first use; answers "what does u -> v cost" with one
+        binary search instead of a scan of u's arcs.
+        """
+        if self._arc_table is None:
+            n = self.node_count
+            keys, costs = array('q'), array('d')
+            for u in range(n):
+                for v, cost in sorted(zip(self.targets[self.offsets[u]:self.offsets[u + 1]],
+                                          self.costs[self.offsets[u]:self.offsets[u + 1]])):
+                    key = u * n + v
+                    if keys and keys[-1] == key:
+                        continue  # repeated arc; sorted order kept the cheapest
+                    keys.append(key)
+                    costs.append(cost)
+            self._arc_table = (keys, costs)
+        return self._arc_table
+    
+    def arc_cost(self, u: int, v: int) -> Optional[float]:
+        """Cost of the arc u -> v (cheapest if repeated), or None."""
+        keys, costs = self.arc_table()
+        key = u * self.node_count + v
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            return costs[pos]
+        return None
+    
+    def edge_cost(self, loc1_id: str, loc2_id: str) -> Optional[float]:
+        """Cost of the edge loc1 -> loc2 (string-id API), or None."""
+        u, v = self.index_of(loc1_id), self.index_of(loc2_id)
+        if u is None or v is None:
+            return None
+        return self.arc_cost(u, v)
+    
+    def reversed(self) -> 'CompactGraph':
+        """
+        The same graph with every arc flipped (cached).
+        
+        Names, coordinates and resident flags are shared, only the CSR
+        arrays are rebuilt.
+        """
+        if self._reverse is None:
+            n = self.node_count
+            offsets = array('q', bytes(8 * (n + 1)))
+            for v in self.targets:
+                offsets[v + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+            cursor = array('q', offsets[:n])
+            targets = array('i', bytes(4 * len(self.targets)))
+            costs = array('d', bytes(8 * len(self.costs)))
+            for u in range(n):
+                for k in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[k]
+                    slot = cursor[v]
+                    cursor[v] = slot + 1
+                    targets[slot] = u
+                    costs[slot] = self.costs[k]
+            reverse = CompactGraph(self.names_blob, self.name_offsets, self.name_order,
+                                   self.xs, self.ys, self.resident, offsets, targets, costs)
+            reverse._reverse = self
+            self._reverse = reverse
+        return self._reverse
+    
+    def fingerprint(self) -> int:
+        """
+        CRC-32 of the CSR arrays (cached).
+        
+        Preprocessed data (landmark tables, hierarchies) records the
+        fingerprint of the graph it was built for, so a changed edge cost
+        is caught even when the node and arc counts stay the same.
+        """
+        if self._fingerprint is None:
+            crc = 0
+            for arr in (self.offsets, self.targets, self.costs):
+                crc = zlib.crc32(arr, crc)
+            self._fingerprint = crc
+        return self._fingerprint
+    
+    def distance(self, u: int, v: int, heuristic: 'HeuristicType') -> float:
+        """Coordinate distance between two nodes for the given heuristic."""
+        dx = self.xs[u] - self.xs[v]
+        dy = self.ys[u] - self.ys[v]
+        if heuristic == HeuristicType.MANHATTAN:
+            return abs(dx) + abs(dy)
+        # EUCLIDEAN, and COMPASSION with no visit data (factor 1.0)
+        return (dx * dx + dy * dy) ** 0.5
+    
+    def compassion_factors(self, days_since_visit: Dict[str, int]) -> Dict[int, float]:
+        """Per-node compassion factors keyed by integer node (see CommunityMap)."""
+        if self._node_index is None:
+            self._node_index = GridIndex(
+                ((v, self.xs[v], self.ys[v]) for v in range(self.node_count)),
+                CommunityMap.COMPASSION_RADIUS)
+        residents = []
+        for loc_id, days in days_since_visit.items():
+            node = self.index_of(loc_id)
+            if node is not None and self.resident[node]:
+                residents.append((self.xs[node], self.ys[node], days))
+        return _compassion_factors(self._node_index, residents, CommunityMap.COMPASSION_RADIUS)
+    
+    MAGIC = b'JOKMAP01'  # bump the version suffix on layout changes
+    
+    def save(self, path: str):
+        """
+        Write the graph in the binary map format that open() maps.
+        
+        Every array is stored raw and 8-byte aligned, so opening the file
+        needs no parsing beyond a small JSON header.
+        """
+        _save_arrays(path, self.MAGIC,
+                     {'node_count': self.node_count, 'edge_count': self.edge_count}, {
+            'names_blob': array('B', self.names_blob),
+            'name_offsets': self.name_offsets, 'name_order': self.name_order,
+            'xs': self.xs, 'ys': self.ys, 'resident': self.resident,
+            'offsets': self.offsets, 'targets': self.targets, 'costs': self.costs,
+        })
+    
+    @classmethod
+    def open(cls, path: str) -> 'CompactGraph':
+        """
+        Memory-map a file written by save() without copying it.
+        
+        Each array is a read-only memoryview straight into the mapped
+        file, so cold start costs a header parse, and worker processes
+        opening the same file share its pages through the OS page cache.
+        """
+        mapped, meta, a = _map_arrays(path, cls.MAGIC)
+        graph = cls(a['names_blob'], a['name_offsets'], a['name_order'], a['xs'], a['ys'],
+                    a['resident'], a['offsets'], a['targets'], a['costs'])
+        graph._mapped = mapped  # keep the mapping alive as long as the views
+        if graph.node_count != meta['node_count'] or graph.edge_count != meta['edge_count']:
+            raise ValueError(f"{path} is truncated or corrupt")
+        return graph
+    
+    def nbytes(self) -> int:
+        """Approximate memory used by the arrays and the name blob."""
+        total = len(self.names_blob)
+        for arr in (self.name_offsets, self.name_order, self.xs, self.ys,
+                    self.resident, self.offsets, self.targets, self.costs):
+            total += len(arr) * arr.itemsize
+        return total
+
+
+INF = float('inf')
+
+
+def _shortest_path_tree(graph: CompactGraph, source: int,
+                        targets: Optional[Set[int]] = None) -> Tuple[array, array]:
+    """
+    One-to-all Dijkstra over a compact graph.
+    
+    Returns (dist, parent) arrays indexed by node; unreachable nodes have
+    dist = inf and parent = -1. If targets is given the search stops as
+    soon as all of them are settled (other entries may then be upper
+    bounds only).
+    """
+    remaining = set(targets) if targets is not None else None
+    n = graph.node_count
+    offsets, arc_targets, costs = graph.offsets, graph.targets, graph.costs
+    dist = array('d', [INF]) * n
+    parent = array('i', [-1]) * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = arc_targets[k]
+            nd = d + costs[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, parent
+
+
+def _save_arrays(path: str, magic: bytes, meta: Dict,
+                 arrays: Dict[str, Union[array, memoryview]]):
+    """
+    Write named arrays to a small binary container.
+    
+    Layout: 8-byte magic, uint32 header length, JSON header (meta plus the
+    name/typecode/length/offset of every array), then each array's raw
+    bytes aligned to 8 bytes. Typed memoryviews from _map_arrays are
+    accepted too, so a mapped graph can be saved again.
+    """
+    layout = []
+    offset = 0
+    for name, arr in arrays.items():
+        typecode = arr.typecode if isinstance(arr, array) else arr.format
+        layout.append([name, typecode, len(arr), offset])
+        offset += (len(arr) * arr.itemsize + 7) & ~7
+    header = json.dumps({'meta': meta, 'arrays': layout}).encode('utf-8')
+    data_start = (len(magic) + 4 + len(header) + 7) & ~7
+    with open(path, 'wb') as f:
+        f.write(magic)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(bytes(data_start - f.tell()))
+        for name, arr in arrays.items():
+            raw = arr.tobytes()
+            f.write(raw)
+            f.write(bytes(((len(raw) + 7) & ~7) - len(raw)))
+
+
+def _read_header(data, path: str, magic: bytes) -> Tuple[Dict, List, int]:
+    """Parse a _save_arrays header; returns (meta, layout, data_start)."""
+    if data[:len(magic)] != magic:
+        raise ValueError(f"{path} is not a {magic!r} file")
+    (header_len,) = struct.unpack_from('<I', data, len(magic))
+    header_start = len(magic) + 4
+    header = json.loads(bytes(data[header_start:header_start + header_len]))
+    return header['meta'], header['arrays'], (header_start + header_len + 7) & ~7
+
+
+def _load_arrays(path: str, magic: bytes) -> Tuple[Dict, Dict[str, array]]:
+    """Read a container written by _save_arrays; returns (meta, arrays)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    meta, layout, data_start = _read_header(data, path, magic)
+    arrays = {}
+    for name, typecode, length, offset in layout:
+        arr = array(typecode)
+        start = data_start + offset
+        arr.frombytes(data[start:start + length * arr.itemsize])
+        arrays[name] = arr
+    return meta, arrays
+
+
+def _map_arrays(path: str, magic: bytes) -> Tuple[mmap.mmap, Dict, Dict[str, memoryview]]:
+    """
+    Memory-map a _save_arrays container; returns (mapping, meta, views).
+    
+    The views are typed memoryviews into the read-only mapping, so no
+    array data is copied or parsed.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    meta, layout, data_start = _read_header(mapped, path, magic)
+    view = memoryview(mapped)
+    arrays = {}
+    for name, typecode, length, offset in layout:
+        start = data_start + offset
+        end = start + length * array(typecode).itemsize
+        if end > len(mapped):
+            raise ValueError(f"{path} is truncated or corrupt")
+        arrays[name] = view[start:end].cast(typecode)
+    return mapped, meta, arrays
+
+
+class LandmarkIndex:
+    """
+    Landmark distance tables for the ALT heuristic.
+    
+    For every landmark L the triangle inequality gives
+        d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+    so the largest such difference over all landmarks is an admissible
+    and consistent lower bound, usually far tighter than straight-line
+    distance on a street network. Streets may be one-way (see map_import),
+    so each landmark keeps a forward table d(L, .) from Dijkstra over the
+    arcs and a reverse table d(., L) from Dijkstra over the reversed arcs.
+    """
+    
+    MAGIC = b'JOKALT02'
+    
+    def __init__(self, landmarks: List[int], forward: List[array],
+                 reverse: List[array], fingerprint: int):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.reverse = reverse
+        self.fingerprint = fingerprint
+    
+    @classmethod
+    def build(cls, graph: CompactGraph, k: int = 8) -> 'LandmarkIndex':
+        """
+        Pick k landmarks by farthest-point selection and precompute tables.
+        
+        Each new landmark is the node farthest from all landmarks chosen so
+        far; nodes in other components count as infinitely far, so every
+        component gets a landmark before any gets a second one.
+        """
+        n = graph.node_count
+        landmarks: List[int] = []
+        forward: List[array] = []
+        reverse: List[array] = []
+        if n == 0:
+            return cls(landmarks, forward, reverse, graph.fingerprint())
+        
+        # Start from the node farthest from node 0 rather than node 0 itself
+        seed_dist, _ = _shortest_path_tree(graph, 0)
+        candidate = max(range(n), key=lambda v: seed_dist[v] if seed_dist[v] < INF else -1)
+        nearest = array('d', [INF]) * n
+        reversed_graph = graph.reversed()
+        
+        for _ in range(min(k, n)):
+            dist, _ = _shortest_path_tree(graph, candidate)
+            landmarks.append(candidate)
+            forward.append(dist)
+            reverse.append(_shortest_path_tree(reversed_graph, candidate)[0])
+            for v in range(n):
+                if dist[v] < nearest[v]:
+                    nearest[v] = dist[v]
+            candidate = max(range(n), key=nearest.__getitem__)
+            if nearest[candidate] == 0:
+                break  # every node is already a landmark
+        return cls(landmarks, forward, reverse, graph.fingerprint())
+    
+    def matches(self, graph: CompactGraph) -> bool:
+        """Whether these tables were built for exactly this graph (arcs and costs)."""
+        return self.fingerprint == graph.fingerprint()
+    
+    def lower_bound(self, node: int, goal: int) -> float:
+        """Triangle-inequality lower bound on d(node, goal); inf if unreachable."""
+        best = 0.0
+        for from_landmark, to_landmark in zip(self.forward, self.reverse):
+            # A term is only usable when its subtrahend is finite; if the
+            # minuend is infinite the goal provably cannot be reached
+            if from_landmark[node] < INF:
+                diff = from_landmark[goal] - from_landmark[node]
+                if diff > best:
+                    best = diff
+            if to_landmark[goal] < INF:
+                diff = to_landmark[node] - to_landmark[goal]
+                if diff > best:
+                    best = diff
+        return best
+    
+    def save(self, path: str):
+        """Persist the landmark tables to a binary file."""
+        arrays = {'landmarks': array('i', self.landmarks)}
+        for i, (from_landmark, to_landmark) in enumerate(zip(self.forward, self.reverse)):
+            arrays[f'forward_{i}'] = from_landmark
+            arrays[f'reverse_{i}'] = to_landmark
+        _save_arrays(path, self.MAGIC, {'fingerprint': self.fingerprint}, arrays)
+    
+    @classmethod
+    def load(cls, path: str) -> 'LandmarkIndex':
+        """Reload tables written by save()."""
+        meta, arrays = _load_arrays(path, cls.MAGIC)
+        landmarks = list(arrays['landmarks'])
+        forward = [arrays[f'forward_{i}'] for i in range(len(landmarks))]
+        reverse = [arrays[f'reverse_{i}'] for i in range(len(landmarks))]
+        return cls(landmarks, forward, reverse, meta['fingerprint'])
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a compact graph for repeated route queries.
+    
+    Preprocessing contracts nodes one by one (cheapest edge difference
+    first) and adds a shortcut u -> w through v whenever a bounded witness
+    search finds no path from u to w that avoids v and is at most as
+    cheap. A query is then a bidirectional Dijkstra that only ever climbs
+    to higher-ranked nodes, touching a tiny fraction of the map. Shortcuts
+    remember the node they bypass so paths unpack back to original arcs.
+    """
+    
+    MAGIC = b'JOKCH002'
+    WITNESS_SETTLE_LIMIT = 60    # when contracting
+    PRIORITY_SETTLE_LIMIT = 15   # when only estimating the edge difference
+    
+    def __init__(self, rank: array, up: Tuple[array, array, array, array],
+                 down: Tuple[array, array, array, array], fingerprint: int):
+        self.rank = rank
+        # up: arcs v -> w with rank[w] > rank[v], grouped by v
+        self.up_offsets, self.up_targets, self.up_costs, self.up_middle = up
+        # down: arcs x -> v with rank[x] > rank[v], grouped by v (stores x)
+        self.down_offsets, self.down_sources, self.down_costs, self.down_middle = down
+        self.fingerprint = fingerprint  # CompactGraph.fingerprint() of the source graph
+    
+    @property
+    def node_count(self) -> int:
+        return len(self.rank)
+    
+    @classmethod
+    def build(cls, graph: CompactGraph) -> 'ContractionHierarchy':
+        """Contract every node of graph; cost is paid once, then save()."""
+        n = graph.node_count
+        out: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+        inn: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+        for u in range(n):
+            for k in graph.arcs(u):
+                v, cost = graph.targets[k], graph.costs[k]
+                if v != u and cost < out[u].get(v, (INF, -1))[0]:
+                    out[u][v] = (cost, -1)
+                    inn[v][u] = (cost, -1)
+        
+        rank = array('i', [-1]) * n
+        contracted_neighbors = array('i', bytes(4 * n))
+        up_arcs: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        down_arcs: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+        
+        def priority(v: int) -> int:
+            added = len(cls._shortcuts(v, out, inn, cls.PRIORITY_SETTLE_LIMIT))
+            return added - len(out[v]) - len(inn[v]) + contracted_neighbors[v]
+        
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: re-queue if v is no longer the cheapest to contract
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+            
+            shortcuts = cls._shortcuts(v, out, inn, cls.WITNESS_SETTLE_LIMIT)
+            up_arcs[v] = [(w, cost, middle) for w, (cost, middle) in out[v].items()]
+            down_arcs[v] = [(u, cost, middle) for u, (cost, middle) in inn[v].items()]
+            for u in inn[v]:
+                del out[u][v]
+                contracted_neighbors[u] += 1
+            for w in out[v]:
+                del inn[w][v]
+                contracted_neighbors[w] += 1
+            out[v], inn[v] = {}, {}
+            for u, w, cost in shortcuts:
+                if cost < out[u].get(w, (INF, -1))[0]:
+                    out[u][w] = (cost, v)
+                    inn[w][u] = (cost, v)
+            rank[v] = order
+            order += 1
+        
+        return cls(rank, cls._to_csr(up_arcs), cls._to_csr(down_arcs), graph.fingerprint())
+    
+    @classmethod
+    def _shortcuts(cls, v: int, out, inn, settle_limit: int) -> List[Tuple[int, int, float]]:
+        """Shortcuts needed if v were contracted now."""
+        shortcuts = []
+        if not inn[v] or not out[v]:
+            return shortcuts
+        max_out = max(cost for cost, _ in out[v].values())
+        for u, (cost_in, _) in inn[v].items():
+            witness = cls._witness_distances(u, v, cost_in + max_out, out, settle_limit)
+            for w, (cost_out, _) in out[v].items():
+                if w == u:
+                    continue
+                via = cost_in + cost_out
+                if witness.get(w, INF) > via:
+                    shortcuts.append((u, w, via))
+        return shortcuts
+    
+    @staticmethod
+    def _witness_distances(source: int, skip: int, limit: float, out,
+                           settle_limit: int) -> Dict[int, float]:
+        """
+        Bounded Dijkstra from source on the remaining graph, avoiding skip.
+        
+        Stopping early only ever adds an unnecessary shortcut, never a
+        wrong one.
+        """
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        while heap and settled < settle_limit:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            for w, (cost, _) in out[u].items():
+                if w == skip:
+                    continue
+                nd = d + cost
+                if nd < dist.get(w, INF):
+                    dist[w] = nd
+                    heapq.heappush(heap, (nd, w))
+        return dist
+    
+    @staticmethod
+    def _to_csr(arcs: List[List[Tuple[int, float, int]]]) -> Tuple[array, array, array, array]:
+        offsets, others, costs, middles = array('q', [0]), array('i'), array('d'), array('i')
+        for node_arcs in arcs:
+            for other, cost, middle in node_arcs:
+                others.append(other)
+                costs.append(cost)
+                middles.append(middle)
+            offsets.append(len(others))
+        return offsets, others, costs, middles
+    
+    def matches(self, graph: CompactGraph) -> bool:
+        """Whether this hierarchy was built for exactly this graph (arcs and costs)."""
+        return self.fingerprint == graph.fingerprint()
+    
+    def query(self, source: int, target: int) -> Tuple[Optional[List[int]], float]:
+        """
+        Shortest path and cost between two nodes.
+        
+        Returns (None, inf) when target is unreachable.
+        """
+        if source == target:
+            return [source], 0.0
+        
+        dist: Tuple[Dict[int, float], Dict[int, float]] = ({source: 0.0}, {target: 0.0})
+        parent: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        arcs = ((self.up_offsets, self.up_targets, self.up_costs),
+                (self.down_offsets, self.down_sources, self.down_costs))
+        mu, meeting = INF, -1
+        
+        while True:
+            # Each side stops once its smallest label can no longer beat mu
+            forward = heaps[0][0][0] if heaps[0] else INF
+            backward = heaps[1][0][0] if heaps[1] else INF
+            if min(forward, backward) >= mu or (not heaps[0] and not heaps[1]):
+                break
+            side = 0 if forward <= backward else 1
+            d, u = heapq.heappop(heaps[side])
+            if d > dist[side][u]:
+                continue
+            other_d = dist[1 - side].get(u)
+            if other_d is not None and d + other_d < mu:
+                mu, meeting = d + other_d, u
+            
+            offsets, others, costs = arcs[side]
+            for k in range(offsets[u], offsets[u + 1]):
+                w = others[k]
+                nd = d + costs[k]
+                if nd < dist[side].get(w, INF):
+                    dist[side][w] = nd
+                    parent[side][w] = u
+                    heapq.heappush(heaps[side], (nd, w))
+        
+        if meeting < 0:
+            return None, INF
+        
+        nodes = [meeting]
+        while nodes[-1] != source:
+            nodes.append(parent[0][nodes[-1]])
+        nodes.reverse()
+        while nodes[-1] != target:
+            nodes.append(parent[1][nodes[-1]])
+        
+        path = [source]
+        for u, w in zip(nodes, nodes[1:]):
+            path.extend(self._unpack(u, w))
+        return path, mu
+    
+    def _middle(self, u: int, w: int) -> int:
+        """Bypassed node of the hierarchy arc u -> w (-1 for an original arc)."""
+        if self.rank[w] > self.rank[u]:
+            for k in range(self.up_offsets[u], self.up_offsets[u + 1]):
+                if self.up_targets[k] == w:
+                    return self.up_middle[k]
+        else:
+            for k in range(self.down_offsets[w], self.down_offsets[w + 1]):
+                if self.down_sources[k] == u:
+                    return self.down_middle[k]
+        raise KeyError((u, w))
+    
+    def _unpack(self, u: int, w: int) -> List[int]:
+        """Original nodes after u along the arc u -> w, ending with w."""
+        path = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            middle = self._middle(a, b)
+            if middle < 0:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return path
+    
+    def save(self, path: str):
+        """Persist the preprocessed hierarchy to a binary file."""
+        _save_arrays(path, self.MAGIC, {'fingerprint': self.fingerprint}, {
+            'rank': self.rank,
+            'up_offsets': self.up_offsets, 'up_targets': self.up_targets,
+            'up_costs': self.up_costs, 'up_middle': self.up_middle,
+            'down_offsets': self.down_offsets, 'down_sources': self.down_sources,
+            'down_costs': self.down_costs, 'down_middle': self.down_middle,
+        })
+    
+    @classmethod
+    def load(cls, path: str) -> 'ContractionHierarchy':
+        """Reload a hierarchy written by save()."""
+        meta, a = _load_arrays(path, cls.MAGIC)
+        return cls(a['rank'],
+                   (a['up_offsets'], a['up_targets'], a['up_costs'], a['up_middle']),
+                   (a['down_offsets'], a['down_sources'], a['down_costs'], a['down_middle']),
+                   meta['fingerprint'])
+
+
+class RouteCache:
+    """
+    Bounded LRU cache of search results.
+    
+    Keys are (start_id, goal_id, heuristic, map_version). When the map
+    reports an edge change, only the routes that can have changed are
+    dropped and the rest are carried over to the new version:
+    
+    - cost increase / removal: a route not using the edge is still the
+      best one, so only routes through that edge are dropped;
+    - new edge / cost decrease: any route might now have a shortcut, so
+      the whole cache is cleared.
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._routes: 'OrderedDict[Tuple, Optional[List[str]]]' = OrderedDict()
+        self._by_edge: Dict[Tuple[str, str], Set[Tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _edge_key(loc1_id: str, loc2_id: str) -> Tuple[str, str]:
+        return (loc1_id, loc2_id) if loc1_id <= loc2_id else (loc2_id, loc1_id)
+    
+    def get(self, key: Tuple) -> Tuple[bool, Optional[List[str]]]:
+        """Return (found, path); a cached None means 'no path exists'."""
+        if key in self._routes:
+            self._routes.move_to_end(key)
+            self.hits += 1
+            return True, self._routes[key]
+        self.misses += 1
+        return False, None
+    
+    def put(self, key: Tuple, path: Optional[List[str]]):
+        if key in self._routes:
+            self._drop(key)
+        self._routes[key] = path
+        for edge in self._path_edges(path):
+            self._by_edge.setdefault(edge, set()).add(key)
+        while len(self._routes) > self.max_size:
+            self._drop(next(iter(self._routes)))
+            self.evictions += 1
+    
+    def _path_edges(self, path: Optional[List[str]]) -> Set[Tuple[str, str]]:
+        if not path:
+            return set()
+        return {self._edge_key(a, b) for a, b in zip(path, path[1:])}
+    
+    def _drop(self, key: Tuple):
+        path = self._routes.pop(key)
+        for edge in self._path_edges(path):
+            keys = self._by_edge.get(edge)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_edge[edge]
+    
+    def clear(self):
+        self.invalidations += len(self._routes)
+        self._routes.clear()
+        self._by_edge.clear()
+    
+    def on_edge_changed(self, loc1_id: str, loc2_id: str,
+                        old_cost: Optional[float], new_cost: Optional[float],
+                        new_version: int):
+        """Invalidate after an edge change and re-key survivors to new_version."""
+        if old_cost is None or (new_cost is not None and new_cost < old_cost):
+            self.clear()
+            return
+        for key in list(self._by_edge.get(self._edge_key(loc1_id, loc2_id), ())):
+            self._drop(key)
+            self.invalidations += 1
+        
+        survivors = list(self._routes.items())
+        self._routes.clear()
+        self._by_edge.clear()
+        for (start_id, goal_id, heuristic, _), path in survivors:
+            self.put((start_id, goal_id, heuristic, new_version), path)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._routes),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
 
 
 class AStarSearch:
@@ -176,12 +1295,107 @@ class AStarSearch:
     that might save Mrs. Garcia's life.
     """
     
-    def __init__(self, community_map: CommunityMap):
+    def __init__(self, community_map: Union[CommunityMap, CompactGraph],
+                 compact: bool = False, cache_size: int = 0,
+                 days_since_visit: Optional[Dict[str, int]] = None,
+                 history_limit: Optional[int] = None,
+                 on_expand: Optional[Callable[[str], None]] = None):
         self.map = community_map
+        # search_history keeps at most history_limit expansions (None: all,
+        # 0: none); on_expand streams every expansion instead
+        self.history_limit = history_limit
+        self.on_expand = on_expand
+        # Visit data for the COMPASSION heuristic (resident id -> days)
+        self.days_since_visit: Dict[str, int] = days_since_visit or {}
+        self._compassion_factors: Dict = {}
+        # A bare CompactGraph (e.g. a city network) is always searched compactly
+        self.compact = compact or isinstance(community_map, CompactGraph)
         self.search_history: List[str] = []  # For visualization
+        self.search_stats: Dict = {}         # Expanded-node counts etc.
+        self.frontier_history: Optional[Dict[str, List[str]]] = None
+        self.landmarks: Optional[LandmarkIndex] = None
+        self.hierarchy: Optional[ContractionHierarchy] = None
+        self.route_cache: Optional[RouteCache] = None
+        if cache_size > 0:
+            self.route_cache = RouteCache(cache_size)
+            if isinstance(community_map, CommunityMap):
+                community_map.add_edge_listener(self._on_edge_changed)
+    
+    def _on_edge_changed(self, loc1_id: str, loc2_id: str,
+                         old_cost: Optional[float], new_cost: Optional[float]):
+        self.route_cache.on_edge_changed(loc1_id, loc2_id, old_cost, new_cost, self.map.version)
+    
+    def close(self):
+        """
+        Stop listening for edge changes on the map.
+        
+        The map holds the route cache's listener, so a search with a cache
+        stays alive as long as its map unless it is closed.
+        """
+        if self.route_cache is not None and isinstance(self.map, CommunityMap):
+            self.map.remove_edge_listener(self._on_edge_changed)
+    
+    @property
+    def graph(self) -> CompactGraph:
+        """The compact graph this search runs on in compact mode."""
+        if isinstance(self.map, CompactGraph):
+            return self.map
+        return self.map.to_compact()
+    
+    def preprocess_landmarks(self, k: int = 8) -> LandmarkIndex:
+        """Select k landmarks and precompute their distance tables."""
+        self.landmarks = LandmarkIndex.build(self.graph, k)
+        return self.landmarks
+    
+    def load_landmarks(self, path: str) -> LandmarkIndex:
+        """Attach landmark tables saved with LandmarkIndex.save()."""
+        landmarks = LandmarkIndex.load(path)
+        if not landmarks.matches(self.graph):
+            raise ValueError(f"Landmark tables in {path} were built for a different map")
+        self.landmarks = landmarks
+        return landmarks
+    
+    def _landmark_index(self) -> LandmarkIndex:
+        """Landmark tables for the current graph, built on first use."""
+        if self.landmarks is None or not self.landmarks.matches(self.graph):
+            self.preprocess_landmarks()
+        return self.landmarks
+    
+    def preprocess_hierarchy(self) -> ContractionHierarchy:
+        """Build the contraction hierarchy used by search_hierarchy()."""
+        self.hierarchy = ContractionHierarchy.build(self.graph)
+        return self.hierarchy
+    
+    def load_hierarchy(self, path: str) -> ContractionHierarchy:
+        """Attach a hierarchy saved with ContractionHierarchy.save()."""
+        hierarchy = ContractionHierarchy.load(path)
+        if not hierarchy.matches(self.graph):
+            raise ValueError(f"Contraction hierarchy in {path} was built for a different map")
+        self.hierarchy = hierarchy
+        return hierarchy
+    
+    def search_hierarchy(self, start_id: str, goal_id: str) -> Optional[List[str]]:
+        """
+        Shortest path via the contraction hierarchy.
+        
+        Same contract as search(); the hierarchy is built on first use if
+        none was preprocessed or loaded. The path cost is left in
+        search_stats['cost'].
+        """
+        graph = self.graph
+        if self.hierarchy is None or not self.hierarchy.matches(graph):
+            self.preprocess_hierarchy()
+        start, goal = graph.index_of(start_id), graph.index_of(goal_id)
+        if start is None or goal is None:
+            return None
+        nodes, cost = self.hierarchy.query(start, goal)
+        self.search_stats = {'hierarchy': True, 'cost': cost}
+        return [graph.name(n) for n in nodes] if nodes is not None else None
     
     def search(self, start_id: str, goal_id: str, 
-               heuristic: HeuristicType = HeuristicType.EUCLIDEAN) -> Optional[List[str]]:
+               heuristic: HeuristicType = HeuristicType.EUCLIDEAN,
+               bidirectional: bool = False,
+               days_since_visit: Optional[Dict[str, int]] = None) -> Optional[List[str]]:
         """
         Find optimal path using A* search.
         
@@ -189,44 +1403,390 @@ class AStarSearch:
             start_id: Starting location ID
             goal_id: Goal location ID
             heuristic: Which heuristic function to use
+            bidirectional: Search from both ends at once (runs on the
+                compact graph); the frontiers are kept in frontier_history
+            days_since_visit: Visit data for the COMPASSION heuristic;
+                defaults to the data given to the constructor
         
         Returns:
             List of location IDs representing the path, or None if no path exists
         """
+        self.frontier_history = None
+        self._prepare_heuristic(heuristic, days_since_visit)
+        
+        # The cache key has no visit data, so compassion routes with data skip it
+        if self.route_cache is not None and not bidirectional and not self._compassion_factors:
+            key = (start_id, goal_id, heuristic, getattr(self.map, 'version', 0))
+            found, path = self.route_cache.get(key)
+            if found:
+                # Nothing was expanded, so there is no search history to show
+                self.search_history = []
+                self.search_stats = {'heuristic': heuristic.value, 'expanded': 0,
+                                     'cache_hit': True}
+                return list(path) if path is not None else None
+            path = self._search_uncached(start_id, goal_id, heuristic, False)
+            self.route_cache.put(key, list(path) if path is not None else None)
+            return path
+        return self._search_uncached(start_id, goal_id, heuristic, bidirectional)
+    
+    def _prepare_heuristic(self, heuristic: HeuristicType,
+                           days_since_visit: Optional[Dict[str, int]]):
+        """Precompute per-search heuristic data (compassion factors)."""
+        if days_since_visit is None:
+            days_since_visit = self.days_since_visit
+        self._compassion_factors = {}
+        if heuristic == HeuristicType.COMPASSION and days_since_visit:
+            # One pass over the residents, then O(1) per expanded node
+            self._compassion_factors = self.map.compassion_factors(days_since_visit)
+    
+    def search_anytime(self, start_id: str, goal_id: str,
+                       heuristic: HeuristicType = HeuristicType.EUCLIDEAN,
+                       deadline: Optional[float] = None,
+                       initial_epsilon: float = 3.0, epsilon_step: float = 0.5,
+                       target_epsilon: float = 1.0,
+                       on_improve: Optional[Callable[[AnytimeSolution], None]] = None,
+                       days_since_visit: Optional[Dict[str, int]] = None) -> List[AnytimeSolution]:
+        """
+        Anytime Repairing A* (ARA*, Likhachev et al. 2003).
+        
+        The first pass is weighted A* with f = g + epsilon * h, which finds
+        a path quickly. Each later pass lowers epsilon and reuses the
+        previous search, re-opening only the nodes whose cost improved
+        (the INCONS list), until the proven bound reaches target_epsilon
+        or the time budget runs out. The first pass always completes, so
+        a reachable goal always yields at least one solution.
+        
+        Args:
+            start_id: Starting location ID
+            goal_id: Goal location ID
+            heuristic: Which heuristic function to use (admissible for
+                the bound to hold)
+            deadline: Time budget in seconds, or None to run to target_epsilon
+            initial_epsilon: Inflation of the first pass
+            epsilon_step: How much epsilon drops per pass
+            target_epsilon: Stop once the proven bound is this tight
+            on_improve: Called with every AnytimeSolution as it is found
+        
+        Returns:
+            The solutions in the order found; the last one is the best
+        """
+        started = time.perf_counter()
+        stop_at = started + deadline if deadline is not None else INF
+        self._prepare_heuristic(heuristic, days_since_visit)
+        estimate = self._id_heuristic(start_id, goal_id, heuristic)
+        if estimate is None:
+            return []
+        
+        # Only a dict map can have edges to undeclared locations
+        locations = getattr(self.map, 'locations', None)
+        h_cache: Dict[str, float] = {}
+        
+        def h(loc_id: str) -> float:
+            if loc_id not in h_cache:
+                h_cache[loc_id] = estimate(loc_id)
+            return h_cache[loc_id]
+        
+        g_scores: Dict[str, float] = {start_id: 0.0}
+        parents: Dict[str, Optional[str]] = {start_id: None}
+        open_keys: Dict[str, float] = {}
+        open_set: List[Tuple[float, str]] = []
+        closed_set: Set[str] = set()
+        incons: Set[str] = set()
+        record = self._expansion_recorder()
+        solutions: List[AnytimeSolution] = []
+        epsilon = initial_epsilon
+        expanded = 0
+        
+        def push(loc_id: str):
+            key = g_scores[loc_id] + epsilon * h(loc_id)
+            open_keys[loc_id] = key
+            heapq.heappush(open_set, (key, loc_id))
+        
+        def improve_path(first_pass: bool) -> bool:
+            """Expand until the goal is settled; False if the deadline hit."""
+            nonlocal expanded
+            while open_set:
+                key, current_id = open_set[0]
+                if open_keys.get(current_id) != key:
+                    heapq.heappop(open_set)  # superseded entry
+                    continue
+                if g_scores.get(goal_id, INF) <= key:  # h(goal) == 0
+                    return True
+                if not first_pass and expanded % 64 == 0 and time.perf_counter() > stop_at:
+                    return False
+                heapq.heappop(open_set)
+                del open_keys[current_id]
+                closed_set.add(current_id)
+                expanded += 1
+                if record is not None:
+                    record(current_id)
+                g = g_scores[current_id]
+                for neighbor_id, edge_cost in self.map.get_neighbors(current_id):
+                    if locations is not None and neighbor_id not in locations:
+                        continue
+                    tentative_g = g + edge_cost
+                    if tentative_g < g_scores.get(neighbor_id, INF):
+                        g_scores[neighbor_id] = tentative_g
+                        parents[neighbor_id] = current_id
+                        if neighbor_id in closed_set:
+                            incons.add(neighbor_id)
+                        else:
+                            push(neighbor_id)
+            return True
+        
+        def proven_bound() -> float:
+            goal_g = g_scores.get(goal_id, INF)
+            lower = min((g_scores[s] + h(s) for s in list(open_keys) + list(incons)),
+                        default=goal_g)
+            if goal_g == INF:
+                return INF
+            return min(epsilon, goal_g / lower) if lower > 0 else epsilon
+        
+        push(start_id)
+        first_pass = True
+        while True:
+            finished = improve_path(first_pass)
+            first_pass = False
+            bound = proven_bound()
+            goal_g = g_scores.get(goal_id, INF)
+            if goal_g < INF:
+                # Closed nodes keep improving without re-expansion, so the
+                # parent chain can already be cheaper than g(goal)
+                path = self._reconstruct_path(parents, goal_id)
+                cost = self._calculate_path_cost(path)
+                if not solutions or cost < solutions[-1].cost or bound < solutions[-1].bound:
+                    solution = AnytimeSolution(
+                        path=path, cost=cost, epsilon=epsilon, bound=bound,
+                        elapsed=time.perf_counter() - started)
+                    solutions.append(solution)
+                    if on_improve is not None:
+                        on_improve(solution)
+            if (not finished or goal_g == INF or bound <= target_epsilon
+                    or time.perf_counter() > stop_at):
+                break
+            
+            # Next pass: tighter epsilon, re-open inconsistent nodes
+            epsilon = max(target_epsilon, epsilon - epsilon_step)
+            reopened = set(open_keys) | incons
+            incons.clear()
+            open_set.clear()
+            for loc_id in reopened:
+                push(loc_id)
+            closed_set.clear()
+        
+        self.search_stats = {
+            'heuristic': heuristic.value,
+            'anytime': True,
+            'expanded': expanded,
+            'passes': len(solutions),
+            'final_epsilon': epsilon
+        }
+        return solutions
+    
+    def _id_heuristic(self, start_id: str, goal_id: str,
+                      heuristic: HeuristicType) -> Optional[Callable[[str], float]]:
+        """
+        h(loc_id) toward goal_id for the string-id searches, on a dict map
+        or a CompactGraph alike; None if either end is not on the map.
+        """
+        if isinstance(self.map, CompactGraph):
+            graph = self.map
+            start, goal = graph.index_of(start_id), graph.index_of(goal_id)
+            if start is None or goal is None:
+                return None
+            estimate = self._compact_heuristic(goal, heuristic)
+            return lambda loc_id: estimate(graph.index_of(loc_id))
+        locations = self.map.locations
+        goal = locations.get(goal_id)
+        if start_id not in locations or goal is None:
+            return None
+        return lambda loc_id: self._calculate_heuristic(locations[loc_id], goal, heuristic)
+    
+    def search_departing(self, start_id: str, goal_id: str, depart: float,
+                         heuristic: HeuristicType = HeuristicType.EUCLIDEAN,
+                         days_since_visit: Optional[Dict[str, int]] = None) -> Optional[List[str]]:
+        """
+        Time-dependent A*: earliest-arrival path when leaving at minute depart.
+        
+        Labels are arrival times and edges cost CommunityMap.travel_time()
+        at the moment they are entered. Because travel_time() is FIFO, the
+        first time the goal is popped its arrival is the earliest possible.
+        The heuristic is scaled by the smallest time factor so it stays
+        admissible. The arrival is left in search_stats['arrive'].
+        
+        Time profiles live on CommunityMap, so a search over a bare
+        CompactGraph raises TypeError.
+        """
+        if not isinstance(self.map, CommunityMap):
+            raise TypeError("search_departing needs a CommunityMap; "
+                            "a CompactGraph has no time profiles")
         start = self.map.locations.get(start_id)
         goal = self.map.locations.get(goal_id)
-        
         if not start or not goal:
             return None
+        self._prepare_heuristic(heuristic, days_since_visit)
+        locations = self.map.locations
+        scale = self.map.min_time_factor()
         
-        # Priority queue: (f_score, node)
-        open_set: List[SearchNode] = []
+        arrivals: Dict[str, float] = {start_id: depart}
+        parents: Dict[str, Optional[str]] = {start_id: None}
         closed_set: Set[str] = set()
+        open_set = [(depart + scale * self._calculate_heuristic(start, goal, heuristic), start_id)]
+        expanded = 0
+        while open_set:
+            _, current_id = heapq.heappop(open_set)
+            if current_id in closed_set:
+                continue
+            if current_id == goal_id:
+                self.search_stats = {'heuristic': heuristic.value, 'expanded': expanded,
+                                     'depart': depart, 'arrive': arrivals[goal_id],
+                                     'duration': arrivals[goal_id] - depart}
+                return self._reconstruct_path(parents, goal_id)
+            closed_set.add(current_id)
+            expanded += 1
+            now = arrivals[current_id]
+            for neighbor_id, _ in self.map.get_neighbors(current_id):
+                if neighbor_id in closed_set or neighbor_id not in locations:
+                    continue
+                arrive = now + self.map.travel_time(current_id, neighbor_id, now)
+                if arrive < arrivals.get(neighbor_id, INF):
+                    arrivals[neighbor_id] = arrive
+                    parents[neighbor_id] = current_id
+                    h = scale * self._calculate_heuristic(locations[neighbor_id], goal, heuristic)
+                    heapq.heappush(open_set, (arrive + h, neighbor_id))
+        
+        self.search_stats = {'heuristic': heuristic.value, 'expanded': expanded,
+                             'depart': depart, 'arrive': None, 'duration': None}
+        return None
+    
+    def best_departure(self, start_id: str, goal_id: str, earliest: float, latest: float,
+                       resolution: float = 1.0,
+                       heuristic: HeuristicType = HeuristicType.EUCLIDEAN) -> Optional[Dict]:
+        """
+        Departure time in [earliest, latest] with the shortest trip.
+        
+        Uses branch and bound instead of one search per minute. With FIFO
+        travel times the arrival A(t) never decreases, so a trip leaving
+        between two probed times a < b takes at least A(a) - b, and never
+        less than the free-flow lower bound. Intervals that cannot beat the
+        best trip found so far are skipped; the rest are bisected down to
+        resolution minutes.
+        
+        Returns:
+            Dict with depart, arrive, duration, path and searches (number
+            of time-dependent searches run), or None if the goal is unreachable
+        """
+        probes: Dict[float, Tuple[Optional[List[str]], float]] = {}
+        
+        def probe(t: float) -> float:
+            if t not in probes:
+                path = self.search_departing(start_id, goal_id, t, heuristic)
+                probes[t] = (path, self.search_stats['arrive'] if path else INF)
+            return probes[t][1]
+        
+        if probe(earliest) == INF:
+            return None
+        # No trip can beat the route where every edge gets its cheapest
+        # factor between the first departure and the last arrival
+        window_end = probe(latest)
+        floor_costs: Dict[str, float] = {start_id: 0.0}
+        frontier = [(0.0, start_id)]
+        while frontier:
+            cost, current_id = heapq.heappop(frontier)
+            if current_id == goal_id:
+                break
+            if cost > floor_costs[current_id]:
+                continue
+            for neighbor_id, edge_cost in self.map.get_neighbors(current_id):
+                factor = self.map.cheapest_factor(current_id, neighbor_id, earliest, window_end)
+                if cost + edge_cost * factor < floor_costs.get(neighbor_id, INF):
+                    floor_costs[neighbor_id] = cost + edge_cost * factor
+                    heapq.heappush(frontier, (cost + edge_cost * factor, neighbor_id))
+        floor = floor_costs[goal_id]
+        
+        best_t = earliest
+        best = probe(earliest) - earliest
+        
+        def consider(t: float):
+            nonlocal best_t, best
+            duration = probe(t) - t
+            if duration < best or (duration == best and t < best_t):
+                best_t, best = t, duration
+        
+        consider(latest)
+        intervals = [(earliest, latest)]
+        while intervals:
+            a, b = intervals.pop()
+            if b - a <= resolution or max(probe(a) - b, floor) >= best:
+                continue
+            mid = a + (b - a) / 2
+            if resolution >= 1:
+                mid = float(round(mid))
+                if mid in (a, b):
+                    continue
+            consider(mid)
+            intervals.append((mid, b))
+            intervals.append((a, mid))
+        
+        path, arrive = probes[best_t]
+        return {
+            'depart': best_t,
+            'arrive': arrive,
+            'duration': best,
+            'path': path,
+            'searches': len(probes)
+        }
+    
+    def _search_uncached(self, start_id: str, goal_id: str, heuristic: HeuristicType,
+                         bidirectional: bool) -> Optional[List[str]]:
+        """Run the search selected by search() without consulting the cache."""
+        if self.compact or bidirectional:
+            graph = self.graph
+            start, goal = graph.index_of(start_id), graph.index_of(goal_id)
+            if start is None or goal is None:
+                return None
+            if bidirectional:
+                nodes = self._search_bidirectional(start, goal, heuristic)
+            else:
+                nodes = self._search_compact(start, goal, heuristic)
+            return [graph.name(n) for n in nodes] if nodes is not None else None
+        
+        start = self.map.locations.get(start_id)
+        goal = self.map.locations.get(goal_id)
         
-        # Initialize with start node
+        if not start or not goal:
+            return None
+        
+        locations = self.map.locations
+        # Priority queue of (f_score, g_score, location id) tuples; the tree
+        # is a parent map, so a push allocates nothing but the tuple
         h_start = self._calculate_heuristic(start, goal, heuristic)
-        start_node = SearchNode(f_score=h_start, location=start, g_score=0)
-        heapq.heappush(open_set, start_node)
+        open_set: List[Tuple[float, float, str]] = [(h_start, 0.0, start_id)]
+        closed_set: Set[str] = set()
+        parents: Dict[str, Optional[str]] = {start_id: None}
         
         # Track best g_score for each location
-        g_scores: Dict[str, float] = {start_id: 0}
+        g_scores: Dict[str, float] = {start_id: 0.0}
         
-        # Track search history for visualization
-        self.search_history = []
+        # Track search history for visualization (optional / capped)
+        record = self._expansion_recorder()
+        stale = 0
         
         while open_set:
-            current = heapq.heappop(open_set)
-            current_id = current.location.id
-            
-            self.search_history.append(current_id)
-            
-            if current_id == goal_id:
-                # Reconstruct path
-                return self._reconstruct_path(current)
+            _, g, current_id = heapq.heappop(open_set)
             
+            # Lazy deletion: entries superseded by a cheaper push are skipped
             if current_id in closed_set:
+                stale += 1
                 continue
             
+            if record is not None:
+                record(current_id)
+            
+            if current_id == goal_id:
+                self._finish_stats(heuristic, len(closed_set), stale)
+                return self._reconstruct_path(parents, goal_id)
+            
             closed_set.add(current_id)
             
             # Explore neighbors
@@ -234,27 +1794,198 @@ class AStarSearch:
                 if neighbor_id in closed_set:
                     continue
                 
-                neighbor = self.map.locations.get(neighbor_id)
+                neighbor = locations.get(neighbor_id)
                 if not neighbor:
                     continue
                 
-                tentative_g = current.g_score + edge_cost
+                tentative_g = g + edge_cost
                 
-                if neighbor_id not in g_scores or tentative_g < g_scores[neighbor_id]:
+                if tentative_g < g_scores.get(neighbor_id, INF):
                     g_scores[neighbor_id] = tentative_g
-                    h = self._calculate_heuristic(neighbor, goal, heuristic)
-                    f = tentative_g + h
-                    
-                    neighbor_node = SearchNode(
-                        f_score=f,
-                        location=neighbor,
-                        g_score=tentative_g,
-                        parent=current
-                    )
-                    heapq.heappush(open_set, neighbor_node)
+                    parents[neighbor_id] = current_id
+                    f = tentative_g + self._calculate_heuristic(neighbor, goal, heuristic)
+                    heapq.heappush(open_set, (f, tentative_g, neighbor_id))
         
+        self._finish_stats(heuristic, len(closed_set), stale)
         return None  # No path found
     
+    def _expansion_recorder(self) -> Optional[Callable[[str], None]]:
+        """
+        Reset search_history and return a callable that records one
+        expansion, or None when neither history nor a callback is wanted.
+        """
+        self.search_history = []
+        history, limit, callback = self.search_history, self.history_limit, self.on_expand
+        if limit == 0 and callback is None:
+            return None
+        
+        def record(loc_id: str):
+            if limit is None or len(history) < limit:
+                history.append(loc_id)
+            if callback is not None:
+                callback(loc_id)
+        return record
+    
+    def _finish_stats(self, heuristic: HeuristicType, expanded: int, stale: int):
+        self.search_stats = {
+            'heuristic': heuristic.value,
+            'expanded': expanded,
+            'stale_skipped': stale,
+            'history_truncated': (self.history_limit is not None
+                                  and expanded > len(self.search_history))
+        }
+    
+    def _search_compact(self, start: int, goal: int,
+                        heuristic: HeuristicType) -> Optional[List[int]]:
+        """
+        A* over the CSR arrays with integer node ids.
+        
+        Heap entries are (f, g, node) tuples and parents live in an int
+        array, so no per-node objects are created.
+        """
+        graph = self.graph
+        offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+        n = graph.node_count
+        estimate = self._compact_heuristic(goal, heuristic)
+        
+        g_scores: Dict[int, float] = {start: 0.0}
+        parents = array('i', [-1]) * n
+        closed = bytearray(n)
+        open_set = [(estimate(start), 0.0, start)]
+        record = self._expansion_recorder()
+        expanded = stale = 0
+        
+        while open_set:
+            _, g, current = heapq.heappop(open_set)
+            if closed[current]:
+                stale += 1
+                continue
+            
+            if record is not None:
+                record(graph.name(current))
+            
+            if current == goal:
+                self._finish_stats(heuristic, expanded, stale)
+                path = [current]
+                while path[-1] != start:
+                    path.append(parents[path[-1]])
+                return path[::-1]
+            
+            closed[current] = 1
+            expanded += 1
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                if closed[neighbor]:
+                    continue
+                tentative_g = g + costs[k]
+                if tentative_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    f = tentative_g + estimate(neighbor)
+                    heapq.heappush(open_set, (f, tentative_g, neighbor))
+        
+        self._finish_stats(heuristic, expanded, stale)
+        return None
+    
+    def _search_bidirectional(self, start: int, goal: int,
+                              heuristic: HeuristicType) -> Optional[List[int]]:
+        """
+        Bidirectional A*: forward from start, backward from goal over the
+        reversed arcs, expanding whichever side has the smaller open list.
+        
+        mu is the cheapest start-goal path seen where the two searches touch.
+        The search stops as soon as either side's smallest f reaches mu: with
+        a consistent heuristic no unexpanded path on that side can beat it.
+        """
+        graph = self.graph
+        n = graph.node_count
+        graphs = (graph, graph.reversed())
+        estimates = (self._compact_heuristic(goal, heuristic),
+                     self._compact_heuristic(start, heuristic, backward=True))
+        g_scores: Tuple[Dict[int, float], Dict[int, float]] = ({start: 0.0}, {goal: 0.0})
+        parents = (array('i', [-1]) * n, array('i', [-1]) * n)
+        closed = (bytearray(n), bytearray(n))
+        open_sets = ([(estimates[0](start), 0.0, start)],
+                     [(estimates[1](goal), 0.0, goal)])
+        frontiers: Tuple[List[str], List[str]] = ([], [])
+        record = self._expansion_recorder()
+        
+        mu, meeting = (0.0, start) if start == goal else (INF, -1)
+        
+        while open_sets[0] and open_sets[1]:
+            if open_sets[0][0][0] >= mu or open_sets[1][0][0] >= mu:
+                break
+            
+            side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+            other = 1 - side
+            _, g, current = heapq.heappop(open_sets[side])
+            if closed[side][current]:
+                continue
+            closed[side][current] = 1
+            
+            name = graph.name(current)
+            frontiers[side].append(name)
+            if record is not None:
+                record(name)
+            
+            side_graph = graphs[side]
+            for k in range(side_graph.offsets[current], side_graph.offsets[current + 1]):
+                neighbor = side_graph.targets[k]
+                if closed[side][neighbor]:
+                    continue
+                tentative_g = g + side_graph.costs[k]
+                if tentative_g < g_scores[side].get(neighbor, INF):
+                    g_scores[side][neighbor] = tentative_g
+                    parents[side][neighbor] = current
+                    f = tentative_g + estimates[side](neighbor)
+                    heapq.heappush(open_sets[side], (f, tentative_g, neighbor))
+                    
+                    other_g = g_scores[other].get(neighbor)
+                    if other_g is not None and tentative_g + other_g < mu:
+                        mu, meeting = tentative_g + other_g, neighbor
+        
+        self.frontier_history = {'forward': frontiers[0], 'backward': frontiers[1]}
+        self.search_stats = {
+            'heuristic': heuristic.value,
+            'bidirectional': True,
+            'expanded': len(frontiers[0]) + len(frontiers[1]),
+            'forward_expanded': len(frontiers[0]),
+            'backward_expanded': len(frontiers[1]),
+            'meeting': graph.name(meeting) if meeting >= 0 else None
+        }
+        if meeting < 0:
+            return None
+        
+        path = [meeting]
+        while path[-1] != start:
+            path.append(parents[0][path[-1]])
+        path.reverse()
+        while path[-1] != goal:
+            path.append(parents[1][path[-1]])
+        return path
+    
+    def _compact_heuristic(self, goal: int, heuristic: HeuristicType, backward: bool = False):
+        """
+        Return h(node) for integer nodes and a fixed goal.
+        
+        With backward=True, h bounds d(goal, node) instead, for a search
+        over the reversed arcs that starts at the goal (the two differ on
+        one-way streets).
+        """
+        if heuristic == HeuristicType.LANDMARK:
+            landmarks = self._landmark_index()
+            if backward:
+                return lambda node: landmarks.lower_bound(goal, node)
+            return lambda node: landmarks.lower_bound(node, goal)
+        graph = self.graph
+        if heuristic == HeuristicType.COMPASSION and self._compassion_factors:
+            factors = self._compassion_factors
+            if not isinstance(self.map, CompactGraph):
+                factors = {graph.index_of(loc_id): f for loc_id, f in factors.items()}
+            return lambda node: graph.distance(node, goal, heuristic) * factors.get(node, 1.0)
+        return lambda node: graph.distance(node, goal, heuristic)
+    
     def _calculate_heuristic(self, loc: Location, goal: Location, 
                              heuristic: HeuristicType) -> float:
         """Calculate heuristic value based on selected type."""
@@ -262,19 +1993,25 @@ class AStarSearch:
             return self.map.manhattan_distance(loc, goal)
         elif heuristic == HeuristicType.EUCLIDEAN:
             return self.map.euclidean_distance(loc, goal)
-        else:  # COMPASSION
-            return self.map.compassion_heuristic(loc, goal, {})
+        elif heuristic == HeuristicType.LANDMARK:
+            graph = self.graph
+            return self._landmark_index().lower_bound(
+                graph.index_of(loc.id), graph.index_of(goal.id))
+        else:  # COMPASSION, with factors precomputed by search()
+            return (self.map.euclidean_distance(loc, goal)
+                    * self._compassion_factors.get(loc.id, 1.0))
     
-    def _reconstruct_path(self, node: SearchNode) -> List[str]:
-        """Reconstruct path from goal node to start."""
+    def _reconstruct_path(self, parents: Dict[str, Optional[str]], goal_id: str) -> List[str]:
+        """Reconstruct path from goal to start by following parent links."""
         path = []
-        current = node
-        while current:
-            path.append(current.location.id)
-            current = current.parent
+        current = goal_id
+        while current is not None:
+            path.append(current)
+            current = parents[current]
         return list(reversed(path))
     
-    def compare_paths(self, start_id: str, goal_id: str) -> Dict:
+    def compare_paths(self, start_id: str, goal_id: str,
+                      days_since_visit: Optional[Dict[str, int]] = None) -> Dict:
         """
         Compare optimal path vs compassionate detour.
         
@@ -283,7 +2020,8 @@ class AStarSearch:
         "The shortest path isn't always the best path"
         """
         optimal_path = self.search(start_id, goal_id, HeuristicType.EUCLIDEAN)
-        compassion_path = self.search(start_id, goal_id, HeuristicType.COMPASSION)
+        compassion_path = self.search(start_id, goal_id, HeuristicType.COMPASSION,
+                                      days_since_visit=days_since_visit)
         
         return {
             'optimal': {
@@ -300,30 +2038,749 @@ class AStarSearch:
             }
         }
     
+    MATRIX_ARRAY_THRESHOLD = 10_000  # cells; larger matrices come back as NumPy
+    
+    def cost_matrix(self, source_ids: List[str], target_ids: Optional[List[str]] = None,
+                    with_paths: bool = False, as_array: Optional[bool] = None) -> Dict:
+        """
+        Travel costs from every source to every target.
+        
+        Instead of N x M independent searches this runs one Dijkstra per
+        source (stopping once every target is settled), or, when there are
+        fewer targets than sources, one per target over the reversed arcs.
+        
+        Args:
+            source_ids: Volunteer bases (rows)
+            target_ids: Destinations (columns); defaults to every location
+                with has_resident=True
+            with_paths: Also return paths[i][j] (None when unreachable)
+            as_array: Return costs as a NumPy array; by default only when
+                NumPy is installed and the matrix is large
+        
+        Returns:
+            Dict with 'sources', 'targets', 'costs' (inf when unreachable)
+            and 'paths' (None unless with_paths)
+        """
+        graph = self.graph
+        if target_ids is None:
+            target_ids = [graph.name(v) for v in range(graph.node_count) if graph.resident[v]]
+        sources = [graph.index_of(loc_id) for loc_id in source_ids]
+        targets = [graph.index_of(loc_id) for loc_id in target_ids]
+        for loc_id, node in zip(list(source_ids) + list(target_ids), sources + targets):
+            if node is None:
+                raise KeyError(f"Unknown location: {loc_id}")
+        
+        costs = [[INF] * len(targets) for _ in sources]
+        paths = [[None] * len(targets) for _ in sources] if with_paths else None
+        
+        if len(targets) < len(sources):
+            # Backward trees: parent[] points one hop closer to the target
+            reverse = graph.reversed()
+            source_set = set(sources)
+            for j, target in enumerate(targets):
+                dist, parent = _shortest_path_tree(reverse, target, source_set)
+                for i, source in enumerate(sources):
+                    costs[i][j] = dist[source]
+                    if with_paths and dist[source] < INF:
+                        node, path = source, [source]
+                        while node != target:
+                            node = parent[node]
+                            path.append(node)
+                        paths[i][j] = [graph.name(v) for v in path]
+        else:
+            target_set = set(targets)
+            for i, source in enumerate(sources):
+                dist, parent = _shortest_path_tree(graph, source, target_set)
+                for j, target in enumerate(targets):
+                    costs[i][j] = dist[target]
+                    if with_paths and dist[target] < INF:
+                        node, path = target, [target]
+                        while node != source:
+                            node = parent[node]
+                            path.append(node)
+                        paths[i][j] = [graph.name(v) for v in reversed(path)]
+        
+        if as_array is None:
+            as_array = np is not None and len(sources) * len(targets) >= self.MATRIX_ARRAY_THRESHOLD
+        if as_array:
+            if np is None:
+                raise ImportError("cost_matrix(as_array=True) requires NumPy")
+            costs = np.array(costs, dtype=float).reshape(len(sources), len(targets))
+        
+        return {
+            'sources': list(source_ids),
+            'targets': list(target_ids),
+            'costs': costs,
+            'paths': paths
+        }
+    
+    def landmark_report(self, start_id: str, goal_id: str,
+                        baseline: HeuristicType = HeuristicType.EUCLIDEAN) -> Dict:
+        """
+        Compare expanded nodes of the landmark heuristic against a baseline.
+        
+        The last search (and its search_history) is the landmark one.
+        """
+        self.search(start_id, goal_id, baseline)
+        baseline_expanded = self.search_stats['expanded']
+        path = self.search(start_id, goal_id, HeuristicType.LANDMARK)
+        landmark_expanded = self.search_stats['expanded']
+        reduction = (1 - landmark_expanded / baseline_expanded) if baseline_expanded else 0.0
+        report = {
+            'baseline': baseline.value,
+            'baseline_expanded': baseline_expanded,
+            'landmark_expanded': landmark_expanded,
+            'reduction': reduction,
+            'path': path
+        }
+        self.search_stats['landmark_report'] = report
+        return report
+    
     def _calculate_path_cost(self, path: List[str]) -> float:
-        """Calculate total cost of a path."""
+        """Calculate total cost of a path (hops with no edge add nothing)."""
         if not path or len(path) < 2:
             return 0
         
         total = 0
-        for i in range(len(path) - 1):
-            for neighbor_id, cost in self.map.get_neighbors(path[i]):
-                if neighbor_id == path[i + 1]:
-                    total += cost
-                    break
+        for loc1_id, loc2_id in zip(path, path[1:]):
+            cost = self.map.edge_cost(loc1_id, loc2_id)
+            if cost is not None:
+                total += cost
         return total
     
+    def score_paths(self, paths: List[Optional[List[str]]],
+                    as_array: Optional[bool] = None) -> Dict:
+        """
+        Total cost of many candidate paths in one pass.
+        
+        Every hop is looked up in the compact graph's sorted arc table;
+        with NumPy the lookups and per-path sums are vectorized
+        (searchsorted + bincount), otherwise each hop is one bisect.
+        
+        Args:
+            paths: Candidate routes as location id lists (None counts as
+                unreachable)
+            as_array: Return costs as a NumPy array; by default only when
+                NumPy is installed and there are many paths
+        
+        Returns:
+            Dict with 'costs' (inf for a path with a missing edge or None)
+            and 'missing', a list of (path_index, from_id, to_id) for every
+            hop that has no edge
+        """
+        graph = self.graph
+        n = graph.node_count
+        names = set(chain.from_iterable(path for path in paths if path))
+        nodes: Dict[str, int] = {}
+        for loc_id in names:
+            node = graph.index_of(loc_id)
+            nodes[loc_id] = -1 if node is None else node
+        
+        missing: List[Tuple[int, str, str]] = []
+        if np is not None:
+            keys, arc_costs = graph.arc_table()
+            keys = np.frombuffer(keys, dtype=np.int64) if len(keys) else np.zeros(0, np.int64)
+            arc_costs = np.frombuffer(arc_costs, dtype=float) if len(arc_costs) else np.zeros(0)
+            lengths = np.fromiter((len(path or ()) for path in paths), np.int64, len(paths))
+            flat = np.fromiter(map(nodes.__getitem__, chain.from_iterable(
+                path for path in paths if path)), np.int64, int(lengths.sum()))
+            # A hop joins flat[i] and flat[i + 1] unless i is the end of a path
+            hop_start = np.ones(max(len(flat) - 1, 0), dtype=bool)
+            path_ends = np.cumsum(lengths) - 1
+            hop_start[path_ends[(path_ends >= 0) & (path_ends < len(hop_start))]] = False
+            first = np.nonzero(hop_start)[0]
+            hop_path = np.repeat(np.arange(len(paths)), np.maximum(lengths - 1, 0))
+            u, v = flat[first], flat[first + 1]
+            hop_keys = np.where((u >= 0) & (v >= 0), u * n + v, -1)
+            pos = np.minimum(np.searchsorted(keys, hop_keys), max(len(keys) - 1, 0))
+            found = (keys[pos] == hop_keys) if len(keys) else np.zeros(len(hop_keys), bool)
+            hop_costs = np.where(found, arc_costs[pos] if len(keys) else 0.0, np.inf)
+            costs = np.bincount(hop_path, weights=hop_costs, minlength=len(paths))
+            costs[np.fromiter((path is None for path in paths), bool, len(paths))] = np.inf
+            offsets = np.cumsum(lengths) - lengths
+            for k in np.nonzero(~found)[0]:
+                p = int(hop_path[k])
+                i = int(first[k] - offsets[p])
+                missing.append((p, paths[p][i], paths[p][i + 1]))
+        else:
+            costs = []
+            for p, path in enumerate(paths):
+                if path is None:
+                    costs.append(INF)
+                    continue
+                total = 0.0
+                for loc1_id, loc2_id in zip(path, path[1:]):
+                    u, v = nodes[loc1_id], nodes[loc2_id]
+                    cost = graph.arc_cost(u, v) if u >= 0 and v >= 0 else None
+                    if cost is None:
+                        missing.append((p, loc1_id, loc2_id))
+                        cost = INF
+                    total += cost
+                costs.append(total)
+        
+        if as_array is None:
+            as_array = np is not None and len(paths) >= self.MATRIX_ARRAY_THRESHOLD
+        if as_array:
+            if np is None:
+                raise ImportError("score_paths(as_array=True) requires NumPy")
+            costs = np.asarray(costs, dtype=float)
+        elif np is not None:
+            costs = costs.tolist()
+        
+        return {
+            'costs': costs,
+            'missing': missing
+        }
+    
     def export_search_visualization(self) -> str:
         """Export search history for frontend visualization."""
-        return json.dumps({
-            'history': self.search_history,
-            'locations': {
+        if isinstance(self.map, CompactGraph):
+            # No display names on a bare graph: only the visited nodes are listed
+            graph = self.map
+            visited = {loc_id: graph.index_of(loc_id) for loc_id in set(self.search_history)}
+            locations = {
+                loc_id: {'x': graph.xs[node], 'y': graph.ys[node], 'name': loc_id}
+                for loc_id, node in visited.items()
+            }
+        else:
+            locations = {
                 loc_id: {'x': loc.x, 'y': loc.y, 'name': loc.name_zh}
                 for loc_id, loc in self.map.locations.items()
             }
+        return json.dumps({
+            'history': self.search_history,
+            'frontiers': self.frontier_history,
+            'stats': self.search_stats,
+            'locations': locations
         }, ensure_ascii=False, indent=2)
 
 
+class DStarLitePlanner:
+    """
+    Incremental replanning with D* Lite (Koenig & Likhachev, 2002).
+    
+    The planner searches backward from the goal and keeps g/rhs values and
+    its priority queue between calls. When a road closes or gets slower
+    (CommunityMap.remove_edge / update_edge_cost) only the two endpoints
+    are re-examined, and the repair spreads only as far as the changed
+    costs matter; as the volunteer moves, the key modifier km keeps the
+    old queue entries valid instead of rebuilding them.
+    
+    Usage:
+        planner = DStarLitePlanner(community, 'start', 'chen')
+        path = planner.plan()
+        planner.move_to(path[1])
+        community.remove_edge('park', 'clinic')   # road closure
+        path = planner.plan()                     # repaired, not restarted
+        planner.close()                           # detach from the map
+    """
+    
+    def __init__(self, community_map: CommunityMap, start_id: str, goal_id: str,
+                 heuristic: HeuristicType = HeuristicType.EUCLIDEAN):
+        if heuristic == HeuristicType.LANDMARK:
+            # Landmark tables are computed for the old costs and go stale
+            raise ValueError("DStarLitePlanner needs a coordinate heuristic")
+        self.map = community_map
+        self.start = start_id
+        self.goal = goal_id
+        self.heuristic = heuristic
+        self.km = 0.0
+        self.g: Dict[str, float] = {}
+        self.rhs: Dict[str, float] = {goal_id: 0.0}
+        self._open: Dict[str, Tuple[float, float]] = {}
+        self._queue: List[Tuple[Tuple[float, float], str]] = []
+        self._pending: List[Tuple[str, str]] = []
+        self.last_expanded = 0
+        self.total_expanded = 0
+        self._push(goal_id)
+        community_map.add_edge_listener(self._on_edge_changed)
+    
+    def _h(self, loc1_id: str, loc2_id: str) -> float:
+        loc1, loc2 = self.map.locations[loc1_id], self.map.locations[loc2_id]
+        if self.heuristic == HeuristicType.MANHATTAN:
+            return self.map.manhattan_distance(loc1, loc2)
+        elif self.heuristic == HeuristicType.EUCLIDEAN:
+            return self.map.euclidean_distance(loc1, loc2)
+        return self.map.compassion_heuristic(loc1, loc2, {})
+    
+    def _key(self, loc_id: str) -> Tuple[float, float]:
+        best = min(self.g.get(loc_id, INF), self.rhs.get(loc_id, INF))
+        return (best + self._h(self.start, loc_id) + self.km, best)
+    
+    def _push(self, loc_id: str):
+        key = self._key(loc_id)
+        self._open[loc_id] = key
+        heapq.heappush(self._queue, (key, loc_id))
+    
+    def _update_vertex(self, loc_id: str):
+        if loc_id != self.goal:
+            self.rhs[loc_id] = min(
+                (cost + self.g.get(n, INF) for n, cost in self.map.get_neighbors(loc_id)),
+                default=INF)
+        if self.g.get(loc_id, INF) != self.rhs.get(loc_id, INF):
+            self._push(loc_id)
+        else:
+            self._open.pop(loc_id, None)  # its heap entry is now stale
+    
+    def _compute_shortest_path(self):
+        expanded = 0
+        while self._queue:
+            k_old, u = self._queue[0]
+            if self._open.get(u) != k_old:
+                heapq.heappop(self._queue)
+                continue
+            if not (k_old < self._key(self.start)
+                    or self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+                break
+            heapq.heappop(self._queue)
+            del self._open[u]
+            expanded += 1
+            
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for n, _ in self.map.get_neighbors(u):
+                    self._update_vertex(n)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for n, _ in self.map.get_neighbors(u):
+                    self._update_vertex(n)
+        self.last_expanded = expanded
+        self.total_expanded += expanded
+    
+    def _on_edge_changed(self, loc1_id: str, loc2_id: str,
+                         old_cost: Optional[float], new_cost: Optional[float]):
+        self._pending.append((loc1_id, loc2_id))
+    
+    def close(self):
+        """Stop listening for edge changes; the planner can no longer repair."""
+        self.map.remove_edge_listener(self._on_edge_changed)
+    
+    def move_to(self, loc_id: str):
+        """Record that the volunteer has moved to loc_id."""
+        self.km += self._h(self.start, loc_id)
+        self.start = loc_id
+    
+    def plan(self) -> Optional[List[str]]:
+        """
+        Current best path from the volunteer's position to the goal,
+        repairing the search tree for any edges changed since last call.
+        """
+        for loc1_id, loc2_id in self._pending:
+            self._update_vertex(loc1_id)
+            self._update_vertex(loc2_id)
+        self._pending = []
+        self._compute_shortest_path()
+        
+        if self.g.get(self.start, INF) == INF:
+            return None
+        path = [self.start]
+        while path[-1] != self.goal and len(path) <= len(self.map.locations):
+            path.append(min(self.map.get_neighbors(path[-1]),
+                            key=lambda nc: nc[1] + self.g.get(nc[0], INF))[0])
+        return path if path[-1] == self.goal else None
+
+
+class TourPlanner:
+    """
+    Multi-stop delivery tours over resident homes.
+    
+    A shift starts at a depot (usually the Tzu Chi Center), visits every
+    stop once and, by default, returns. The planner works on a pairwise
+    cost matrix from AStarSearch.cost_matrix(): small stop sets are solved
+    exactly with Held-Karp dynamic programming, larger ones with a
+    nearest-neighbor tour improved by 2-opt and Or-opt moves. Each leg is
+    then expanded back into a street path.
+    
+    With days_since_visit, residents not visited for urgent_after_days or
+    more are served first, and each group is optimized on its own.
+    """
+    
+    EXACT_LIMIT = 10        # stops per group solved with Held-Karp
+    MAX_PASSES = 50         # local-search improvement rounds
+    
+    def __init__(self, search: AStarSearch):
+        self.search = search
+    
+    def plan(self, depot_id: str, stop_ids: List[str],
+             days_since_visit: Optional[Dict[str, int]] = None,
+             urgent_after_days: int = 7, return_to_depot: bool = True,
+             matrix: Optional[Dict] = None) -> Dict:
+        """
+        Plan a visiting order and the stitched street path.
+        
+        Args:
+            depot_id: Where the shift starts (and ends)
+            stop_ids: Resident location ids to visit
+            days_since_visit: Optional priorities; urgent residents go first
+            urgent_after_days: Days without a visit that make a stop urgent
+            return_to_depot: Close the tour at the depot
+            matrix: A cost_matrix() result covering the depot and the stops,
+                to reuse across plans
+        
+        Returns:
+            Dict with 'order', 'path', 'cost', 'method' and 'unreachable'
+        """
+        stops = list(dict.fromkeys(s for s in stop_ids if s != depot_id))
+        ids = [depot_id] + stops
+        if matrix is None:
+            matrix = self.search.cost_matrix(ids, ids, as_array=False)
+        position = {loc_id: i for i, loc_id in enumerate(matrix['sources'])}
+        column = {loc_id: j for j, loc_id in enumerate(matrix['targets'])}
+        costs = [[float(matrix['costs'][position[a]][column[b]]) for b in ids] for a in ids]
+        
+        reachable = [i for i in range(1, len(ids))
+                     if costs[0][i] < INF and costs[i][0] < INF]
+        unreachable = [ids[i] for i in range(1, len(ids)) if i not in set(reachable)]
+        
+        days_since_visit = days_since_visit or {}
+        urgent = [i for i in reachable if days_since_visit.get(ids[i], 0) >= urgent_after_days]
+        routine = [i for i in reachable if days_since_visit.get(ids[i], 0) < urgent_after_days]
+        
+        order: List[int] = []
+        methods = set()
+        current = 0
+        groups = [group for group in (urgent, routine) if group]
+        for g, group in enumerate(groups):
+            end = 0 if (return_to_depot and g == len(groups) - 1) else None
+            visit, method = self._solve_path(costs, current, group, end)
+            order.extend(visit)
+            methods.add(method)
+            current = visit[-1]
+        
+        legs = [0] + order + ([0] if return_to_depot and order else [])
+        total = sum(costs[a][b] for a, b in zip(legs, legs[1:]))
+        return {
+            'order': [ids[i] for i in order],
+            'path': self._stitch([ids[i] for i in legs]),
+            'cost': total,
+            'method': '+'.join(sorted(methods)) or 'empty',
+            'unreachable': unreachable
+        }
+    
+    def _solve_path(self, costs: List[List[float]], start: int, nodes: List[int],
+                    end: Optional[int]) -> Tuple[List[int], str]:
+        """
+        Order nodes for a path start -> nodes -> end (open if end is None).
+        
+        Works on a local matrix where index 0 is start, 1..k the nodes and
+        k + 1 the end; an open end is a dummy with zero cost to everything.
+        """
+        k = len(nodes)
+        members = [start] + nodes
+        local = [[costs[a][b] for b in members] + [costs[a][end] if end is not None else 0.0]
+                 for a in members]
+        local.append([costs[end][b] if end is not None else 0.0 for b in members] + [0.0])
+        
+        if k <= self.EXACT_LIMIT:
+            route, method = self._held_karp(local, k), 'exact'
+        else:
+            route = self._nearest_neighbor(local, k)
+            self._improve(local, route)
+            method = 'heuristic'
+        return [nodes[i - 1] for i in route[1:-1]], method
+    
+    @staticmethod
+    def _held_karp(c: List[List[float]], k: int) -> List[int]:
+        """Exact shortest Hamiltonian path 0 -> {1..k} -> k + 1."""
+        end = k + 1
+        full = (1 << k) - 1
+        best: Dict[Tuple[int, int], Tuple[float, int]] = {}
+        for j in range(k):
+            best[(1 << j, j)] = (c[0][j + 1], -1)
+        for mask in range(1, full + 1):
+            for j in range(k):
+                if not mask & (1 << j) or (mask, j) not in best:
+                    continue
+                cost_j = best[(mask, j)][0]
+                for nxt in range(k):
+                    if mask & (1 << nxt):
+                        continue
+                    key = (mask | (1 << nxt), nxt)
+                    cost = cost_j + c[j + 1][nxt + 1]
+                    if key not in best or cost < best[key][0]:
+                        best[key] = (cost, j)
+        last = min(range(k), key=lambda j: best[(full, j)][0] + c[j + 1][end])
+        route, mask = [], full
+        while last >= 0:
+            route.append(last + 1)
+            mask, last = mask & ~(1 << last), best[(mask, last)][1]
+        return [0] + route[::-1] + [end]
+    
+    @staticmethod
+    def _nearest_neighbor(c: List[List[float]], k: int) -> List[int]:
+        route = [0]
+        left = set(range(1, k + 1))
+        while left:
+            here = route[-1]
+            nxt = min(left, key=lambda j: c[here][j])
+            route.append(nxt)
+            left.remove(nxt)
+        return route + [k + 1]
+    
+    def _improve(self, c: List[List[float]], route: List[int]):
+        """2-opt and Or-opt (segments of 1-3 stops) until no move helps."""
+        n = len(route)
+        eps = 1e-9
+        symmetric = all(c[a][b] == c[b][a] for a in range(n) for b in range(a))
+        for _ in range(self.MAX_PASSES):
+            improved = False
+            if symmetric:
+                # 2-opt: reverse route[i..j]; the endpoints stay fixed
+                for i in range(1, n - 2):
+                    for j in range(i + 1, n - 1):
+                        a, b, x, y = route[i - 1], route[i], route[j], route[j + 1]
+                        if c[a][x] + c[b][y] - c[a][b] - c[x][y] < -eps:
+                            route[i:j + 1] = route[i:j + 1][::-1]
+                            improved = True
+            # Or-opt: move a short segment between two other neighbors
+            for length in (1, 2, 3):
+                i = 1
+                while i + length < n:
+                    first, last = route[i], route[i + length - 1]
+                    prev, nxt = route[i - 1], route[i + length]
+                    gain = c[prev][first] + c[last][nxt] - c[prev][nxt]
+                    for j in range(n - 1):
+                        if i - 1 <= j < i + length:
+                            continue
+                        a, b = route[j], route[j + 1]
+                        if c[a][first] + c[last][b] - c[a][b] - gain < -eps:
+                            segment = route[i:i + length]
+                            del route[i:i + length]
+                            at = j + 1 if j < i else j + 1 - length
+                            route[at:at] = segment
+                            improved = True
+                            break
+                    i += 1
+            if not improved:
+                break
+    
+    def _stitch(self, legs: List[str]) -> List[str]:
+        """Expand the visiting order into one street-level path."""
+        graph = self.search.graph
+        path = legs[:1]
+        for a, b in zip(legs, legs[1:]):
+            source, target = graph.index_of(a), graph.index_of(b)
+            _, parent = _shortest_path_tree(graph, source, {target})
+            leg = [target]
+            while leg[-1] != source:
+                leg.append(parent[leg[-1]])
+            path.extend(graph.name(v) for v in reversed(leg[:-1]))
+        return path
+
+
+class MultiVolunteerPlanner:
+    """
+    Conflict-aware routes for many volunteers leaving together.
+    
+    Uses prioritized planning (cooperative A*, Silver 2005): volunteers
+    are routed one at a time in space-time, and every finished route
+    reserves the locations and streets it occupies tick by tick. Later
+    volunteers route around those reservations or wait. A location holds
+    location_capacity volunteers per tick (depots are unlimited) and a
+    street holds street_capacity per tick in both directions together,
+    which also rules out two volunteers swapping along one street.
+    
+    Conflict-based search would find optimal joint plans, but it branches
+    on every conflict and does not scale to 50+ volunteers; prioritized
+    planning costs about one space-time A* per volunteer.
+    """
+    
+    def __init__(self, search: AStarSearch, tick: float = 1.0,
+                 location_capacity: int = 1, street_capacity: int = 1,
+                 depots: Iterable[str] = ('start',)):
+        self.search = search
+        self.tick = tick
+        self.location_capacity = location_capacity
+        self.street_capacity = street_capacity
+        self.graph = search.graph
+        self.depots = {node for node in map(self.graph.index_of, depots) if node is not None}
+        # Travel time of every arc in whole ticks (at least one)
+        self.ticks = array('i', (max(1, -int(-cost // tick)) for cost in self.graph.costs))
+        self._tick_distances: Dict[int, array] = {}
+    
+    def plan(self, assignments: Dict[str, str], start_id: str = 'start',
+             dwell: int = 1, horizon: Optional[int] = None) -> Dict:
+        """
+        Route every volunteer from start_id to their assigned home.
+        
+        Volunteers with the longest trips are planned first. Each one
+        occupies its home for dwell ticks on arrival and then leaves the
+        map.
+        
+        Args:
+            assignments: Volunteer name -> goal location id
+            start_id: Where everyone sets off at tick 0; unless it is a
+                depot it holds at most location_capacity volunteers, and
+                the rest are left unplanned
+            dwell: Ticks spent at the goal (delivering)
+            horizon: Latest tick a route may use; by default twice the
+                longest trip plus room for everyone to queue
+        
+        Returns:
+            Dict with per-volunteer 'volunteers' (goal, path, times of
+            arrival at each path entry, depart, arrival, waits,
+            conflicts_resolved, planning_ms), 'makespan',
+            'conflicts_resolved', 'planning_seconds' and 'unplanned'
+        """
+        started = time.perf_counter()
+        graph = self.graph
+        start = graph.index_of(start_id)
+        if start is None:
+            raise KeyError(f"Unknown location: {start_id}")
+        goals = {}
+        for name, goal_id in assignments.items():
+            goal = graph.index_of(goal_id)
+            if goal is None:
+                raise KeyError(f"Unknown location: {goal_id}")
+            goals[name] = goal
+        
+        reserved: Dict[Tuple, int] = {}
+        results: Dict[str, Dict] = {}
+        unplanned: List[str] = []
+        order = sorted(goals, key=lambda name: (-self._distances(goals[name])[start], name))
+        for name in order:
+            agent_started = time.perf_counter()
+            goal = goals[name]
+            distances = self._distances(goal)
+            limit = horizon
+            if limit is None:
+                limit = 2 * int(distances[start]) + len(goals) * (dwell + 1) + 10
+            
+            # What an uncoordinated volunteer would have collided with
+            alone = self._plan_one(start, goal, distances, dwell, limit, None)
+            conflicts = self._count_conflicts(alone, goal, dwell, reserved) if alone else 0
+            route = self._plan_one(start, goal, distances, dwell, limit, reserved)
+            if route is None:
+                unplanned.append(name)
+            else:
+                self._reserve(route, goal, dwell, reserved)
+            
+            path, times = [], []
+            for node, t in route or ():
+                if not path or path[-1] != graph.name(node):
+                    path.append(graph.name(node))
+                    times.append(t)
+            results[name] = {
+                'goal': assignments[name],
+                'path': path or None,
+                'times': times,
+                'depart': next((t for (node, t), (after, _) in zip(route, route[1:])
+                                if after != node), 0) if route else None,
+                'arrival': route[-1][1] if route else None,
+                'waits': (len(route) - 1) - (len(path) - 1) if route else 0,
+                'conflicts_resolved': conflicts,
+                'planning_ms': (time.perf_counter() - agent_started) * 1000
+            }
+        
+        arrivals = [r['arrival'] for r in results.values() if r['arrival'] is not None]
+        return {
+            'volunteers': {name: results[name] for name in assignments},
+            'makespan': max(arrivals) + dwell if arrivals else 0,
+            'conflicts_resolved': sum(r['conflicts_resolved'] for r in results.values()),
+            'planning_seconds': time.perf_counter() - started,
+            'unplanned': unplanned
+        }
+    
+    def _distances(self, goal: int) -> array:
+        """Exact tick distance from every node to goal (cached per goal)."""
+        if goal not in self._tick_distances:
+            reverse = self.graph.reversed()
+            ticks = array('i', (max(1, -int(-cost // self.tick)) for cost in reverse.costs))
+            dist = array('d', [INF]) * reverse.node_count
+            dist[goal] = 0.0
+            heap = [(0.0, goal)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for k in reverse.arcs(u):
+                    v = reverse.targets[k]
+                    if d + ticks[k] < dist[v]:
+                        dist[v] = d + ticks[k]
+                        heapq.heappush(heap, (dist[v], v))
+            self._tick_distances[goal] = dist
+        return self._tick_distances[goal]
+    
+    def _location_free(self, node: int, t: int, reserved: Optional[Dict]) -> bool:
+        return (reserved is None or node in self.depots
+                or reserved.get(('loc', node, t), 0) < self.location_capacity)
+    
+    def _street_free(self, u: int, v: int, t: int, reserved: Optional[Dict]) -> bool:
+        return (reserved is None
+                or reserved.get(('street', min(u, v), max(u, v), t), 0) < self.street_capacity)
+    
+    def _plan_one(self, start: int, goal: int, distances: array, dwell: int,
+                  horizon: int, reserved: Optional[Dict]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Space-time A* over (node, tick) states; None if no route fits.
+        
+        Moves take ticks[k]; waiting takes one tick. Returns the visited
+        (node, tick) states, waits included.
+        """
+        graph = self.graph
+        # The start is held at tick 0 like any other location unless it is a depot
+        if distances[start] == INF or not self._location_free(start, 0, reserved):
+            return None
+        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {(start, 0): None}
+        closed: Set[Tuple[int, int]] = set()
+        open_set = [(distances[start], 0, start)]
+        while open_set:
+            _, t, u = heapq.heappop(open_set)
+            if (u, t) in closed:
+                continue
+            closed.add((u, t))
+            if u == goal and all(self._location_free(goal, t + i, reserved)
+                                 for i in range(1, dwell)):
+                route, state = [], (u, t)
+                while state is not None:
+                    route.append(state)
+                    state = parents[state]
+                return list(reversed(route))
+            if t >= horizon:
+                continue
+            moves = [(u, 1)] + [(graph.targets[k], self.ticks[k]) for k in graph.arcs(u)]
+            for v, duration in moves:
+                arrive = t + duration
+                if (v, arrive) in closed or (v, arrive) in parents or distances[v] == INF:
+                    continue
+                if not self._location_free(v, arrive, reserved):
+                    continue
+                if v != u and not all(self._street_free(u, v, t + i, reserved)
+                                      for i in range(duration)):
+                    continue
+                parents[(v, arrive)] = (u, t)
+                heapq.heappush(open_set, (arrive + distances[v], arrive, v))
+        return None
+    
+    def _occupancy(self, route: List[Tuple[int, int]], goal: int, dwell: int) -> List[Tuple]:
+        """Reservation keys a route uses, one per location/street tick."""
+        keys = [('loc', node, t) for node, t in route if node not in self.depots]
+        for (u, t), (v, arrive) in zip(route, route[1:]):
+            if u != v:
+                keys.extend(('street', min(u, v), max(u, v), t + i) for i in range(arrive - t))
+        if goal not in self.depots:
+            keys.extend(('loc', goal, route[-1][1] + i) for i in range(1, dwell))
+        return keys
+    
+    def _count_conflicts(self, route: List[Tuple[int, int]], goal: int, dwell: int,
+                         reserved: Dict) -> int:
+        """Locations and streets where route runs into earlier volunteers."""
+        conflicts = set()
+        for key in self._occupancy(route, goal, dwell):
+            capacity = self.location_capacity if key[0] == 'loc' else self.street_capacity
+            if reserved.get(key, 0) >= capacity:
+                conflicts.add(key[:-1])  # count each place once, not each tick
+        return len(conflicts)
+    
+    def _reserve(self, route: List[Tuple[int, int]], goal: int, dwell: int, reserved: Dict):
+        for key in self._occupancy(route, goal, dwell):
+            reserved[key] = reserved.get(key, 0) + 1
+
+
 if __name__ == "__main__":
     # Demo: A* Search in Hunters Point community
     print("=" * 60)
@@ -349,5 +2806,50 @@ if __name__ == "__main__":
         print(f"  Cost: {comparison['compassionate']['cost']:.1f}")
     print()
     
+    print("Anytime Search (有時限的搜尋):")
+    for solution in search.search_anytime('start', 'garcia', deadline=0.05):
+        print(f"  ε={solution.epsilon:.1f}  cost {solution.cost:.1f}  "
+              f"(≤ {solution.bound:.2f} × optimal)")
+    print()
+    
+    print("Departure Planning (出發時間):")
+    # School drop-off 7:30-9:00, lunch at the market 11:30-13:30, evening 16:30-19:00
+    community.set_time_profile('start', 'school', [0, 450, 540], [1.0, 2.5, 1.0])
+    community.set_time_profile('school', 'park', [0, 450, 540, 990, 1140], [1.0, 2.0, 1.0, 1.5, 1.0])
+    community.set_time_profile('start', 'market', [0, 690, 810, 990, 1140], [1.0, 1.6, 1.0, 1.8, 1.0])
+    community.set_time_profile('market', 'park', [0, 690, 810], [1.0, 1.4, 1.0])
+    for depart in (480, 720, 1080):
+        route = search.search_departing('start', 'garcia', depart)
+        print(f"  Leave {depart // 60:02d}:{depart % 60:02d}: {' → '.join(route)}  "
+              f"({search.search_stats['duration']:.1f} min)")
+    best = search.best_departure('start', 'garcia', 660, 840)
+    print(f"  Best between 11:00 and 14:00: {int(best['depart']) // 60:02d}:"
+          f"{int(best['depart']) % 60:02d} ({best['duration']:.1f} min, "
+          f"{best['searches']} searches)")
+    print()
+    
+    print("Travel Costs from Tzu Chi Center (送餐距離):")
+    matrix = search.cost_matrix(['start'], community.resident_ids())
+    for loc_id, cost in zip(matrix['targets'], matrix['costs'][0]):
+        print(f"  {community.locations[loc_id].resident_name:12} : {cost:.1f}")
+    print()
+    
+    print("Delivery Tour (送餐巡迴):")
+    tour = TourPlanner(search).plan('start', community.resident_ids(), {'garcia': 9})
+    print(f"  Order: {' → '.join(tour['order'])}")
+    print(f"  Cost: {tour['cost']:.1f}")
+    print()
+    
+    print("Saturday Distribution (多位志工):")
+    volunteers = {f"Volunteer {i + 1}": home
+                  for i, home in enumerate(community.resident_ids() * 2)}
+    coordinated = MultiVolunteerPlanner(search).plan(volunteers)
+    for name, plan in coordinated['volunteers'].items():
+        print(f"  {name}: leave t={plan['depart']:2d}, arrive t={plan['arrival']:2d}  "
+              f"{' → '.join(plan['path'])}")
+    print(f"  {coordinated['conflicts_resolved']} conflicts resolved in "
+          f"{coordinated['planning_seconds'] * 1000:.1f} ms")
+    print()
+    
     print(f"Lesson: {comparison['lesson']['zh']}")
     print(f"        {comparison['lesson']['en']}")
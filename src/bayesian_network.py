@@ -15,10 +15,17 @@ Reference: Russell & Norvig, Chapter 13 - Probabilistic Reasoning
 """
 
 import json
-from typing import Dict, List, Tuple, Optional
+import heapq
+from itertools import product
+from typing import Callable, ClassVar, Dict, Iterable, List, Sequence, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only bulk lookups need it
+    np = None
+
 
 class EvidenceLevel(Enum):
     """Evidence levels for Bayesian inference."""
@@ -28,6 +35,249 @@ class EvidenceLevel(Enum):
     NONE = "none"
 
 
+INFERENCE_MODES = ('weighted', 'exact')
+
+
+class Factor:
+    """
+    Table over discrete variables, for variable elimination.
+    
+    values is row-major over the variables (the last one varies
+    fastest); each variable takes values 0 .. cardinality - 1.
+    """
+    __slots__ = ('variables', 'cardinalities', 'values', '_strides')
+    
+    def __init__(self, variables: Sequence[str], cardinalities: Sequence[int],
+                 values: Sequence[float]):
+        self.variables = tuple(variables)
+        self.cardinalities = tuple(cardinalities)
+        self.values = list(values)
+        strides, stride = [], 1
+        for cardinality in reversed(self.cardinalities):
+            strides.append(stride)
+            stride *= cardinality
+        self._strides = tuple(reversed(strides))
+        if len(self.values) != stride:
+            raise ValueError(f"Factor over {self.variables} needs {stride} values")
+    
+    def _offsets(self, variables: Tuple[str, ...], cardinalities: Tuple[int, ...]) -> List[int]:
+        """Offset into values for every assignment of a superset scope."""
+        stride = {v: s for v, s in zip(self.variables, self._strides)}
+        offsets = [0]
+        for variable, cardinality in zip(variables, cardinalities):
+            step = stride.get(variable, 0)
+            offsets = [o + i * step for o in offsets for i in range(cardinality)]
+        return offsets
+    
+    def multiply(self, other: 'Factor') -> 'Factor':
+        """Pointwise product over the union of both scopes."""
+        extra = [(v, c) for v, c in zip(other.variables, other.cardinalities)
+                 if v not in self.variables]
+        variables = self.variables + tuple(v for v, _ in extra)
+        cardinalities = self.cardinalities + tuple(c for _, c in extra)
+        mine = self._offsets(variables, cardinalities)
+        theirs = other._offsets(variables, cardinalities)
+        return Factor(variables, cardinalities,
+                      [self.values[i] * other.values[j] for i, j in zip(mine, theirs)])
+    
+    def sum_out(self, variable: str) -> 'Factor':
+        """Marginalize one variable away."""
+        axis = self.variables.index(variable)
+        variables = self.variables[:axis] + self.variables[axis + 1:]
+        cardinalities = self.cardinalities[:axis] + self.cardinalities[axis + 1:]
+        stride = self._strides[axis]
+        values = []
+        for offset in self._offsets(variables, cardinalities):
+            values.append(sum(self.values[offset + i * stride]
+                              for i in range(self.cardinalities[axis])))
+        return Factor(variables, cardinalities, values)
+    
+    def reduce(self, evidence: Dict[str, int]) -> 'Factor':
+        """Fix observed variables to their values and drop them from the scope."""
+        fixed = sum(s * evidence[v] for v, s in zip(self.variables, self._strides) if v in evidence)
+        kept = [(v, c) for v, c in zip(self.variables, self.cardinalities) if v not in evidence]
+        variables = tuple(v for v, _ in kept)
+        cardinalities = tuple(c for _, c in kept)
+        return Factor(variables, cardinalities,
+                      [self.values[fixed + o] for o in self._offsets(variables, cardinalities)])
+
+
+class DiscreteBayesNet:
+    """
+    Discrete Bayesian network with exact inference by variable elimination.
+    
+    Each query is answered by a plan that depends only on the query
+    variable and which variables are observed, not on their values:
+    ancestors-only pruning (other unobserved variables sum to one),
+    a min-degree elimination order, and the list of elimination steps.
+    Plans are computed once and cached. The factor each step produces
+    is cached too, keyed by the evidence values it actually depends
+    on, so repeated queries with different evidence redo only the
+    steps whose inputs changed.
+    
+    Changing a CPT clears the caches and bumps version.
+    """
+    
+    def __init__(self):
+        self.domains: Dict[str, Tuple[str, ...]] = {}
+        self.parents: Dict[str, Tuple[str, ...]] = {}
+        self.cpts: Dict[str, Factor] = {}
+        self.version = 0
+        self._plans: Dict[Tuple, Tuple] = {}
+        self._factors: Dict[Tuple, Factor] = {}
+    
+    def add_variable(self, name: str, domain: Sequence[str], parents: Sequence[str] = (),
+                     cpt: Optional[Dict[Tuple[str, ...], Sequence[float]]] = None):
+        """
+        Declare a variable after its parents.
+        
+        cpt maps each tuple of parent values to the distribution over
+        domain, e.g. {('high', 'low'): [0.6, 0.4]}; a root takes {(): [...]}.
+        """
+        for parent in parents:
+            if parent not in self.domains:
+                raise ValueError(f"Parent {parent!r} of {name!r} is not declared")
+        self.domains[name] = tuple(domain)
+        self.parents[name] = tuple(parents)
+        self.set_cpt(name, cpt or {})
+    
+    def set_cpt(self, name: str, cpt: Dict[Tuple[str, ...], Sequence[float]]):
+        """Replace the conditional probability table of a variable."""
+        parents = self.parents[name]
+        values = []
+        for combo in product(*(self.domains[p] for p in parents)):
+            distribution = list(cpt.get(combo, ()))
+            if len(distribution) != len(self.domains[name]):
+                raise ValueError(f"CPT of {name!r} needs a distribution for {combo}")
+            if abs(sum(distribution) - 1) > 1e-9:
+                raise ValueError(f"CPT of {name!r} for {combo} does not sum to 1")
+            values.extend(distribution)
+        variables = parents + (name,)
+        self.cpts[name] = Factor(variables, [len(self.domains[v]) for v in variables], values)
+        self.version += 1
+        self._plans.clear()
+        self._factors.clear()
+    
+    def _plan(self, target: str, observed: frozenset) -> Tuple:
+        """(CPTs used, elimination steps) for a query; see the class docstring."""
+        key = (target, observed)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        relevant, stack = set(), [target, *observed]
+        while stack:
+            variable = stack.pop()
+            if variable not in relevant:
+                relevant.add(variable)
+                stack.extend(self.parents[variable])
+        names = sorted(relevant, key=list(self.domains).index)
+        # Factor slots: scope after evidence is fixed, plus the evidence they depend on
+        slots = [(set(self.cpts[n].variables) - observed,
+                  frozenset(self.cpts[n].variables) & observed) for n in names]
+        hidden = relevant - observed - {target}
+        steps = []
+        while hidden:
+            def degree(v):
+                return len(set().union(*(scope for scope, _ in slots if v in scope)) - {v})
+            variable = min(sorted(hidden), key=degree)
+            used = [i for i, (scope, _) in enumerate(slots) if variable in scope]
+            scope = set().union(*(slots[i][0] for i in used)) - {variable}
+            depends = frozenset().union(*(slots[i][1] for i in used))
+            steps.append((variable, tuple(used), tuple(sorted(depends))))
+            slots = [slot for i, slot in enumerate(slots) if i not in used] + [(scope, depends)]
+            hidden.discard(variable)
+        plan = self._plans[key] = (tuple(names), tuple(steps))
+        return plan
+    
+    def query(self, target: str, evidence: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """P(target | evidence) as {value: probability}."""
+        evidence = evidence or {}
+        codes = {}
+        for variable, value in evidence.items():
+            if variable not in self.domains:
+                raise ValueError(f"Unknown variable {variable!r}")
+            if value not in self.domains[variable]:
+                raise ValueError(f"{variable!r} has no value {value!r}")
+            codes[variable] = self.domains[variable].index(value)
+        if target in codes:
+            return {v: float(v == evidence[target]) for v in self.domains[target]}
+        
+        observed = frozenset(codes)
+        names, steps = self._plan(target, observed)
+        pool = []
+        for name in names:
+            scope = tuple(v for v in self.cpts[name].variables if v in observed)
+            key = (name, scope, tuple(codes[v] for v in scope))
+            factor = self._factors.get(key)
+            if factor is None:
+                factor = self._factors[key] = self.cpts[name].reduce({v: codes[v] for v in scope})
+            pool.append(factor)
+        for index, (variable, used, depends) in enumerate(steps):
+            key = (target, observed, index, tuple(codes[v] for v in depends))
+            factor = self._factors.get(key)
+            if factor is None:
+                factor = pool[used[0]]
+                for i in used[1:]:
+                    factor = factor.multiply(pool[i])
+                factor = self._factors[key] = factor.sum_out(variable)
+            pool = [f for i, f in enumerate(pool) if i not in used] + [factor]
+        
+        result = pool[0]
+        for factor in pool[1:]:
+            result = result.multiply(factor)
+        total = sum(result.values)
+        if total <= 0:
+            raise ValueError(f"Evidence {evidence} has probability zero")
+        return {value: p / total for value, p in zip(self.domains[target], result.values)}
+
+
+LEVELS = tuple(level.value for level in EvidenceLevel)  # low, medium, high, none
+LEVEL_CODES = {level: i for i, level in enumerate(LEVELS)}
+
+# Parents of Needs_Care enter as additive effects on P(needs care), on the
+# same scale as the game's weighted scores
+STRESS_EFFECT = {'low': 0.05, 'medium': 0.15, 'high': 0.3, 'none': 0.0}
+CONNECTION_EFFECT = {'low': 0.25, 'medium': 0.1, 'high': 0.0, 'none': 0.3}
+
+CARE_PRIORS = {
+    'life_stress': {(): [0.35, 0.3, 0.2, 0.15]},
+    'social_connection': {(): [0.25, 0.35, 0.3, 0.1]},
+}
+CARE_CPTS = {  # P(child | needs_care) over LEVELS
+    'recent_interaction': {('yes',): [0.35, 0.2, 0.1, 0.35],
+                           ('no',): [0.2, 0.35, 0.35, 0.1]},
+    'visible_behavior': {('yes',): [0.15, 0.3, 0.45, 0.1],
+                         ('no',): [0.4, 0.3, 0.15, 0.15]},
+}
+
+
+def build_care_network() -> DiscreteBayesNet:
+    """The network drawn in BayesianCareNetwork's docstring, with its CPTs."""
+    net = DiscreteBayesNet()
+    for name, cpt in CARE_PRIORS.items():
+        net.add_variable(name, LEVELS, cpt=cpt)
+    needs_care = {}
+    for stress, connection in product(LEVELS, LEVELS):
+        p = 0.05 + STRESS_EFFECT[stress] + CONNECTION_EFFECT[connection]
+        needs_care[(stress, connection)] = [p, 1 - p]
+    net.add_variable('needs_care', ('yes', 'no'), ('life_stress', 'social_connection'),
+                     needs_care)
+    for name, cpt in CARE_CPTS.items():
+        net.add_variable(name, LEVELS, ('needs_care',), cpt)
+    return net
+
+
+_care_network: Optional[DiscreteBayesNet] = None
+
+
+def care_network() -> DiscreteBayesNet:
+    """Shared instance of build_care_network() used by the exact mode."""
+    global _care_network
+    if _care_network is None:
+        _care_network = build_care_network()
+    return _care_network
+
+
 @dataclass
 class CommunityMember:
     """Represents a community member with observable attributes."""
@@ -46,21 +296,51 @@ class CommunityMember:
     # Hidden truth (for game validation)
     actual_needs_care: bool
     story_type: str  # 'surprise' or 'touching'
+    inference: str = 'weighted'  # one of INFERENCE_MODES
+    
+    edits: ClassVar[int] = 0  # bumped on every field assignment of any member
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        CommunityMember.edits += 1
     
     def __post_init__(self):
         """Calculate initial probability based on evidence."""
+        if self.inference not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode {self.inference!r}; expected one of {INFERENCE_MODES}")
         self._base_probability = self._calculate_base_probability()
     
+    def evidence(self) -> Dict[str, str]:
+        """Observed values, keyed by network variable."""
+        return {
+            'life_stress': self.life_stress.value,
+            'social_connection': self.social_connection.value,
+            'recent_interaction': self.recent_interaction.value,
+            'visible_behavior': self.visible_behavior.value
+        }
+    
+    @property
+    def evidence_code(self) -> int:
+        """Packed evidence (see encode_evidence)."""
+        return encode_evidence(LEVEL_CODES[self.life_stress.value],
+                               LEVEL_CODES[self.social_connection.value],
+                               LEVEL_CODES[self.recent_interaction.value],
+                               LEVEL_CODES[self.visible_behavior.value])
+    
     def _calculate_base_probability(self) -> float:
         """
-        Calculate P(NeedsCare | Evidence) using simplified Bayesian inference.
+        Calculate P(NeedsCare | Evidence) as a percentage.
         
-        In a full implementation, this would use:
-        P(NeedsCare | E1, E2, E3, E4) = P(E1|NC) * P(E2|NC) * P(E3|NC) * P(E4|NC) * P(NC)
-                                        / P(E1, E2, E3, E4)
+        'exact' runs variable elimination on care_network(); with all four
+        observed this is
+        P(NC | E1, E2, E3, E4) ∝ P(NC | Stress, Connection) * P(Interaction | NC)
+                                 * P(Behavior | NC)
         
-        For game purposes, we use a weighted scoring system.
+        'weighted', for game purposes, uses a weighted scoring system.
         """
+        if self.inference == 'exact':
+            return care_network().query('needs_care', self.evidence())['yes'] * 100
+        
         weights = {
             'life_stress': {'high': 0.3, 'medium': 0.15, 'low': 0.05, 'none': 0.0},
             'social_connection': {'low': 0.25, 'medium': 0.1, 'high': 0.0, 'none': 0.3},
@@ -99,6 +379,129 @@ class CommunityMember:
         }
 
 
+class MemberList(list):
+    """A list of CommunityMember whose revision is bumped on every change."""
+    
+    revision = 0
+
+
+def _revising(name: str) -> Callable:
+    method = getattr(list, name)
+    
+    def mutate(self, *args, **kwargs):
+        self.revision += 1
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend',
+              'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(MemberList, _name, _revising(_name))
+
+
+class MemberColumns:
+    """
+    Columnar store of community members for population-scale scoring.
+    
+    Row r holds ids[r], names[r], the packed evidence codes[r] (see
+    encode_evidence) and needs_care[r]; index maps id -> row (the first
+    row with that id). Scores come from care_table(), so a million
+    members are scored by one array lookup, and are cached per table.
+    Without NumPy the same methods run on plain lists.
+    """
+    
+    def __init__(self, ids: Sequence[str], codes: Sequence[int], needs_care: Sequence[bool],
+                 names: Optional[Sequence[str]] = None):
+        self.ids = list(ids)
+        self.names = list(names) if names is not None else self.ids
+        if not len(self.ids) == len(codes) == len(needs_care) == len(self.names):
+            raise ValueError("ids, codes, needs_care and names must have the same length")
+        self.index: Dict[str, int] = {}
+        for row, member_id in enumerate(self.ids):
+            self.index.setdefault(member_id, row)
+        if np is not None:
+            self.codes = np.asarray(codes, dtype=np.uint8)
+            self.needs_care = np.asarray(needs_care, dtype=bool)
+        else:
+            self.codes = list(codes)
+            self.needs_care = [bool(v) for v in needs_care]
+        self._scores: Dict[str, Tuple[CareProbabilityTable, object]] = {}
+    
+    @classmethod
+    def from_members(cls, members: Sequence[CommunityMember]) -> 'MemberColumns':
+        return cls([m.id for m in members], [m.evidence_code for m in members],
+                   [m.actual_needs_care for m in members], [m.name for m in members])
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def row(self, member_id: str) -> Optional[int]:
+        """Row of a member id, or None."""
+        return self.index.get(member_id)
+    
+    def scores(self, inference: str = 'weighted'):
+        """Care probability (percent) of every row."""
+        table = care_table(inference)
+        cached = self._scores.get(inference)
+        if cached is None or cached[0] is not table:
+            values = table.bulk(self.codes) if np is not None else [table.values[c] for c in self.codes]
+            cached = self._scores[inference] = (table, values)
+        return cached[1]
+    
+    def top_k(self, k: int, inference: str = 'weighted') -> List[Tuple[int, float]]:
+        """
+        The k highest-scoring rows as (row, probability), best first and
+        ties in row order, the same as the head of a stable sort. Uses
+        partial selection, O(n + k log k).
+        """
+        scores = self.scores(inference)
+        k = max(0, min(k, len(scores)))
+        if not k:
+            return []
+        if np is None:
+            return [(r, scores[r]) for r in heapq.nsmallest(k, range(len(scores)),
+                                                            key=lambda r: (-scores[r], r))]
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > kth)
+        rows = np.concatenate([above, np.flatnonzero(scores == kth)[:k - len(above)]])
+        rows = rows[np.lexsort((rows, -scores[rows]))]
+        return list(zip(rows.tolist(), scores[rows].tolist()))
+    
+    def evaluate_rows(self, rows, inference: str = 'weighted') -> Dict:
+        """
+        Score the player's selection, given as rows (see
+        BayesianCareNetwork.evaluate_decision for the rule).
+        
+        Returns 'total_elo', and per selected row its 'rows' and 'elo'.
+        """
+        scores = self.scores(inference)
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.intp)
+            actual = self.needs_care[rows]
+            elo = np.where(actual & (scores[rows] < OVERRIDE_THRESHOLD), OVERRIDE_ELO,
+                           np.where(actual, CORRECT_ELO, CARING_ELO))
+            return {'total_elo': int(elo.sum()), 'rows': rows, 'elo': elo}
+        elo = [(OVERRIDE_ELO if scores[r] < OVERRIDE_THRESHOLD else CORRECT_ELO)
+               if self.needs_care[r] else CARING_ELO for r in rows]
+        return {'total_elo': sum(elo), 'rows': list(rows), 'elo': elo}
+    
+    def evaluate(self, selected_ids: Sequence[str], inference: str = 'weighted') -> Dict:
+        """evaluate_rows() for member ids; unknown ids are skipped."""
+        index = self.index
+        return self.evaluate_rows([index[i] for i in selected_ids if i in index], inference)
+
+
+# evaluate_decision scoring
+OVERRIDE_THRESHOLD = 30  # below this probability, finding a real need is an override
+OVERRIDE_ELO, CORRECT_ELO, CARING_ELO = 50, 30, 20
+INSIGHTS = {
+    OVERRIDE_ELO: "數據看不見的需求 - Override 成功！",
+    CORRECT_ELO: "正確識別需要關懷的人",
+    CARING_ELO: "關心永遠不嫌多"
+}
+
+
 class BayesianCareNetwork:
     """
     Bayesian Network for Community Care Need Assessment.
@@ -117,12 +520,32 @@ class BayesianCareNetwork:
     
     The hidden variable 'Needs_Care' is what we're trying to infer
     from the observable evidence nodes.
+    
+    inference='weighted' keeps the game's additive scoring; 'exact'
+    computes the posterior from the network's CPTs (care_network()).
+    
+    Lookups and scoring go through a MemberColumns mirror of members,
+    rebuilt whenever the list is changed or replaced, or any
+    CommunityMember field is assigned.
     """
     
-    def __init__(self):
-        self.members: List[CommunityMember] = []
+    def __init__(self, inference: str = 'weighted'):
+        self.inference = inference
+        self._columns: Optional[MemberColumns] = None
+        self._columns_at = (-1, -1)
+        self.members = []
         self._initialize_community()
     
+    @property
+    def members(self) -> MemberList:
+        """The community members; any list is stored as a MemberList."""
+        return self._members
+    
+    @members.setter
+    def members(self, members: Iterable[CommunityMember]):
+        self._members = MemberList(members)
+        self._columns = None
+    
     def _initialize_community(self):
         """Initialize the Bayview-Hunters Point community members."""
         
@@ -138,7 +561,8 @@ class BayesianCareNetwork:
             recent_interaction=EvidenceLevel.HIGH,  # Daily visits
             visible_behavior=EvidenceLevel.LOW,
             actual_needs_care=True,  # Wife passed away
-            story_type='surprise'
+            story_type='surprise',
+            inference=self.inference
         ))
         
         # Maria - High stress but improving (algorithm says needs care, but she's okay)
@@ -153,7 +577,8 @@ class BayesianCareNetwork:
             recent_interaction=EvidenceLevel.LOW,
             visible_behavior=EvidenceLevel.HIGH,  # Rushing
             actual_needs_care=False,  # Just got new job
-            story_type='touching'
+            story_type='touching',
+            inference=self.inference
         ))
         
         # Tane - Withdrawn teen who actually wants to help
@@ -168,7 +593,8 @@ class BayesianCareNetwork:
             recent_interaction=EvidenceLevel.LOW,
             visible_behavior=EvidenceLevel.MEDIUM,
             actual_needs_care=False,  # He's a hidden helper!
-            story_type='surprise'
+            story_type='surprise',
+            inference=self.inference
         ))
         
         # Mrs. Chen - Smiling but lonely
@@ -183,7 +609,8 @@ class BayesianCareNetwork:
             recent_interaction=EvidenceLevel.HIGH,
             visible_behavior=EvidenceLevel.LOW,  # Happy
             actual_needs_care=True,  # Misses Taiwan
-            story_type='touching'
+            story_type='touching',
+            inference=self.inference
         ))
         
         # Devon - New neighbor, high stress, needs welcome
@@ -198,23 +625,34 @@ class BayesianCareNetwork:
             recent_interaction=EvidenceLevel.NONE,
             visible_behavior=EvidenceLevel.HIGH,  # Busy
             actual_needs_care=True,
-            story_type='touching'
+            story_type='touching',
+            inference=self.inference
         ))
     
+    def columns(self) -> MemberColumns:
+        """Columnar mirror of members (see the class docstring)."""
+        if self._columns is None or self._columns_at != (self.members.revision, CommunityMember.edits):
+            self._columns = MemberColumns.from_members(self.members)
+            self._columns_at = (self.members.revision, CommunityMember.edits)
+        return self._columns
+    
+    def refresh(self):
+        """Rebuild the columnar mirror on next use."""
+        self._columns = None
+    
     def get_member(self, member_id: str) -> Optional[CommunityMember]:
         """Get a community member by ID."""
-        for member in self.members:
-            if member.id == member_id:
-                return member
-        return None
+        row = self.columns().row(member_id)
+        return self.members[row] if row is not None else None
     
     def get_all_probabilities(self) -> List[Tuple[str, float]]:
         """Get all members sorted by care probability."""
-        return sorted(
-            [(m.name, m.care_probability) for m in self.members],
-            key=lambda x: x[1],
-            reverse=True
-        )
+        return self.top_members(len(self.members))
+    
+    def top_members(self, k: int) -> List[Tuple[str, float]]:
+        """The k members most likely to need care, as (name, probability)."""
+        columns = self.columns()
+        return [(columns.names[row], p) for row, p in columns.top_k(k, self.inference)]
     
     def evaluate_decision(self, selected_ids: List[str]) -> Dict:
         """
@@ -224,41 +662,31 @@ class BayesianCareNetwork:
         - Finding hidden needs (high score)
         - Using override correctly (bonus)
         - Avoiding false positives (minor score)
+        
+        Scores the whole selection at once on the columnar arrays
+        (MemberColumns.evaluate_rows), then lists each decision with the
+        same probability the score was based on (the current care_table(),
+        not the member's cached value).
         """
+        columns = self.columns()
+        batch = columns.evaluate(selected_ids, self.inference)
+        scores = columns.scores(self.inference)
         results = {
-            'total_elo': 0,
+            'total_elo': batch['total_elo'],
             'decisions': [],
             'insights': []
         }
         
-        for member_id in selected_ids:
-            member = self.get_member(member_id)
-            if not member:
-                continue
-            
-            decision = {
+        for row, elo in zip(batch['rows'], batch['elo']):
+            member = self.members[row]
+            results['decisions'].append({
                 'member': member.name,
-                'probability': member.care_probability,
+                'probability': float(scores[row]),
                 'actual_need': member.actual_needs_care,
-                'story_type': member.story_type
-            }
-            
-            # Scoring logic
-            if member.care_probability < 30 and member.actual_needs_care:
-                # Override success - found hidden need!
-                decision['elo'] = 50
-                decision['insight'] = "數據看不見的需求 - Override 成功！"
-            elif member.actual_needs_care:
-                # Correct identification
-                decision['elo'] = 30
-                decision['insight'] = "正確識別需要關懷的人"
-            else:
-                # False positive but still caring
-                decision['elo'] = 20
-                decision['insight'] = "關心永遠不嫌多"
-            
-            results['total_elo'] += decision['elo']
-            results['decisions'].append(decision)
+                'story_type': member.story_type,
+                'elo': int(elo),
+                'insight': INSIGHTS[int(elo)]
+            })
         
         return results
     
@@ -275,30 +703,94 @@ class BayesianCareNetwork:
 
 
 # Game Integration Functions
-def calculate_care_probability(evidence: Dict) -> float:
+def calculate_care_probability(evidence: Dict, inference: str = 'weighted') -> float:
     """
     Calculate P(NeedsCare | Evidence) for dynamic game scenarios.
     
     Args:
-        evidence: Dict with keys 'stress', 'connection', 'interaction', 'behavior'
+        evidence: Dict with keys 'stress', 'connection', 'interaction', 'behavior',
+            each an EvidenceLevel or its value ('low', 'medium', ...)
+        inference: 'weighted' (game scoring) or 'exact' (variable elimination)
     
     Returns:
-        Probability as percentage (0-100)
+        Probability as percentage (0-100), read from care_table()
+    """
+    code = 0
+    for key in ('stress', 'connection', 'interaction', 'behavior'):
+        level = EvidenceLevel(evidence.get(key, 'medium')).value  # accepts members and strings
+        code = code * 4 + LEVEL_CODES[level]
+    return care_table(inference).values[code]
+
+
+def encode_evidence(stress, connection, interaction, behavior):
+    """
+    Pack four level codes (indices into LEVELS: 0 low, 1 medium, 2 high,
+    3 none) into one evidence code 0-255. Works elementwise on NumPy
+    arrays as well.
     """
-    member = CommunityMember(
-        id='dynamic',
-        name='Dynamic',
-        name_zh='動態',
-        location='Unknown',
-        location_zh='未知',
-        life_stress=EvidenceLevel(evidence.get('stress', 'medium')),
-        social_connection=EvidenceLevel(evidence.get('connection', 'medium')),
-        recent_interaction=EvidenceLevel(evidence.get('interaction', 'medium')),
-        visible_behavior=EvidenceLevel(evidence.get('behavior', 'medium')),
-        actual_needs_care=False,
-        story_type='dynamic'
-    )
-    return member.care_probability
+    return ((stress * 4 + connection) * 4 + interaction) * 4 + behavior
+
+
+class CareProbabilityTable:
+    """
+    P(NeedsCare | Evidence) for all 4^4 = 256 evidence combinations.
+    
+    values[code] is the percentage CommunityMember computes for the
+    evidence packed in code, so a lookup replaces building a member.
+    version records the care_network() CPT version an 'exact' table was
+    built from.
+    """
+    
+    def __init__(self, inference: str = 'weighted'):
+        self.inference = inference
+        self.version = _model_version(inference)
+        self.values: List[float] = []
+        for stress, connection, interaction, behavior in product(EvidenceLevel, repeat=4):
+            self.values.append(CommunityMember(
+                id='table', name='Table', name_zh='查表',
+                location='Unknown', location_zh='未知',
+                life_stress=stress, social_connection=connection,
+                recent_interaction=interaction, visible_behavior=behavior,
+                actual_needs_care=False, story_type='dynamic', inference=inference
+            ).care_probability)
+        self.array = np.array(self.values) if np is not None else None
+    
+    def probability(self, stress: int, connection: int, interaction: int, behavior: int) -> float:
+        """Lookup by level codes."""
+        return self.values[((stress * 4 + connection) * 4 + interaction) * 4 + behavior]
+    
+    def bulk(self, codes) -> 'np.ndarray':
+        """Probabilities for an array of evidence codes."""
+        if np is None:
+            raise ImportError("CareProbabilityTable.bulk() requires NumPy")
+        return self.array[np.asarray(codes, dtype=np.intp)]
+
+
+_care_tables: Dict[str, CareProbabilityTable] = {}
+
+
+def _model_version(inference: str) -> int:
+    if inference not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode {inference!r}; expected one of {INFERENCE_MODES}")
+    return care_network().version if inference == 'exact' else 0
+
+
+def care_table(inference: str = 'weighted') -> CareProbabilityTable:
+    """The lookup table for a mode, rebuilt after care_network() CPTs change."""
+    table = _care_tables.get(inference)
+    if table is None or (inference == 'exact' and table.version != care_network().version):
+        table = _care_tables[inference] = CareProbabilityTable(inference)
+    return table
+
+
+def care_probability_code(code: int, inference: str = 'weighted') -> float:
+    """Fast path: P(NeedsCare) percentage for a packed evidence code."""
+    return care_table(inference).values[code]
+
+
+def care_probabilities(codes, inference: str = 'weighted') -> 'np.ndarray':
+    """Bulk path: percentages for a NumPy array of evidence codes."""
+    return care_table(inference).bulk(codes)
 
 
 if __name__ == "__main__":
@@ -317,6 +809,12 @@ if __name__ == "__main__":
         bar = "█" * int(prob / 5) + "░" * (20 - int(prob / 5))
         print(f"{name:15} [{bar}] {prob:.0f}%")
     
+    print()
+    print("Exact Posterior (variable elimination):")
+    print("-" * 40)
+    for member in BayesianCareNetwork(inference='exact').members:
+        print(f"{member.name:15} P(needs care | evidence) = {member.care_probability:.0f}%")
+    
     print()
     print("Key Insight: High probability ≠ actual need")
     print("關鍵洞察：高機率 ≠ 實際需求")
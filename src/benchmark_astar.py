@@ -0,0 +1,149 @@
+"""
+Journey of Kindness - A* Search Benchmark
+A* 搜尋效能測試：SearchNode 版本 vs 精簡核心
+
+Compares the original A* loop (one SearchNode dataclass per push,
+parent pointers, unbounded search_history) with the lean search core
+(tuple heap entries, parent map, lazy deletion, optional history) on a
+synthetic street grid of about 100k locations.
+
+Usage:
+    python benchmark_astar.py [side] [queries]
+
+Reference: Russell & Norvig, Chapter 3 - Solving Problems by Searching
+"""
+
+import heapq
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+from astar_search import (AStarSearch, CommunityMap, HeuristicType, Location,
+                          SearchNode)
+
+
+class SyntheticGridMap(CommunityMap):
+    """side x side street grid with random block lengths between 1 and 3."""
+
+    def __init__(self, side: int = 317, seed: int = 42):
+        self.side = side
+        self.seed = seed
+        super().__init__(width=side, height=side)
+
+    def _initialize_community(self):
+        rng = random.Random(self.seed)
+        for x in range(self.side):
+            for y in range(self.side):
+                loc_id = f"{x},{y}"
+                self.locations[loc_id] = Location(loc_id, loc_id, loc_id, x, y)
+        for x in range(self.side):
+            for y in range(self.side):
+                if x + 1 < self.side:
+                    self._add_edge(f"{x},{y}", f"{x + 1},{y}", rng.uniform(1, 3))
+                if y + 1 < self.side:
+                    self._add_edge(f"{x},{y}", f"{x},{y + 1}", rng.uniform(1, 3))
+
+
+def legacy_search(search: AStarSearch, start_id: str, goal_id: str,
+                  heuristic: HeuristicType) -> Optional[List[str]]:
+    """The original SearchNode-based A* loop, kept as the baseline."""
+    community_map = search.map
+    start = community_map.locations.get(start_id)
+    goal = community_map.locations.get(goal_id)
+    if not start or not goal:
+        return None
+
+    open_set: List[SearchNode] = []
+    closed_set: Set[str] = set()
+    h_start = search._calculate_heuristic(start, goal, heuristic)
+    heapq.heappush(open_set, SearchNode(f_score=h_start, location=start, g_score=0))
+    g_scores: Dict[str, float] = {start_id: 0}
+    history = []
+
+    while open_set:
+        current = heapq.heappop(open_set)
+        current_id = current.location.id
+        history.append(current_id)
+
+        if current_id == goal_id:
+            path = []
+            node = current
+            while node:
+                path.append(node.location.id)
+                node = node.parent
+            search.search_history = history
+            return list(reversed(path))
+
+        if current_id in closed_set:
+            continue
+        closed_set.add(current_id)
+
+        for neighbor_id, edge_cost in community_map.get_neighbors(current_id):
+            if neighbor_id in closed_set:
+                continue
+            neighbor = community_map.locations.get(neighbor_id)
+            if not neighbor:
+                continue
+            tentative_g = current.g_score + edge_cost
+            if neighbor_id not in g_scores or tentative_g < g_scores[neighbor_id]:
+                g_scores[neighbor_id] = tentative_g
+                f = tentative_g + search._calculate_heuristic(neighbor, goal, heuristic)
+                heapq.heappush(open_set, SearchNode(
+                    f_score=f, location=neighbor, g_score=tentative_g, parent=current))
+
+    search.search_history = history
+    return None
+
+
+def run_benchmark(side: int = 317, queries: int = 20, seed: int = 7) -> Dict[str, Dict]:
+    """Time every variant on the same random queries; returns per-variant totals."""
+    community = SyntheticGridMap(side)
+    rng = random.Random(seed)
+    pairs = [(f"{rng.randrange(side)},{rng.randrange(side)}",
+              f"{rng.randrange(side)},{rng.randrange(side)}") for _ in range(queries)]
+    heuristic = HeuristicType.EUCLIDEAN
+
+    variants = {
+        'legacy SearchNode': (AStarSearch(community), True),
+        'lean, full history': (AStarSearch(community), False),
+        'lean, no history': (AStarSearch(community, history_limit=0), False),
+        'compact, no history': (AStarSearch(community, compact=True, history_limit=0), False),
+    }
+    community.to_compact()  # build the CSR arrays outside the timed loop
+
+    results = {}
+    for name, (search, legacy) in variants.items():
+        expanded = 0
+        started = time.perf_counter()
+        for start_id, goal_id in pairs:
+            if legacy:
+                legacy_search(search, start_id, goal_id, heuristic)
+                expanded += len(set(search.search_history))
+            else:
+                search.search(start_id, goal_id, heuristic)
+                expanded += search.search_stats['expanded']
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'seconds': elapsed,
+            'expanded': expanded,
+            'expansions_per_second': expanded / elapsed if elapsed else 0.0
+        }
+    return results
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 317
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("=" * 60)
+    print("Journey of Kindness - A* Search Benchmark")
+    print(f"Synthetic grid: {side} x {side} = {side * side:,} locations, {queries} queries")
+    print("=" * 60)
+
+    results = run_benchmark(side, queries)
+    baseline = results['legacy SearchNode']['seconds']
+    for name, result in results.items():
+        print(f"  {name:22} {result['seconds']:7.2f} s  "
+              f"{result['expansions_per_second']:10,.0f} nodes/s  "
+              f"x{baseline / result['seconds']:.2f}")
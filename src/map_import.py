@@ -0,0 +1,205 @@
+"""
+Journey of Kindness - Streaming Map Importer
+地圖匯入工具：將大型街道資料轉成可 mmap 的二進位地圖
+
+Reads node/edge lists (CSV) and GeoJSON-style line features one record
+at a time and compiles them into the binary map format of
+CompactGraph.save(), which CompactGraph.open() memory-maps with zero
+copy. Only the compact arrays being built are kept in memory, never the
+source file.
+
+CSV input:
+    nodes: id,x,y[,has_resident]
+    edges: from,to,cost[,oneway]
+
+GeoJSON input: a FeatureCollection or newline-delimited Features with
+LineString / MultiLineString geometry. The endpoints of each line become
+nodes (ids from the 'from'/'to' properties, otherwise "x,y"), and the
+cost is the 'cost' property or the polyline length.
+
+Usage:
+    python map_import.py out.jokmap nodes.csv edges.csv
+    python map_import.py out.jokmap streets.geojson
+"""
+
+import csv
+import json
+import re
+import sys
+from array import array
+from typing import Dict, Iterator, List
+
+from astar_search import CompactGraph
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FEATURES_KEY = re.compile(r'"features"\s*:\s*\[')
+
+
+def is_true(value) -> bool:
+    """Read a flag from CSV text or a JSON property ("no", "0", false -> False)."""
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+class MapImporter:
+    """
+    Incremental builder for a CompactGraph.
+
+    Nodes and arcs are appended to typed arrays as they are read, so
+    memory grows with the map (a few dozen bytes per node and arc plus
+    the id -> node dict), not with the size of the source files.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.names = bytearray()
+        self.name_offsets = array('q', [0])
+        self.xs, self.ys, self.resident = array('d'), array('d'), array('B')
+        self.sources, self.targets, self.costs = array('i'), array('i'), array('d')
+        self.skipped = 0  # arcs whose endpoints were never declared
+
+    def add_node(self, node_id: str, x: float, y: float, has_resident: bool = False) -> int:
+        """Declare a node (repeats are ignored); returns its integer id."""
+        node = self.index.get(node_id)
+        if node is None:
+            node = self.index[node_id] = len(self.index)
+            self.names += node_id.encode('utf-8')
+            self.name_offsets.append(len(self.names))
+            self.xs.append(x)
+            self.ys.append(y)
+            self.resident.append(1 if has_resident else 0)
+        elif has_resident:
+            self.resident[node] = 1
+        return node
+
+    def add_edge(self, from_id: str, to_id: str, cost: float, oneway: bool = False):
+        """Add a street between two declared nodes (both directions unless oneway)."""
+        u, v = self.index.get(from_id), self.index.get(to_id)
+        if u is None or v is None:
+            self.skipped += 1
+            return
+        self.sources.append(u)
+        self.targets.append(v)
+        self.costs.append(cost)
+        if not oneway:
+            self.sources.append(v)
+            self.targets.append(u)
+            self.costs.append(cost)
+
+    def read_csv(self, nodes_path: str, edges_path: str, oneway: bool = False):
+        """Stream a node CSV, then an edge CSV (see module docstring)."""
+        with open(nodes_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.add_node(row['id'], float(row['x']), float(row['y']),
+                              is_true(row.get('has_resident', '')))
+        with open(edges_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                is_oneway = oneway or is_true(row.get('oneway', ''))
+                self.add_edge(row['from'], row['to'], float(row['cost']), is_oneway)
+
+    def read_geojson(self, path: str, oneway: bool = False):
+        """Stream the line features of a GeoJSON file (see module docstring)."""
+        for feature in iter_features(path):
+            geometry = feature.get('geometry') or {}
+            properties = feature.get('properties') or {}
+            if geometry.get('type') == 'LineString':
+                lines = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiLineString':
+                lines = geometry['coordinates']
+            else:
+                continue
+            is_oneway = oneway or is_true(properties.get('oneway', False))
+            for coords in lines:
+                if len(coords) < 2:
+                    continue
+                (x1, y1), (x2, y2) = coords[0][:2], coords[-1][:2]
+                from_id = str(properties.get('from', f"{x1},{y1}"))
+                to_id = str(properties.get('to', f"{x2},{y2}"))
+                self.add_node(from_id, x1, y1)
+                self.add_node(to_id, x2, y2)
+                cost = properties.get('cost')
+                if cost is None:
+                    cost = sum(((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5
+                               for a, b in zip(coords, coords[1:]))
+                self.add_edge(from_id, to_id, float(cost), is_oneway)
+
+    def build(self) -> CompactGraph:
+        """Compile everything read so far into a CompactGraph."""
+        return CompactGraph.from_arrays(bytes(self.names), self.name_offsets,
+                                        self.xs, self.ys, self.resident,
+                                        self.sources, self.targets, self.costs)
+
+    def write(self, path: str) -> CompactGraph:
+        """Build and save in the binary map format; returns the graph."""
+        graph = self.build()
+        graph.save(path)
+        return graph
+
+
+def iter_features(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """
+    Yield GeoJSON features one at a time from a file of any size.
+
+    Handles a FeatureCollection (decoded feature by feature from its
+    "features" array) and newline-delimited or RS-separated feature
+    sequences. At most one feature plus one read chunk is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        eof = not buffer
+
+        # A FeatureCollection announces its array before the first feature
+        match = FEATURES_KEY.search(buffer)
+        while match is None and not eof and '"Feature"' not in buffer:
+            more = f.read(chunk_size)
+            eof = not more
+            buffer += more
+            match = FEATURES_KEY.search(buffer)
+        in_collection = match is not None
+        pos = match.end() if in_collection else 0
+        separators = ' \t\r\n,\x1e'
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+                continue
+            if in_collection and buffer[pos] == ']':
+                return
+            try:
+                feature, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"{path}: malformed feature near offset {pos}")
+                more = f.read(chunk_size)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield feature
+            pos = end
+
+
+def import_map(out_path: str, sources: List[str], oneway: bool = False) -> CompactGraph:
+    """Import CSV (nodes, edges) or GeoJSON sources and write out_path."""
+    importer = MapImporter()
+    if len(sources) == 2 and all(p.lower().endswith('.csv') for p in sources):
+        importer.read_csv(sources[0], sources[1], oneway)
+    else:
+        for path in sources:
+            importer.read_geojson(path, oneway)
+    return importer.write(out_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    graph = import_map(sys.argv[1], sys.argv[2:])
+    print(f"Wrote {sys.argv[1]}: {graph.node_count:,} locations, "
+          f"{graph.edge_count:,} arcs, {graph.nbytes() / 1e6:.1f} MB")
@@ -17,11 +17,25 @@ Core Lesson: 「甘願做，歡喜受」
 "Willing to do, happy to receive"
 """
 
-from typing import Dict, List, Tuple, Optional
+from array import array
+from typing import Callable, ClassVar, Dict, Hashable, Iterable, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 import random
+import heapq
 import json
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; solvers fall back to plain loops
+    np = None
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # SciPy is optional; large policy evaluations iterate instead
+    sparse = None
 
 
 class MayaState(Enum):
@@ -53,9 +67,894 @@ class MDPTransition:
     probability: float
     reward: float
     narrative: Dict[str, str]  # Story text in en/zh
+    
+    edits: ClassVar[int] = 0  # bumped on every field assignment of any transition
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        MDPTransition.edits += 1
+
+
+class TransitionList(list):
+    """A list of MDPTransition whose revision is bumped on every change."""
+    
+    revision = 0
+
+
+def _revising(name: str) -> Callable:
+    method = getattr(list, name)
+    
+    def mutate(self, *args, **kwargs):
+        self.revision += 1
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend',
+              'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(TransitionList, _name, _revising(_name))
+
+
+@dataclass
+class CompiledMDP:
+    """
+    Dense array form of an MDP (see SparseMDP.to_dense).
+    
+    Missing (s, a, s') entries have probability 0, so probability mass
+    that a transition list leaves unassigned simply contributes nothing,
+    exactly as in the sparse sweep.
+    """
+    states: List
+    actions: List
+    P: 'np.ndarray'       # P[s, a, s'] transition probability
+    R: 'np.ndarray'       # R[s, a, s'] reward
+    mask: 'np.ndarray'    # mask[s, a] True if a is available in s
+    
+    def q_values(self, values: 'np.ndarray', gamma: float) -> 'np.ndarray':
+        """Q[s, a] = Σ P(s'|s,a) [R(s,a,s') + γV(s')], -inf where unavailable."""
+        q = (self.P * (self.R + gamma * values)).sum(axis=2)
+        q[~self.mask] = -np.inf
+        return q
+
+
+Successors = Callable[[Hashable], Iterable[Tuple[Hashable, Hashable, float, float]]]
 
 
-class MayaMDP:
+class SparseMDP:
+    """
+    Generic finite MDP stored as sparse CSR rows.
+    
+    The model comes from a successor function: successors(state) yields
+    (action, next_state, probability, reward) tuples. States are either
+    listed up front or discovered breadth-first from initial_states, so
+    generated models with hundreds of thousands of states (cohort counts
+    per stage, say) never need a dense state x action x state table.
+    
+    Layout, with one row per available (state, action) pair:
+      state_rows[s] .. state_rows[s + 1]   rows of state s, by action index
+      row_action[r]                        action index of row r
+      row_start[r] .. row_start[r + 1]     nonzeros of row r
+      next_state[k], probability[k], reward[k]
+    
+    Memory is proportional to the number of nonzero transitions. Values
+    and the policy are kept as vectors indexed like states (the policy
+    holds action indices, -1 where no action is available).
+    
+    Every solver (value_iteration, policy_iteration,
+    modified_policy_iteration) starts from value_vector, leaves its
+    result there and returns it, and records iterations, wall time and
+    the final Bellman residual max|TV - V| in solver_stats.
+    """
+    
+    SOLVERS = ('value_iteration', 'policy_iteration', 'modified_policy_iteration',
+               'gauss_seidel', 'prioritized_sweeping')
+    DENSE_SOLVE_LIMIT = 2000   # states; larger policy evaluations go sparse/iterative
+    EVAL_TOLERANCE = 1e-9      # relative, for iterative policy evaluation
+    SIMULATION_CHUNK = 250_000 # trajectories per generator in simulate_batch
+    
+    def __init__(self, successors: Successors, states: Optional[Iterable[Hashable]] = None,
+                 initial_states: Optional[Iterable[Hashable]] = None,
+                 actions: Optional[Iterable[Hashable]] = None,
+                 discount_factor: float = 0.9):
+        self.successors = successors
+        self.gamma = discount_factor
+        self._discover = states is None
+        self.states: List = list(states if states is not None else initial_states or [])
+        self.actions: List = list(actions or [])
+        self.state_index: Dict[Hashable, int] = {}
+        self.action_index: Dict[Hashable, int] = {}
+        self._csr_arrays: Optional[Tuple] = None
+        self._predecessors: Optional[Tuple] = None
+        self.value_vector = None
+        self.policy_vector = None
+        self.solver_stats: Dict = {}
+        self._dirty: set = set()  # state indices whose transitions were edited
+    
+    def build(self):
+        """Run the successor function over every state and pack the CSR arrays."""
+        state_index = {s: i for i, s in enumerate(self.states)}
+        action_index = {a: i for i, a in enumerate(self.actions)}
+        state_rows, row_start = array('q', [0]), array('q', [0])
+        row_action, next_state = array('i'), array('i')
+        probability, reward = array('d'), array('d')
+        
+        i = 0
+        while i < len(self.states):
+            rows: Dict[int, List[Tuple[int, float, float]]] = {}
+            for action, to_state, p, r in self.successors(self.states[i]):
+                a = action_index.get(action)
+                if a is None:
+                    a = action_index[action] = len(self.actions)
+                    self.actions.append(action)
+                j = state_index.get(to_state)
+                if j is None:
+                    if not self._discover:
+                        raise ValueError(f"Transition to unknown state {to_state!r}")
+                    j = state_index[to_state] = len(self.states)
+                    self.states.append(to_state)
+                rows.setdefault(a, []).append((j, p, r))
+            for a in sorted(rows):
+                row_action.append(a)
+                for j, p, r in rows[a]:
+                    next_state.append(j)
+                    probability.append(p)
+                    reward.append(r)
+                row_start.append(len(next_state))
+            state_rows.append(len(row_action))
+            i += 1
+        
+        self.state_index = state_index
+        self.action_index = action_index
+        arrays = (state_rows, row_action, row_start, next_state, probability, reward)
+        if np is not None:
+            dtypes = (np.int64, np.int32, np.int64, np.int32, np.float64, np.float64)
+            arrays = tuple(np.frombuffer(arr, dtype=dtype) if len(arr) else np.zeros(0, dtype)
+                           for arr, dtype in zip(arrays, dtypes))
+        self._csr_arrays = arrays
+        if self.value_vector is None or len(self.value_vector) > len(self.states):
+            self.value_vector = self._vector([0.0] * len(self.states))
+        elif len(self.value_vector) < len(self.states):
+            # Newly discovered states start at zero; the others keep their values
+            padding = [0.0] * (len(self.states) - len(self.value_vector))
+            self.value_vector = self._vector(list(self.value_vector) + padding)
+        return self
+    
+    def reset_values(self):
+        """Start the next solve from all-zero values."""
+        self._csr()  # states are only complete once the model is built
+        self.value_vector = self._vector([0.0] * len(self.states))
+    
+    def invalidate(self):
+        """Drop the CSR arrays; the next solve rebuilds them from successors."""
+        self._csr_arrays = None
+        self._predecessors = None
+    
+    def mark_dirty(self, *states: Hashable):
+        """
+        Record that the transitions of these states changed, for resolve().
+        Call invalidate() as well if the successor function now yields
+        different transitions.
+        """
+        self._csr()
+        self._dirty.update(self.state_index[s] for s in states)
+    
+    def _csr(self) -> Tuple:
+        if self._csr_arrays is None:
+            self.build()
+        return self._csr_arrays
+    
+    @property
+    def nonzeros(self) -> int:
+        """Number of stored (state, action, next_state) transitions."""
+        return len(self._csr()[3])
+    
+    def nbytes(self) -> int:
+        """Approximate memory used by the CSR arrays."""
+        return sum(len(arr) * arr.itemsize for arr in self._csr())
+    
+    @staticmethod
+    def _vector(values: List[float]):
+        return np.array(values, dtype=float) if np is not None else array('d', values)
+    
+    def q_rows(self, values) -> 'np.ndarray':
+        """Q value of every (state, action) row under the given state values."""
+        _, _, row_start, next_state, probability, reward = self._csr()
+        if np is not None:
+            if not len(probability):
+                return np.zeros(0)
+            contrib = probability * (reward + self.gamma * np.asarray(values)[next_state])
+            return np.add.reduceat(contrib, row_start[:-1])
+        q = array('d')
+        for row in range(len(row_start) - 1):
+            total = 0
+            for k in range(row_start[row], row_start[row + 1]):
+                total += probability[k] * (reward[k] + self.gamma * values[next_state[k]])
+            q.append(total)
+        return q
+    
+    def _best_rows(self, q, with_rows: bool = True) -> Tuple:
+        """Per state: (has_rows mask or list, best Q, first row reaching it)."""
+        state_rows, _, _, _, _, _ = self._csr()
+        if np is not None:
+            has_rows = state_rows[1:] > state_rows[:-1]
+            starts = state_rows[:-1][has_rows]
+            if not len(starts):
+                return has_rows, np.zeros(0), np.zeros(0, np.int64)
+            best = np.maximum.reduceat(q, starts)
+            if not with_rows:
+                return has_rows, best, None
+            counts = np.diff(state_rows)[has_rows]
+            rows = np.arange(len(q))
+            first = np.minimum.reduceat(np.where(q == np.repeat(best, counts), rows, len(q)), starts)
+            return has_rows, best, first
+        has_rows, best, first = [], array('d'), array('q')
+        for s in range(len(state_rows) - 1):
+            start, end = state_rows[s], state_rows[s + 1]
+            has_rows.append(end > start)
+            if end > start:
+                top = max(range(start, end), key=lambda r: (q[r], -r))
+                best.append(q[top])
+                first.append(top)
+        return has_rows, best, first
+    
+    def bellman_backup(self, values) -> Tuple:
+        """One synchronous sweep; returns (new values, max change)."""
+        has_rows, best, _ = self._best_rows(self.q_rows(values), with_rows=False)
+        if np is not None:
+            new_values = np.array(values, dtype=float)
+            new_values[has_rows] = best
+            delta = float(np.abs(new_values - values).max()) if len(new_values) else 0.0
+            return new_values, delta
+        new_values = array('d', values)
+        best_iter = iter(best)
+        for s, available in enumerate(has_rows):
+            if available:
+                new_values[s] = next(best_iter)
+        delta = max((abs(a - b) for a, b in zip(new_values, values)), default=0.0)
+        return new_values, delta
+    
+    def value_iteration(self, iterations: int = 100, threshold: float = 0.01):
+        """
+        Synchronous value iteration over the CSR rows.
+        
+        V(s) = max_a Σ P(s'|s,a) [R(s,a,s') + γV(s')]
+        
+        Starts from value_vector (zeros after build) and leaves the
+        result there; states without actions keep their value.
+        """
+        started = time.perf_counter()
+        self._csr()
+        values = self.value_vector
+        sweeps = 0
+        for sweeps in range(1, iterations + 1):
+            values, delta = self.bellman_backup(values)
+            if delta < threshold:
+                break
+        return self._finish_solve('value_iteration', values, sweeps, started,
+                                  sweeps * len(self.states))
+    
+    def policy_iteration(self, iterations: int = 100):
+        """
+        Howard's policy iteration with exact policy evaluation.
+        
+        Each iteration solves (I - γP_π)V = R_π for the current policy
+        (dense up to DENSE_SOLVE_LIMIT states, sparse with SciPy beyond,
+        otherwise iterated to EVAL_TOLERANCE), then improves greedily,
+        keeping the current action on ties. Stops when the policy is
+        stable, usually after a handful of iterations.
+        """
+        started = time.perf_counter()
+        self._csr()
+        values = self.value_vector
+        rows = self._greedy_rows(values)
+        count = 0
+        for count in range(1, iterations + 1):
+            values = self._evaluate_policy(rows, values)
+            improved = self._greedy_rows(values, rows)
+            if list(improved) == list(rows):
+                break
+            rows = improved
+        return self._finish_solve('policy_iteration', values, count, started)
+    
+    def modified_policy_iteration(self, k: int = 10, iterations: int = 100,
+                                  threshold: float = 0.01):
+        """
+        Modified policy iteration (Puterman & Shin 1978).
+        
+        Each iteration takes the greedy policy for the current values and
+        applies its backup T_π k times instead of solving for V_π
+        exactly. k = 1 is value iteration; large k approaches policy
+        iteration. Stops once the Bellman residual falls below threshold.
+        """
+        started = time.perf_counter()
+        self._csr()
+        values = self.value_vector
+        count = 0
+        for count in range(1, iterations + 1):
+            rows = self._greedy_rows(values)
+            backed_up = self._apply_policy(rows, values)
+            residual = self._max_change(backed_up, values)
+            values = backed_up
+            if residual < threshold:
+                break
+            for _ in range(k - 1):
+                values = self._apply_policy(rows, values)
+        return self._finish_solve('modified_policy_iteration', values, count, started)
+    
+    def gauss_seidel(self, iterations: int = 100, threshold: float = 0.01,
+                     order: Optional[List[int]] = None):
+        """
+        In-place (Gauss-Seidel) value iteration.
+        
+        Each state's backup immediately uses the values already updated in
+        the same sweep, so on chain-like models swept from the goal end
+        values travel the whole chain in one sweep instead of one step per
+        sweep. The default order is the reverse of the state order, which
+        for generated models means farthest from the initial states first.
+        """
+        started = time.perf_counter()
+        backup = self._state_backup()
+        values = list(self.value_vector)
+        order = list(order) if order is not None else list(range(len(self.states) - 1, -1, -1))
+        sweeps = 0
+        for sweeps in range(1, iterations + 1):
+            delta = 0.0
+            for s in order:
+                new_value = backup(s, values)
+                if new_value is not None:
+                    delta = max(delta, abs(new_value - values[s]))
+                    values[s] = new_value
+            if delta < threshold:
+                break
+        return self._finish_solve('gauss_seidel', self._vector(values), sweeps, started,
+                                  sweeps * len(order))
+    
+    def prioritized_sweeping(self, threshold: float = 0.01, max_updates: Optional[int] = None,
+                             seeds: Optional[Iterable[int]] = None):
+        """
+        Asynchronous value iteration driven by a priority queue.
+        
+        States are backed up one at a time, largest Bellman error first.
+        After a state changes only its predecessors (states with a
+        transition into it) have their error recomputed, so work goes
+        where values are still moving. Stops when every error is below
+        threshold or after max_updates backups (default: as many as 100
+        full sweeps).
+        
+        With seeds (state indices), only those states are checked at the
+        start instead of the whole model: for values that were already
+        converged before the seed states' transitions changed.
+        """
+        started = time.perf_counter()
+        backup = self._state_backup()
+        pred_start, preds = self._predecessor_lists()
+        values = self.value_vector
+        if seeds is None:
+            new_values, _ = self.bellman_backup(values)
+            errors = [abs(a - b) for a, b in zip(new_values, values)]
+            values = list(values)
+        else:
+            values = list(values)
+            errors = [0.0] * len(values)
+            for s in seeds:
+                new_value = backup(s, values)
+                errors[s] = abs(new_value - values[s]) if new_value is not None else 0.0
+        if max_updates is None:
+            max_updates = 100 * len(self.states)
+        
+        queue = [(-e, s) for s, e in enumerate(errors) if e >= threshold]
+        heapq.heapify(queue)
+        updates = 0
+        while queue and updates < max_updates:
+            neg_error, s = heapq.heappop(queue)
+            if -neg_error != errors[s]:
+                continue  # superseded entry
+            errors[s] = 0.0
+            values[s] = backup(s, values)
+            updates += 1
+            for k in range(pred_start[s], pred_start[s + 1]):
+                p = preds[k]
+                new_value = backup(p, values)
+                error = abs(new_value - values[p]) if new_value is not None else 0.0
+                if error != errors[p]:
+                    errors[p] = error if error >= threshold else 0.0
+                    if error >= threshold:
+                        heapq.heappush(queue, (-error, p))
+        return self._finish_solve('prioritized_sweeping', self._vector(values), updates,
+                                  started, updates)
+    
+    def _state_backup(self) -> Callable[[int, List[float]], Optional[float]]:
+        """
+        backup(s, values) -> new value of s, or None for a state without
+        actions, over plain Python lists (fast scalar access for the
+        asynchronous solvers).
+        
+        Like a Gauss-Seidel step for a linear system, the backup solves
+        the state's own equation: an action whose transitions return to s
+        with probability p_ss is worth Q_a = c_a / (1 - γ p_ss), where c_a
+        covers every other term. The fixed point is the same as the
+        Bellman backup's, but absorbing states such as INSPIRING settle in
+        one update instead of shrinking their error by γ per update.
+        """
+        arrays = tuple(arr.tolist() if np is not None else arr for arr in self._csr())
+        state_rows, _, row_start, next_state, probability, reward = arrays
+        gamma = self.gamma
+        
+        def backup(s: int, values) -> Optional[float]:
+            best = None
+            for row in range(state_rows[s], state_rows[s + 1]):
+                total = 0
+                stay = 0
+                for k in range(row_start[row], row_start[row + 1]):
+                    if next_state[k] == s:
+                        stay += probability[k]
+                        total += probability[k] * reward[k]
+                    else:
+                        total += probability[k] * (reward[k] + gamma * values[next_state[k]])
+                if gamma * stay < 1:
+                    total /= 1 - gamma * stay
+                else:  # undiscounted pure self-loop: no finite solution, plain backup
+                    total += gamma * stay * values[s]
+                if best is None or total > best:
+                    best = total
+            return best
+        
+        return backup
+    
+    def _predecessor_lists(self) -> Tuple:
+        """
+        Reverse adjacency: preds[pred_start[s]:pred_start[s + 1]] are the
+        distinct states with a transition into s (cached with the CSR).
+        """
+        if self._predecessors is None:
+            state_rows, _, row_start, next_state, _, _ = self._csr()
+            n = len(self.states)
+            if np is not None:
+                row_state = np.repeat(np.arange(n), np.diff(state_rows))
+                entry_state = row_state[np.repeat(np.arange(len(row_start) - 1), np.diff(row_start))]
+                pairs = np.unique(next_state.astype(np.int64) * n + entry_state)
+                targets, sources = np.divmod(pairs, n)
+                pred_start = np.zeros(n + 1, dtype=np.int64)
+                np.cumsum(np.bincount(targets, minlength=n), out=pred_start[1:])
+                self._predecessors = (pred_start.tolist(), sources.tolist())
+            else:
+                preds: List[set] = [set() for _ in range(n)]
+                for s in range(n):
+                    for row in range(state_rows[s], state_rows[s + 1]):
+                        for k in range(row_start[row], row_start[row + 1]):
+                            preds[next_state[k]].add(s)
+                pred_start, flat = array('q', [0]), array('q')
+                for group in preds:
+                    flat.extend(sorted(group))
+                    pred_start.append(len(flat))
+                self._predecessors = (pred_start, flat)
+        return self._predecessors
+    
+    def resolve(self, threshold: float = 0.01, max_updates: Optional[int] = None) -> Dict:
+        """
+        Re-solve after model edits, warm-started from value_vector.
+        
+        Prioritized sweeping is seeded with the states passed to
+        mark_dirty() since the last resolve, and changes spread from them
+        through predecessor lists only, so an edit to one transition
+        touches the states upstream of it rather than the whole model.
+        Returns the policy diff against the last extract_policy(), as
+        {state: (old action, new action)} (None where a state had or has
+        no action), and leaves the new policy in policy_vector.
+        """
+        previous = self.policy_vector
+        dirty = sorted(self._dirty)
+        seeds = set(dirty)
+        # A state that lost its last action is terminal now and worth 0, as
+        # in a fresh solve; the states leading into it must then catch up
+        state_rows = self._csr()[0]
+        pred_start, preds = self._predecessor_lists()
+        for s in dirty:
+            if state_rows[s] == state_rows[s + 1] and self.value_vector[s] != 0:
+                self.value_vector[s] = 0.0
+                seeds.update(preds[pred_start[s]:pred_start[s + 1]])
+        # Vector forms, whatever contract a subclass wraps them in
+        SparseMDP.prioritized_sweeping(self, threshold, max_updates, seeds=sorted(seeds))
+        self.solver_stats['dirty'] = len(dirty)
+        current = SparseMDP.extract_policy(self)
+        previous = list(previous) if previous is not None else []
+        previous += [-1] * (len(current) - len(previous))
+        return {self.states[s]: (self.actions[old] if old >= 0 else None,
+                                 self.actions[new] if new >= 0 else None)
+                for s, (old, new) in enumerate(zip(previous, current)) if old != new}
+    
+    def solve(self, method: str = 'value_iteration', **options):
+        """Run one of SOLVERS by name; see solver_stats afterwards."""
+        if method not in self.SOLVERS:
+            raise ValueError(f"Unknown solver {method!r}; expected one of {self.SOLVERS}")
+        return getattr(self, method)(**options)
+    
+    def _finish_solve(self, solver: str, values, iterations: int, started: float,
+                      updates: Optional[int] = None):
+        """
+        Store the result and record solver_stats ('updates' counts
+        single-state backups for the solvers where that is meaningful).
+        """
+        self.value_vector = values
+        self._dirty.clear()
+        self.solver_stats = {
+            'solver': solver,
+            'iterations': iterations,
+            'updates': updates,
+            'seconds': time.perf_counter() - started,
+            'residual': self.bellman_backup(values)[1]
+        }
+        return values
+    
+    @staticmethod
+    def _max_change(a, b) -> float:
+        if np is not None:
+            return float(np.abs(a - b).max()) if len(a) else 0.0
+        return max((abs(x - y) for x, y in zip(a, b)), default=0.0)
+    
+    def _greedy_rows(self, values, current=None):
+        """
+        Row of the greedy action per state (-1 if none).
+        
+        With current, a state keeps its current row when that row is
+        already optimal, so policy iteration cannot cycle between ties.
+        """
+        q = self.q_rows(values)
+        has_rows, best, first = self._best_rows(q)
+        if np is not None:
+            rows = np.full(len(self.states), -1, dtype=np.int64)
+            rows[has_rows] = first
+            if current is not None:
+                keep = (current >= 0) & (q[np.maximum(current, 0)] >= q[np.maximum(rows, 0)])
+                rows[keep] = current[keep]
+            return rows
+        rows = array('q', [-1] * len(self.states))
+        first_iter = iter(first)
+        for s, available in enumerate(has_rows):
+            if available:
+                rows[s] = next(first_iter)
+                if current is not None and q[current[s]] >= q[rows[s]]:
+                    rows[s] = current[s]
+        return rows
+    
+    def _policy_entries(self, rows) -> Tuple:
+        """(acting states, their nonzero entries, per-state segment starts)."""
+        _, _, row_start, _, _, _ = self._csr()
+        acting = np.flatnonzero(rows >= 0)
+        chosen = rows[acting]
+        lengths = row_start[chosen + 1] - row_start[chosen]
+        segment = np.cumsum(lengths) - lengths
+        entries = np.repeat(row_start[chosen] - segment, lengths) + np.arange(int(lengths.sum()))
+        return acting, entries, segment, lengths
+    
+    def _apply_policy(self, rows, values):
+        """One backup under a fixed policy: V(s) = Σ P(s'|s,π(s)) [R + γV(s')]."""
+        _, _, row_start, next_state, probability, reward = self._csr()
+        if np is not None:
+            acting, entries, segment, _ = self._policy_entries(rows)
+            new_values = np.array(values, dtype=float)
+            if len(entries):
+                contrib = probability[entries] * (reward[entries] + self.gamma * values[next_state[entries]])
+                new_values[acting] = np.add.reduceat(contrib, segment)
+            return new_values
+        new_values = array('d', values)
+        for s, row in enumerate(rows):
+            if row >= 0:
+                total = 0
+                for k in range(row_start[row], row_start[row + 1]):
+                    total += probability[k] * (reward[k] + self.gamma * values[next_state[k]])
+                new_values[s] = total
+        return new_values
+    
+    def _evaluate_policy(self, rows, values):
+        """V_π for a fixed policy; states without actions keep their value."""
+        _, _, _, next_state, probability, reward = self._csr()
+        n = len(self.states)
+        if np is not None and (n <= self.DENSE_SOLVE_LIMIT or sparse is not None):
+            acting, entries, segment, lengths = self._policy_entries(rows)
+            rhs = np.array(values, dtype=float)
+            if len(entries):
+                rhs[acting] = np.add.reduceat(probability[entries] * reward[entries], segment)
+            entry_state = np.repeat(acting, lengths)
+            weights = -self.gamma * probability[entries]
+            if n <= self.DENSE_SOLVE_LIMIT:
+                system = np.eye(n)
+                np.add.at(system, (entry_state, next_state[entries]), weights)
+                return np.linalg.solve(system, rhs)
+            system = sparse.identity(n, format='csr') + sparse.csr_matrix(
+                (weights, (entry_state, next_state[entries])), shape=(n, n))
+            return np.asarray(spsolve(system.tocsc(), rhs))
+        # No direct solver available: iterate T_π to a tight tolerance
+        while True:
+            new_values = self._apply_policy(rows, values)
+            change = self._max_change(new_values, values)
+            values = new_values
+            scale = max((abs(v) for v in values), default=0.0)
+            if change <= self.EVAL_TOLERANCE * max(1.0, scale):
+                return values
+    
+    def extract_policy(self):
+        """Greedy action index per state (-1 if none); ties go to the lower index."""
+        row_action = self._csr()[1]
+        has_rows, _, first = self._best_rows(self.q_rows(self.value_vector))
+        if np is not None:
+            policy = np.full(len(self.states), -1, dtype=np.int64)
+            policy[has_rows] = row_action[first]
+        else:
+            policy = array('q', [-1] * len(self.states))
+            first_iter = iter(first)
+            for s, available in enumerate(has_rows):
+                if available:
+                    policy[s] = row_action[next(first_iter)]
+        self.policy_vector = policy
+        return policy
+    
+    def value(self, state: Hashable) -> float:
+        """Current value of a state."""
+        self._csr()
+        return float(self.value_vector[self.state_index[state]])
+    
+    def action(self, state: Hashable) -> Optional[Hashable]:
+        """Action the extracted policy takes in a state (None if none)."""
+        if self.policy_vector is None:
+            self.extract_policy()
+        a = int(self.policy_vector[self.state_index[state]])
+        return self.actions[a] if a >= 0 else None
+    
+    def to_dense(self) -> CompiledMDP:
+        """Dense P/R arrays and action mask, for small models."""
+        if np is None:
+            raise ImportError("SparseMDP.to_dense() requires NumPy")
+        state_rows, row_action, row_start, next_state, probability, reward = self._csr()
+        shape = (len(self.states), len(self.actions), len(self.states))
+        P, R = np.zeros(shape), np.zeros(shape)
+        mask = np.zeros(shape[:2], dtype=bool)
+        row_state = np.repeat(np.arange(len(self.states)), np.diff(state_rows))
+        entry_row = np.repeat(np.arange(len(row_action)), np.diff(row_start))
+        s, a = row_state[entry_row], row_action[entry_row]
+        np.add.at(P, (s, a, next_state), probability)
+        R[s, a, next_state] = reward
+        mask[row_state, row_action] = True
+        return CompiledMDP(list(self.states), list(self.actions), P, R, mask)
+    
+    def simulate_batch(self, start_state: Hashable, trajectories: int = 1_000_000,
+                       max_steps: int = 10, stop_states: Iterable[Hashable] = (),
+                       seed=None, processes: int = 1) -> Dict:
+        """
+        Monte Carlo rollouts of the extracted policy, advanced all at once.
+        
+        Trajectories run in chunks of SIMULATION_CHUNK; chunk i draws from
+        its own numpy.random.Generator seeded with the i-th child of
+        SeedSequence(seed), so the result depends only on seed and
+        trajectories, not on processes (chunks go to a process pool when
+        processes > 1). As in simulate_journey, probability mass a row
+        leaves unassigned goes to its first transition, and a trajectory
+        ends on entering one of stop_states or a state without an action.
+        
+        Returns summary statistics:
+          seed          entropy to pass back for an identical rerun
+          reached       fraction of trajectories that hit a stop state
+          hitting_time  steps to the first stop state (over those that
+                        did): mean, std, median, p90, p99 and histogram
+                        (trajectory count per step, index 0 = started there)
+          return        discounted return: mean, variance, std, min, max
+          occupancy     (max_steps + 1) x states array, fraction of
+                        trajectories in each state after each step
+        """
+        if np is None:
+            raise ImportError("SparseMDP.simulate_batch() requires NumPy")
+        if trajectories < 1:
+            raise ValueError("simulate_batch() needs at least one trajectory")
+        state_rows, row_action, row_start, next_state, probability, reward = self._csr()
+        n = len(self.states)
+        policy = self.policy_vector if self.policy_vector is not None else self.extract_policy()
+        
+        # Row each state follows under the policy
+        row_state = np.repeat(np.arange(n), np.diff(state_rows))
+        follows = row_action == np.asarray(policy)[row_state]
+        policy_row = np.full(n, -1, dtype=np.int64)
+        policy_row[row_state[follows]] = np.flatnonzero(follows)
+        
+        # Sampling keys: row + cumulative probability within the row, with the
+        # unassigned mass on the first entry and each row ending at row + 1,
+        # so searchsorted(keys, row + u) picks the entry for uniform u (clipped
+        # to the row's last entry, as row + u can round up to row + 1)
+        lengths = np.diff(row_start)
+        entry_row = np.repeat(np.arange(len(lengths)), lengths)
+        cumulative = np.cumsum(probability)
+        first = row_start[:-1]
+        within = cumulative - np.repeat(cumulative[first] - probability[first], lengths)
+        slack = np.maximum(1.0 - within[row_start[1:] - 1], 0.0)
+        keys = entry_row + np.minimum(within + np.repeat(slack, lengths), 1.0)
+        keys[row_start[1:] - 1] = np.arange(1, len(lengths) + 1)
+        
+        stop = np.zeros(n, dtype=bool)
+        stop[[self.state_index[s] for s in stop_states]] = True
+        model = (policy_row, keys, row_start[1:] - 1, next_state, reward, stop, self.gamma)
+        
+        sequence = np.random.SeedSequence(seed)
+        sizes = [min(self.SIMULATION_CHUNK, trajectories - i)
+                 for i in range(0, trajectories, self.SIMULATION_CHUNK)]
+        jobs = [(model, self.state_index[start_state], size, max_steps, child)
+                for size, child in zip(sizes, sequence.spawn(len(sizes)))]
+        if processes > 1 and len(jobs) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(processes) as pool:
+                chunks = list(pool.map(_simulate_chunk, *zip(*jobs)))
+        else:
+            chunks = [_simulate_chunk(*job) for job in jobs]
+        
+        # Combine per-chunk moments (Chan et al.)
+        mean = sum(c['count'] * c['mean'] for c in chunks) / trajectories
+        m2 = sum(c['m2'] + c['count'] * (c['mean'] - mean) ** 2 for c in chunks)
+        variance = m2 / trajectories
+        hits = sum(c['hits'] for c in chunks)
+        reached = int(hits.sum())
+        steps = np.arange(max_steps + 1)
+        hit_mean = float(hits @ steps / reached) if reached else float('nan')
+        hit_var = float(hits @ (steps - hit_mean) ** 2 / reached) if reached else float('nan')
+        
+        def quantile(q: float) -> Optional[int]:
+            return int(np.searchsorted(np.cumsum(hits), q * reached)) if reached else None
+        
+        return {
+            'trajectories': trajectories,
+            'seed': sequence.entropy,
+            'reached': reached / trajectories,
+            'hitting_time': {
+                'mean': hit_mean,
+                'std': hit_var ** 0.5,
+                'median': quantile(0.5),
+                'p90': quantile(0.9),
+                'p99': quantile(0.99),
+                'histogram': hits.tolist()
+            },
+            'return': {
+                'mean': float(mean),
+                'variance': float(variance),
+                'std': float(variance) ** 0.5,
+                'min': float(min(c['min'] for c in chunks)),
+                'max': float(max(c['max'] for c in chunks))
+            },
+            'occupancy': sum(c['occupancy'] for c in chunks) / trajectories
+        }
+    
+    def sweep(self, gammas: Iterable[float], rewards: Optional[List] = None,
+              iterations: int = 100, threshold: float = 0.01, processes: int = 1) -> Dict:
+        """
+        Value iteration for a grid of model variants solved side by side.
+        
+        The grid is every reward vector in rewards (arrays aligned with
+        the CSR nonzeros; default: the model's own) crossed with every
+        discount factor, reward-major. All variants share the transition
+        structure, so their values (from zero) are stacked into one variants x states
+        array and backed up together; each variant stops on its own
+        threshold, exactly when value_iteration() would. With processes
+        > 1 the variants are split across a process pool.
+        
+        Returns arrays indexed by variant: 'gamma', 'rewards' (index into
+        rewards), 'values', 'policy' (action indices, lower index on
+        ties, -1 without actions) and 'iterations'. The model's own
+        value_vector and policy_vector are left untouched.
+        """
+        if np is None:
+            raise ImportError("SparseMDP.sweep() requires NumPy")
+        csr = self._csr()
+        gammas = [float(g) for g in gammas]
+        reward_table = np.array([csr[5]] if rewards is None else rewards, dtype=float)
+        if reward_table.ndim != 2 or reward_table.shape[1] != len(csr[5]):
+            raise ValueError(f"Reward vectors must have {len(csr[5])} entries (one per transition)")
+        grid_gamma = np.tile(gammas, len(reward_table))
+        grid_rewards = np.repeat(np.arange(len(reward_table)), len(gammas))
+        
+        parts = np.array_split(np.arange(len(grid_gamma)), max(1, min(processes, len(grid_gamma))))
+        jobs = [(csr, grid_gamma[part], reward_table, grid_rewards[part], iterations, threshold)
+                for part in parts if len(part)]
+        if len(jobs) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(len(jobs)) as pool:
+                results = list(pool.map(_sweep_chunk, *zip(*jobs)))
+        else:
+            results = [_sweep_chunk(*job) for job in jobs]
+        
+        values, policy, sweeps = (np.concatenate([r[i] for r in results]) for i in range(3))
+        return {
+            'gamma': grid_gamma,
+            'rewards': grid_rewards,
+            'values': values,
+            'policy': policy,
+            'iterations': sweeps
+        }
+
+
+def _simulate_chunk(model: Tuple, start: int, count: int, max_steps: int,
+                    seed: 'np.random.SeedSequence') -> Dict:
+    """Advance count trajectories together (see SparseMDP.simulate_batch)."""
+    policy_row, keys, row_last, next_state, reward, stop, gamma = model
+    n = len(policy_row)
+    rng = np.random.default_rng(seed)
+    state = np.full(count, start, dtype=np.int64)
+    active = np.full(count, not stop[start])
+    hits = np.zeros(max_steps + 1, dtype=np.int64)
+    hits[0] = count - int(active.sum())
+    returns = np.zeros(count)
+    occupancy = np.zeros((max_steps + 1, n), dtype=np.int64)
+    occupancy[0, start] = count
+    discount = 1.0
+    
+    for step in range(1, max_steps + 1):
+        moving = np.flatnonzero(active)
+        if not len(moving):
+            occupancy[step:] = np.bincount(state, minlength=n)
+            break
+        rows = policy_row[state[moving]]
+        acting = rows >= 0
+        active[moving[~acting]] = False
+        moving, rows = moving[acting], rows[acting]
+        k = np.searchsorted(keys, rows + rng.random(len(moving)), side='right')
+        k = np.minimum(k, row_last[rows])
+        returns[moving] += discount * reward[k]
+        state[moving] = next_state[k]
+        arrived = stop[state[moving]]
+        hits[step] = int(arrived.sum())
+        active[moving[arrived]] = False
+        discount *= gamma
+        occupancy[step] = np.bincount(state, minlength=n)
+    
+    mean = returns.mean() if count else 0.0
+    return {
+        'count': count,
+        'mean': mean,
+        'm2': float(((returns - mean) ** 2).sum()),
+        'min': returns.min() if count else float('inf'),
+        'max': returns.max() if count else float('-inf'),
+        'hits': hits,
+        'occupancy': occupancy
+    }
+
+
+def _sweep_chunk(csr: Tuple, gammas: 'np.ndarray', reward_table: 'np.ndarray',
+                 reward_of: 'np.ndarray', iterations: int, threshold: float) -> Tuple:
+    """Stacked value iteration for some variants (see SparseMDP.sweep)."""
+    state_rows, row_action, row_start, next_state, probability, _ = csr
+    n = len(state_rows) - 1
+    values = np.zeros((len(gammas), n))
+    sweeps = np.zeros(len(gammas), dtype=np.int64)
+    has_rows = state_rows[1:] > state_rows[:-1]
+    starts = state_rows[:-1][has_rows]
+    
+    def q_rows(variants, v):
+        contrib = probability * (reward_table[reward_of[variants]]
+                                 + gammas[variants, None] * v[:, next_state])
+        return np.add.reduceat(contrib, row_start[:-1], axis=1)
+    
+    active = np.arange(len(gammas))
+    if len(probability) and len(starts):
+        for sweep in range(1, iterations + 1):
+            v = values[active]
+            new_values = v.copy()
+            new_values[:, has_rows] = np.maximum.reduceat(q_rows(active, v), starts, axis=1)
+            delta = np.abs(new_values - v).max(axis=1)
+            values[active] = new_values
+            sweeps[active] = sweep
+            active = active[delta >= threshold]
+            if not len(active):
+                break
+    
+    policy = np.full(values.shape, -1, dtype=np.int64)
+    if len(probability) and len(starts):
+        q = q_rows(np.arange(len(gammas)), values)
+        best = np.maximum.reduceat(q, starts, axis=1)
+        counts = np.diff(state_rows)[has_rows]
+        rows = np.arange(q.shape[1])
+        first = np.minimum.reduceat(np.where(q == np.repeat(best, counts, axis=1), rows, len(rows)),
+                                    starts, axis=1)
+        policy[:, has_rows] = row_action[first]
+    return values, policy, sweeps
+
+
+class MayaMDP(SparseMDP):
     """
     Markov Decision Process for Maya's Transformation Story.
     
@@ -66,13 +965,19 @@ class MayaMDP:
     The key insight: The optimal policy isn't just about maximizing
     reward - it's about recognizing that giving and receiving are
     part of the same cycle.
+    
+    The story is a SparseMDP whose successor function reads the
+    narrated transition list; values and policy are also kept as dicts
+    keyed by MayaState for the frontend.
     """
     
     def __init__(self, discount_factor: float = 0.9):
-        self.gamma = discount_factor
-        self.states = list(MayaState)
-        self.actions = list(MayaAction)
-        self.transitions: List[MDPTransition] = []
+        super().__init__(self._successors, states=list(MayaState),
+                         actions=list(MayaAction), discount_factor=discount_factor)
+        # (state, action) -> transitions, rebuilt when the list or a transition changes
+        self._index: Optional[Dict[Tuple[MayaState, MayaAction], List[MDPTransition]]] = None
+        self._indexed_at = (-1, -1)
+        self.transitions = []
         self.values: Dict[MayaState, float] = {}
         self.policy: Dict[MayaState, MayaAction] = {}
         
@@ -177,73 +1082,251 @@ class MayaMDP:
         for state in self.states:
             self.values[state] = 0.0
     
+    def reset_values(self):
+        """Start the next solve from all-zero values (dict and vector)."""
+        self._initialize_values()
+        super().reset_values()
+    
+    @property
+    def transitions(self) -> TransitionList:
+        """The narrated transitions; any list is stored as a TransitionList."""
+        return self._transitions
+    
+    @transitions.setter
+    def transitions(self, transitions: Iterable[MDPTransition]):
+        self._transitions = TransitionList(transitions)
+        self._index = None
+    
+    def _transition_index(self) -> Dict[Tuple[MayaState, MayaAction], List[MDPTransition]]:
+        """
+        Transitions grouped by (state, action).
+        
+        Rebuilt (and the CSR arrays dropped) whenever the list is changed
+        or replaced, or any MDPTransition field is assigned.
+        """
+        if self._index is None or self._indexed_at != (self.transitions.revision, MDPTransition.edits):
+            self._index = {}
+            for t in self.transitions:
+                self._index.setdefault((t.from_state, t.action), []).append(t)
+            self._indexed_at = (self.transitions.revision, MDPTransition.edits)
+            self.invalidate()
+        return self._index
+    
+    def _successors(self, state: MayaState) -> Iterable[Tuple[MayaAction, MayaState, float, float]]:
+        """Successor function of the story: the narrated transitions."""
+        for action in self.get_available_actions(state):
+            for t in self.get_transitions(state, action):
+                yield t.action, t.to_state, t.probability, t.reward
+    
+    def _csr(self) -> Tuple:
+        self._transition_index()  # drops stale arrays if the list changed
+        return super()._csr()
+    
     def get_transitions(self, state: MayaState, action: MayaAction) -> List[MDPTransition]:
         """Get all possible transitions for a state-action pair."""
-        return [t for t in self.transitions 
-                if t.from_state == state and t.action == action]
+        return self._transition_index().get((state, action), [])
     
     def get_available_actions(self, state: MayaState) -> List[MayaAction]:
         """Get available actions in a state."""
-        return list(set(t.action for t in self.transitions if t.from_state == state))
+        index = self._transition_index()
+        return [a for a in self.actions if (state, a) in index]
+    
+    def _transition_entries(self) -> List[int]:
+        """CSR nonzero position of each entry of transitions, in list order."""
+        self._csr()
+        position = {}
+        for state in self.states:
+            for action in self.get_available_actions(state):
+                for t in self.get_transitions(state, action):
+                    position[id(t)] = len(position)
+        return [position[id(t)] for t in self.transitions]
+    
+    def sweep(self, gammas: Iterable[float],
+              reward_overrides: Optional[List[Dict[Tuple[MayaState, MayaAction, MayaState], float]]] = None,
+              iterations: int = 100, threshold: float = 0.01, processes: int = 1) -> Dict:
+        """
+        Solve the story for every discount factor x reward variant at once.
+        
+        Each reward override maps (from_state, action, to_state) to a new
+        reward for that MDPTransition; the others keep theirs. Variants
+        are solved together by SparseMDP.sweep(), so the transition list
+        is neither rebuilt nor modified.
+        
+        Returns 'variants', one row per (override, gamma) with 'gamma',
+        'rewards' (index into reward_overrides), 'values', 'policy' and
+        'iterations', and 'change_points': for each override, where the
+        policy differs between consecutive gammas (in the order given),
+        with the changed states as {state: (old action, new action)}.
+        """
+        if np is None:
+            raise ImportError("MayaMDP.sweep() requires NumPy")
+        overrides = reward_overrides or [{}]
+        base = np.array(self._csr()[5], dtype=float)
+        entries = self._transition_entries()
+        keyed = {}
+        for t, k in zip(self.transitions, entries):
+            keyed.setdefault((t.from_state, t.action, t.to_state), []).append(k)
+        table = []
+        for override in overrides:
+            rewards = base.copy()
+            for key, reward in override.items():
+                if key not in keyed:
+                    raise ValueError(f"No transition {key!r} to override")
+                rewards[keyed[key]] = reward
+            table.append(rewards)
+        
+        grid = super().sweep(gammas, table, iterations, threshold, processes)
+        variants = []
+        for i in range(len(grid['gamma'])):
+            variants.append({
+                'gamma': float(grid['gamma'][i]),
+                'rewards': int(grid['rewards'][i]),
+                'values': {s.value: float(v) for s, v in zip(self.states, grid['values'][i])},
+                'policy': {s.value: self.actions[a].value
+                           for s, a in zip(self.states, grid['policy'][i]) if a >= 0},
+                'iterations': int(grid['iterations'][i])
+            })
+        
+        change_points = []
+        for before, after in zip(variants, variants[1:]):
+            if before['rewards'] != after['rewards']:
+                continue
+            changes = {s: (before['policy'].get(s), after['policy'].get(s))
+                       for s in set(before['policy']) | set(after['policy'])
+                       if before['policy'].get(s) != after['policy'].get(s)}
+            if changes:
+                change_points.append({
+                    'rewards': before['rewards'],
+                    'from_gamma': before['gamma'],
+                    'to_gamma': after['gamma'],
+                    'changes': changes
+                })
+        return {'variants': variants, 'change_points': change_points}
+    
+    def compile(self) -> CompiledMDP:
+        """
+        Rebuild the model from the transition list and return its dense
+        P/R arrays and action mask.
+        """
+        self._index = None
+        self._transition_index()
+        self.build()
+        return self.to_dense()
     
     def value_iteration(self, iterations: int = 100, threshold: float = 0.01) -> Dict[MayaState, float]:
         """
         Perform value iteration to find optimal values.
         
         V(s) = max_a Σ P(s'|s,a) [R(s,a,s') + γV(s')]
-        """
-        for _ in range(iterations):
-            delta = 0
-            new_values = {}
-            
-            for state in self.states:
-                if not self.get_available_actions(state):
-                    new_values[state] = self.values[state]
-                    continue
-                
-                max_value = float('-inf')
-                
-                for action in self.get_available_actions(state):
-                    action_value = 0
-                    for trans in self.get_transitions(state, action):
-                        action_value += trans.probability * (
-                            trans.reward + self.gamma * self.values[trans.to_state]
-                        )
-                    max_value = max(max_value, action_value)
-                
-                new_values[state] = max_value
-                delta = max(delta, abs(new_values[state] - self.values[state]))
-            
-            self.values = new_values
-            
-            if delta < threshold:
-                break
         
+        Runs on the sparse arrays (vectorized with NumPy), starting from
+        the current values dict.
+        """
+        return self._solve_dict(super().value_iteration, iterations, threshold)
+    
+    def policy_iteration(self, iterations: int = 100) -> Dict[MayaState, float]:
+        """Policy iteration (see SparseMDP); same contract as value_iteration()."""
+        return self._solve_dict(super().policy_iteration, iterations)
+    
+    def modified_policy_iteration(self, k: int = 10, iterations: int = 100,
+                                  threshold: float = 0.01) -> Dict[MayaState, float]:
+        """Modified policy iteration (see SparseMDP); same contract as value_iteration()."""
+        return self._solve_dict(super().modified_policy_iteration, k, iterations, threshold)
+    
+    def gauss_seidel(self, iterations: int = 100, threshold: float = 0.01,
+                     order: Optional[List[int]] = None) -> Dict[MayaState, float]:
+        """In-place value iteration (see SparseMDP); same contract as value_iteration()."""
+        return self._solve_dict(super().gauss_seidel, iterations, threshold, order)
+    
+    def prioritized_sweeping(self, threshold: float = 0.01,
+                             max_updates: Optional[int] = None) -> Dict[MayaState, float]:
+        """Prioritized sweeping (see SparseMDP); same contract as value_iteration()."""
+        return self._solve_dict(super().prioritized_sweeping, threshold, max_updates)
+    
+    def _solve_dict(self, solver: Callable, *args) -> Dict[MayaState, float]:
+        """Run a vector solver starting from, and writing back to, the values dict."""
+        self._csr()
+        self.value_vector = self._vector([self.values[s] for s in self.states])
+        solver(*args)
+        self.values = {s: float(v) for s, v in zip(self.states, self.value_vector)}
         return self.values
     
+    def _sync_policy_vector(self):
+        """Copy the policy dict into policy_vector (action indices, -1 if none)."""
+        self._csr()
+        policy = [-1] * len(self.states)
+        for state, action in self.policy.items():
+            policy[self.state_index[state]] = self.action_index[action]
+        self.policy_vector = np.array(policy, dtype=np.int64) if np is not None else array('q', policy)
+    
+    def _find_transition(self, from_state: MayaState, action: MayaAction,
+                         to_state: MayaState) -> MDPTransition:
+        for t in self.get_transitions(from_state, action):
+            if t.to_state == to_state:
+                return t
+        raise ValueError(f"No transition {(from_state, action, to_state)!r}")
+    
+    def update_transition(self, from_state: MayaState, action: MayaAction, to_state: MayaState,
+                          probability: Optional[float] = None,
+                          reward: Optional[float] = None) -> MDPTransition:
+        """
+        Change the probability and/or reward of a transition in place.
+        
+        The compiled arrays are patched rather than rebuilt, and
+        from_state is marked dirty for resolve().
+        """
+        t = self._find_transition(from_state, action, to_state)
+        position = next(i for i, other in enumerate(self.transitions) if other is t)
+        k = self._transition_entries()[position]
+        if probability is not None:
+            t.probability = probability
+        if reward is not None:
+            t.reward = reward
+        _, _, _, _, probabilities, rewards = super()._csr()
+        probabilities[k], rewards[k] = t.probability, t.reward
+        self._indexed_at = (self.transitions.revision, MDPTransition.edits)  # patched, not stale
+        self.mark_dirty(from_state)
+        return t
+    
+    def add_transition(self, transition: MDPTransition):
+        """Add a transition; its from_state is marked dirty for resolve()."""
+        self.transitions.append(transition)
+        self.mark_dirty(transition.from_state)
+    
+    def remove_transition(self, from_state: MayaState, action: MayaAction,
+                          to_state: MayaState) -> MDPTransition:
+        """Remove a transition; from_state is marked dirty for resolve()."""
+        t = self._find_transition(from_state, action, to_state)
+        self.transitions = [other for other in self.transitions if other is not t]
+        self.mark_dirty(from_state)
+        return t
+    
+    def resolve(self, threshold: float = 0.01,
+                max_updates: Optional[int] = None) -> Dict[MayaState, Tuple[Optional[MayaAction], Optional[MayaAction]]]:
+        """
+        Re-solve after update/add/remove_transition, warm-started from the
+        values dict instead of _initialize_values() (see SparseMDP.resolve).
+        
+        Returns {state: (old action, new action)} for every state whose
+        action differs from the last extract_policy(), and updates values
+        and policy.
+        """
+        self._sync_policy_vector()
+        self.value_vector = self._vector([self.values[s] for s in self.states])
+        diff = super().resolve(threshold, max_updates)
+        self.values = {s: float(v) for s, v in zip(self.states, self.value_vector)}
+        self.policy = {s: self.actions[a] for s, a in zip(self.states, self.policy_vector) if a >= 0}
+        return diff
+    
     def extract_policy(self) -> Dict[MayaState, MayaAction]:
         """Extract optimal policy from computed values."""
-        for state in self.states:
-            actions = self.get_available_actions(state)
-            if not actions:
-                continue
-            
-            best_action = None
-            best_value = float('-inf')
-            
-            for action in actions:
-                action_value = 0
-                for trans in self.get_transitions(state, action):
-                    action_value += trans.probability * (
-                        trans.reward + self.gamma * self.values[trans.to_state]
-                    )
-                
-                if action_value > best_value:
-                    best_value = action_value
-                    best_action = action
-            
-            self.policy[state] = best_action
-        
+        self._csr()
+        self.value_vector = self._vector([self.values[s] for s in self.states])
+        for state, a in zip(self.states, super().extract_policy()):
+            if a >= 0:
+                self.policy[state] = self.actions[a]
+            else:
+                self.policy.pop(state, None)  # its last action was removed
         return self.policy
     
     def simulate_journey(self, start_state: MayaState = MayaState.STRUGGLING) -> List[Dict]:
@@ -293,6 +1376,26 @@ class MayaMDP:
         
         return journey
     
+    def simulate_batch(self, start_state: MayaState = MayaState.STRUGGLING,
+                       trajectories: int = 1_000_000, max_steps: int = 10,
+                       stop_states: Iterable[MayaState] = (MayaState.INSPIRING,),
+                       seed=None, processes: int = 1) -> Dict:
+        """
+        Many journeys at once (see SparseMDP.simulate_batch), following the
+        policy dict and ending at INSPIRING like simulate_journey; occupancy
+        is a list of per-step fractions per state name.
+        """
+        if np is None:
+            raise ImportError("MayaMDP.simulate_batch() requires NumPy")
+        if not self.policy:
+            self.extract_policy()
+        self._sync_policy_vector()
+        summary = super().simulate_batch(start_state, trajectories, max_steps, stop_states,
+                                         seed, processes)
+        summary['occupancy'] = {s.value: summary['occupancy'][:, i].tolist()
+                                for i, s in enumerate(self.states)}
+        return summary
+    
     def export_for_frontend(self) -> str:
         """Export MDP data for frontend visualization."""
         return json.dumps({
@@ -317,6 +1420,82 @@ class MayaMDP:
         }, ensure_ascii=False, indent=2)
 
 
+PIPELINE_STEPS = [  # (action moving someone out of stage k, base success probability)
+    (MayaAction.ACCEPT_HELP, 0.8),
+    (MayaAction.ASK_QUESTIONS, 0.9),
+    (MayaAction.VOLUNTEER, 0.85),
+    (MayaAction.MENTOR, 0.8),
+    (MayaAction.SHARE_STORY, 0.95),
+]
+PIPELINE_REWARDS = [-5, 0, 15, 20, 50, 200]  # per person per step, by stage
+
+
+def volunteer_pipeline(cohort_size: int = 20, discount_factor: float = 0.95) -> SparseMDP:
+    """
+    Cohort version of Maya's story as a generated SparseMDP.
+    
+    A state counts how many of cohort_size people are in each MayaState
+    stage; there are C(cohort_size + 5, 5) of them (53,130 for 20
+    people, 324,632 for 30). Each step the coordinator focuses on one
+    stage and moves one person forward with the story's probability,
+    boosted 5% per person already helping, leading or inspiring. A
+    failed step may send a curious person back to struggling. STAY
+    just collects the reward, Σ people x PIPELINE_REWARDS[stage].
+    """
+    start = (cohort_size,) + (0,) * (len(PIPELINE_REWARDS) - 1)
+    
+    def successors(counts: Tuple[int, ...]):
+        reward = sum(c * r for c, r in zip(counts, PIPELINE_REWARDS))
+        yield MayaAction.STAY, counts, 1.0, reward
+        helpers = sum(counts[3:])
+        for k, (action, base) in enumerate(PIPELINE_STEPS):
+            if not counts[k]:
+                continue
+            p = min(0.99, base * (1 + 0.05 * helpers))
+            moved = list(counts)
+            moved[k] -= 1
+            moved[k + 1] += 1
+            yield action, tuple(moved), p, reward
+            if counts[1]:
+                drifted = list(counts)
+                drifted[1] -= 1
+                drifted[0] += 1
+                yield action, tuple(drifted), (1 - p) * 0.3, reward
+                yield action, counts, (1 - p) * 0.7, reward
+            else:
+                yield action, counts, 1 - p, reward
+    
+    return SparseMDP(successors, initial_states=[start],
+                     actions=list(MayaAction), discount_factor=discount_factor)
+
+
+def ladder_mdp(rungs: int = 200, discount_factor: float = 0.9) -> SparseMDP:
+    """
+    Maya's STRUGGLING -> INSPIRING ladder stretched to any length.
+    
+    On each rung VOLUNTEER climbs with probability 0.8, stays with 0.15
+    and slips back with 0.05; STAY keeps the rung at a small cost. The
+    top rung is absorbing (SHARE_STORY, reward 200), so its value has to
+    travel down the whole chain: a worst case for synchronous sweeps.
+    """
+    top = rungs - 1
+    
+    def successors(rung: int):
+        if rung == top:
+            yield MayaAction.SHARE_STORY, rung, 1.0, 200
+            return
+        yield MayaAction.STAY, rung, 1.0, -5
+        yield MayaAction.VOLUNTEER, rung + 1, 0.8, 10
+        if rung > 0:
+            yield MayaAction.VOLUNTEER, rung, 0.15, -1
+            yield MayaAction.VOLUNTEER, rung - 1, 0.05, -1
+        else:
+            yield MayaAction.VOLUNTEER, rung, 0.2, -1
+    
+    return SparseMDP(successors, states=range(rungs), actions=list(MayaAction),
+                     discount_factor=discount_factor)
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Journey of Kindness - MDP Demo")
@@ -346,6 +1525,40 @@ if __name__ == "__main__":
         print(f"  {state.value:15} → {action.value}")
     print()
     
+    print("Discount Sweep:")
+    print("-" * 40)
+    sweep = mdp.sweep([0.1, 0.3, 0.5, 0.7, 0.9, 0.95],
+                      [{(MayaState.STRUGGLING, MayaAction.STAY, MayaState.STRUGGLING): 30}])
+    for point in sweep['change_points']:
+        changes = ', '.join(f"{s}: {a} → {b}" for s, (a, b) in point['changes'].items())
+        print(f"  γ {point['from_gamma']} → {point['to_gamma']}: {changes}")
+    print()
+    
+    print("Designer Edit (warm-started re-solve):")
+    print("-" * 40)
+    mdp.update_transition(MayaState.HELPING, MayaAction.MENTOR, MayaState.LEADING, probability=0.05)
+    for state, (old, new) in mdp.resolve().items():
+        print(f"  {state.value:15} : {old.value} → {new.value}")
+    print(f"  {mdp.solver_stats['updates']} state updates")
+    mdp.update_transition(MayaState.HELPING, MayaAction.MENTOR, MayaState.LEADING, probability=0.8)
+    mdp.resolve()
+    print()
+    
+    print("Cohort Model (志工培育管道):")
+    print("-" * 40)
+    cohort = volunteer_pipeline(cohort_size=8)
+    cohort.value_iteration(iterations=500, threshold=0.01)
+    start = cohort.states[0]
+    print(f"  {len(cohort.states):,} states, {cohort.nonzeros:,} transitions")
+    print(f"  First focus for {start[0]} people: {cohort.action(start).value}")
+    for method in SparseMDP.SOLVERS:
+        cohort.reset_values()
+        cohort.solve(method)
+        stats = cohort.solver_stats
+        print(f"  {method:26} {stats['iterations']:4d} iterations  "
+              f"{stats['seconds'] * 1000:7.1f} ms  residual {stats['residual']:.1e}")
+    print()
+    
     print("Simulating Maya's Journey:")
     print("-" * 40)
     journey = mdp.simulate_journey()
@@ -354,6 +1567,15 @@ if __name__ == "__main__":
         print(f"         {step['narrative']['zh']}")
         print()
     
+    print("Batch Simulation (1,000,000 journeys):")
+    print("-" * 40)
+    summary = mdp.simulate_batch(seed=2025)
+    hitting = summary['hitting_time']
+    print(f"  Reached inspiring: {summary['reached']:.1%}, "
+          f"mean {hitting['mean']:.2f} steps (p90 {hitting['p90']})")
+    print(f"  Return: mean {summary['return']['mean']:.2f}, std {summary['return']['std']:.2f}")
+    print()
+    
     print("=" * 60)
     print("Core Lesson 核心教訓: 「甘願做，歡喜受」")
     print("Willing to do, happy to receive")
@@ -0,0 +1,143 @@
+"""
+Shared helpers for the Journey of Kindness algorithm tests.
+
+The algorithm modules import each other as top-level modules (as when
+run from src/), so src/ goes on the path here. Reference
+implementations are kept deliberately plain: every optimized code path
+is checked against one of them.
+"""
+
+import heapq
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import bayesian_network  # noqa: E402
+from astar_search import CompactGraph  # noqa: E402
+
+INF = float('inf')
+
+
+def dijkstra(graph, start_id, goal_id):
+    """Reference shortest-path cost over the string-id get_neighbors() API."""
+    dist = {start_id: 0.0}
+    heap = [(0.0, start_id)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == goal_id:
+            return d
+        if d > dist[u]:
+            continue
+        for v, cost in graph.get_neighbors(u):
+            if d + cost < dist.get(v, INF):
+                dist[v] = d + cost
+                heapq.heappush(heap, (d + cost, v))
+    return INF
+
+
+def path_cost(graph, path):
+    """Cost of a path of location ids, checking that every hop is an arc."""
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        costs = [cost for v, cost in graph.get_neighbors(a) if v == b]
+        assert costs, f"{a} -> {b} is not an arc"
+        total += min(costs)
+    return total
+
+
+def random_street_graph(seed, n=40, extra=60, oneway=0.3):
+    """
+    Random connected-ish street network with one-way arcs.
+    
+    Nodes get grid coordinates and every arc costs at least the straight
+    line between its ends, so the coordinate heuristics stay admissible.
+    """
+    rng = random.Random(seed)
+    nodes = [(f'n{i}', rng.uniform(0, 20), rng.uniform(0, 20), rng.random() < 0.3)
+             for i in range(n)]
+    arcs = []
+    
+    def connect(u, v):
+        (_, x1, y1, _), (_, x2, y2, _) = nodes[u], nodes[v]
+        cost = ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5 * rng.uniform(1.0, 1.6)
+        arcs.append((nodes[u][0], nodes[v][0], cost))
+        if rng.random() >= oneway:
+            arcs.append((nodes[v][0], nodes[u][0], cost))
+    
+    for v in range(1, n):
+        connect(rng.randrange(v), v)
+    for _ in range(extra):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            connect(u, v)
+    return CompactGraph.build(nodes, arcs)
+
+
+def reference_value_iteration(states, successors, gamma, tolerance=1e-10, sweeps=100_000):
+    """
+    Textbook synchronous value iteration over dicts.
+    
+    successors(state) yields (action, next_state, probability, reward);
+    states without any action keep value 0.
+    """
+    values = {s: 0.0 for s in states}
+    for _ in range(sweeps):
+        new_values = {}
+        for s in states:
+            q = {}
+            for action, to_state, p, r in successors(s):
+                q[action] = q.get(action, 0.0) + p * (r + gamma * values[to_state])
+            new_values[s] = max(q.values()) if q else 0.0
+        delta = max(abs(new_values[s] - values[s]) for s in states)
+        values = new_values
+        if delta < tolerance:
+            break
+    return values
+
+
+def reference_q(states, successors, gamma, values):
+    """{state: {action: Q}} under values (empty for a state without actions)."""
+    q = {}
+    for s in states:
+        q[s] = {}
+        for action, to_state, p, r in successors(s):
+            q[s][action] = q[s].get(action, 0.0) + p * (r + gamma * values[to_state])
+    return q
+
+
+def story_successors(mdp):
+    """Successor function read straight from a MayaMDP's transition list."""
+    def successors(state):
+        for t in mdp.transitions:
+            if t.from_state == state:
+                yield t.action, t.to_state, t.probability, t.reward
+    return successors
+
+
+def numpy_switch(*modules):
+    """
+    Fixture that runs a test with NumPy and again with np set to None
+    in each of modules, so their pure-Python fallbacks are checked
+    against the same references. Bind it in the test module:
+    numpy = numpy_switch(mdp_maya).
+    """
+    @pytest.fixture(params=[True, False], ids=['numpy', 'pure-python'])
+    def numpy(request, monkeypatch):
+        if request.param and any(module.np is None for module in modules):
+            pytest.skip("NumPy is not installed")
+        if not request.param:
+            for module in modules:
+                monkeypatch.setattr(module, 'np', None)
+        return request.param
+    return numpy
+
+
+@pytest.fixture
+def fresh_care_network(monkeypatch):
+    """A private care network and lookup-table cache, so CPT edits do not leak."""
+    monkeypatch.setattr(bayesian_network, '_care_network', bayesian_network.build_care_network())
+    monkeypatch.setattr(bayesian_network, '_care_tables', {})
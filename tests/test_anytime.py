@@ -0,0 +1,52 @@
+"""ARA* against Dijkstra: every solution within its proven bound."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType
+from conftest import INF, dijkstra, path_cost, random_street_graph
+
+
+def check_solutions(graph, solutions, start, goal):
+    optimum = dijkstra(graph, start, goal)
+    if optimum == INF:
+        assert solutions == []
+        return
+    assert solutions
+    for solution in solutions:
+        assert solution.path[0] == start and solution.path[-1] == goal
+        assert path_cost(graph, solution.path) == pytest.approx(solution.cost)
+        assert solution.cost <= solution.bound * optimum + 1e-9
+    assert [s.cost for s in solutions] == sorted((s.cost for s in solutions), reverse=True)
+    assert solutions[-1].cost == pytest.approx(optimum)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_anytime_on_compact_graph_converges_to_optimum(seed):
+    graph = random_street_graph(seed, n=80, extra=120)
+    search = AStarSearch(graph)
+    for goal in range(1, 80, 7):
+        start, goal_id = graph.name(0), graph.name(goal)
+        solutions = search.search_anytime(start, goal_id, initial_epsilon=3.0,
+                                          epsilon_step=0.5)
+        check_solutions(graph, solutions, start, goal_id)
+
+
+@pytest.mark.parametrize('heuristic', [HeuristicType.EUCLIDEAN, HeuristicType.LANDMARK])
+def test_anytime_on_community_map(heuristic):
+    community = CommunityMap()
+    search = AStarSearch(community)
+    for goal in ('chen', 'garcia', 'johnson'):
+        check_solutions(community, search.search_anytime('start', goal, heuristic), 'start', goal)
+
+
+def test_deadline_still_returns_the_first_solution():
+    graph = random_street_graph(5, n=120, extra=200)
+    found = []
+    solutions = AStarSearch(graph).search_anytime(graph.name(0), graph.name(77), deadline=0.0,
+                                                  on_improve=found.append)
+    assert solutions and found == solutions
+
+
+def test_unknown_locations_return_no_solutions():
+    assert AStarSearch(CommunityMap()).search_anytime('start', 'nowhere') == []
+    assert AStarSearch(random_street_graph(1)).search_anytime('nowhere', 'n1') == []
@@ -0,0 +1,88 @@
+"""Gauss-Seidel and prioritized sweeping against synchronous value iteration."""
+
+import random
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaMDP, MayaState, ladder_mdp, volunteer_pipeline
+from conftest import numpy_switch, reference_q, reference_value_iteration, story_successors
+
+TIGHT = 1e-10
+
+numpy = numpy_switch(mdp_maya)
+
+
+def models():
+    return [ladder_mdp(40), volunteer_pipeline(3, discount_factor=0.9)]
+
+
+def assert_optimal(mdp):
+    expected = reference_value_iteration(mdp.states, mdp.successors, mdp.gamma)
+    for s in mdp.states:
+        assert mdp.value(s) == pytest.approx(expected[s], rel=1e-7, abs=1e-7)
+    q = reference_q(mdp.states, mdp.successors, mdp.gamma, expected)
+    mdp.extract_policy()
+    for s in mdp.states:
+        if q[s]:
+            assert q[s][mdp.action(s)] == pytest.approx(max(q[s].values()), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('index', [0, 1])
+def test_gauss_seidel(numpy, index):
+    mdp = models()[index]
+    mdp.gauss_seidel(iterations=100_000, threshold=TIGHT)
+    assert_optimal(mdp)
+
+
+def test_gauss_seidel_in_any_order(numpy):
+    mdp = volunteer_pipeline(3, discount_factor=0.9).build()
+    order = list(range(len(mdp.states)))
+    random.Random(0).shuffle(order)
+    mdp.gauss_seidel(iterations=100_000, threshold=TIGHT, order=order)
+    assert_optimal(mdp)
+
+
+def test_gauss_seidel_needs_fewer_sweeps_on_the_ladder(numpy):
+    synchronous, in_place = ladder_mdp(60), ladder_mdp(60)
+    synchronous.value_iteration(iterations=100_000, threshold=1e-6)
+    in_place.gauss_seidel(iterations=100_000, threshold=1e-6)
+    assert in_place.solver_stats['iterations'] < synchronous.solver_stats['iterations']
+
+
+@pytest.mark.parametrize('index', [0, 1])
+def test_prioritized_sweeping(numpy, index):
+    mdp = models()[index]
+    mdp.prioritized_sweeping(threshold=TIGHT, max_updates=10_000_000)
+    assert_optimal(mdp)
+    assert mdp.solver_stats['residual'] < 1e-6
+
+
+def test_prioritized_sweeping_from_seeds_after_an_edit(numpy):
+    rewards = {'top': 200}
+    
+    def successors(rung):
+        if rung == 9:
+            yield 'share', rung, 1.0, rewards['top']
+            return
+        yield 'stay', rung, 1.0, -5
+        yield 'climb', rung + 1, 0.8, 10
+        yield 'climb', rung, 0.2, -1
+    
+    mdp = mdp_maya.SparseMDP(successors, states=range(10), discount_factor=0.9)
+    mdp.value_iteration(iterations=100_000, threshold=TIGHT)
+    rewards['top'] = -50
+    mdp.invalidate()
+    mdp.prioritized_sweeping(threshold=TIGHT, max_updates=10_000_000, seeds=[9])
+    assert_optimal(mdp)
+    assert mdp.value(9) == pytest.approx(-500)
+
+
+@pytest.mark.parametrize('method', ['gauss_seidel', 'prioritized_sweeping'])
+def test_story_solvers_fill_the_values_dict(numpy, method):
+    mdp = MayaMDP()
+    values = getattr(mdp, method)(threshold=TIGHT)
+    expected = reference_value_iteration(list(MayaState), story_successors(mdp), mdp.gamma)
+    assert values is mdp.values
+    for s in MayaState:
+        assert values[s] == pytest.approx(expected[s], rel=1e-7, abs=1e-7)
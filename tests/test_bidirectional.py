@@ -0,0 +1,32 @@
+"""Bidirectional A* against a plain Dijkstra on one-way street networks."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType
+from conftest import INF, dijkstra, path_cost, random_street_graph
+
+
+@pytest.mark.parametrize('heuristic', [HeuristicType.EUCLIDEAN, HeuristicType.LANDMARK])
+@pytest.mark.parametrize('seed', range(4))
+def test_bidirectional_matches_dijkstra(seed, heuristic):
+    graph = random_street_graph(seed, oneway=0.5)
+    search = AStarSearch(graph)
+    for s in range(0, graph.node_count, 3):
+        for g in range(1, graph.node_count, 4):
+            start, goal = graph.name(s), graph.name(g)
+            expected = dijkstra(graph, start, goal)
+            path = search.search(start, goal, heuristic, bidirectional=True)
+            if expected == INF:
+                assert path is None
+            else:
+                assert path[0] == start and path[-1] == goal
+                assert path_cost(graph, path) == pytest.approx(expected)
+
+
+def test_bidirectional_records_both_frontiers():
+    search = AStarSearch(CommunityMap())
+    path = search.search('start', 'chen', HeuristicType.EUCLIDEAN, bidirectional=True)
+    assert path_cost(search.map, path) == pytest.approx(dijkstra(search.map, 'start', 'chen'))
+    assert search.search_stats['bidirectional']
+    assert search.frontier_history['forward'][0] == 'start'
+    assert search.frontier_history['backward'][0] == 'chen'
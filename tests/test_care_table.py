@@ -0,0 +1,93 @@
+"""The care lookup table against building a CommunityMember per evidence."""
+
+from itertools import product
+
+import pytest
+
+import bayesian_network as bn
+from bayesian_network import (CommunityMember, EvidenceLevel, LEVELS, calculate_care_probability,
+                              care_network, care_probabilities, care_probability_code, care_table,
+                              encode_evidence)
+
+pytestmark = pytest.mark.usefixtures('fresh_care_network')
+
+
+def member_probability(levels, inference):
+    stress, connection, interaction, behavior = (EvidenceLevel(level) for level in levels)
+    return CommunityMember(
+        id='probe', name='Probe', name_zh='探針', location='Here', location_zh='這裡',
+        life_stress=stress, social_connection=connection,
+        recent_interaction=interaction, visible_behavior=behavior,
+        actual_needs_care=True, story_type='surprise', inference=inference
+    ).care_probability
+
+
+@pytest.mark.parametrize('inference', bn.INFERENCE_MODES)
+def test_every_code_matches_a_member(inference):
+    table = care_table(inference)
+    for codes in product(range(4), repeat=4):
+        levels = [LEVELS[c] for c in codes]
+        expected = member_probability(levels, inference)
+        code = encode_evidence(*codes)
+        assert table.values[code] == expected
+        assert table.probability(*codes) == expected
+        assert care_probability_code(code, inference) == expected
+        evidence = dict(zip(('stress', 'connection', 'interaction', 'behavior'), levels))
+        assert calculate_care_probability(evidence, inference) == expected
+        members = {key: EvidenceLevel(level) for key, level in evidence.items()}
+        assert calculate_care_probability(members, inference) == expected
+
+
+def test_exact_table_is_the_posterior():
+    table = care_table('exact')
+    net = care_network()
+    for levels in product(LEVELS, repeat=4):
+        evidence = dict(zip(('life_stress', 'social_connection', 'recent_interaction',
+                             'visible_behavior'), levels))
+        code = encode_evidence(*(LEVELS.index(level) for level in levels))
+        assert table.values[code] == pytest.approx(net.query('needs_care', evidence)['yes'] * 100)
+
+
+def test_missing_evidence_defaults_to_medium():
+    assert calculate_care_probability({}) == member_probability(['medium'] * 4, 'weighted')
+    high = calculate_care_probability({'stress': 'high'})
+    assert high == pytest.approx(55.0)
+    assert calculate_care_probability({'stress': EvidenceLevel.HIGH}) == high
+    with pytest.raises(ValueError):
+        calculate_care_probability({'stress': 'extreme'})
+    with pytest.raises(ValueError):
+        care_table('fuzzy')
+
+
+@pytest.mark.skipif(bn.np is None, reason="NumPy is not installed")
+def test_bulk_matches_scalar_lookups():
+    np = bn.np
+    codes = np.random.default_rng(0).integers(0, 256, size=5000)
+    for inference in bn.INFERENCE_MODES:
+        bulk = care_probabilities(codes, inference)
+        assert list(bulk) == [care_probability_code(int(c), inference) for c in codes]
+        unpacked = codes // 64, codes // 16 % 4, codes // 4 % 4, codes % 4
+        assert (encode_evidence(*unpacked) == codes).all()
+
+
+def test_bulk_without_numpy_raises(monkeypatch):
+    monkeypatch.setattr(bn, 'np', None)
+    table = bn.CareProbabilityTable()
+    assert table.array is None
+    with pytest.raises(ImportError):
+        table.bulk([0, 1])
+
+
+def test_exact_table_is_rebuilt_after_a_cpt_change():
+    before = care_table('exact')
+    weighted = care_table('weighted')
+    assert care_table('exact') is before
+    care_network().set_cpt('visible_behavior', {('yes',): [0.1, 0.1, 0.7, 0.1],
+                                                ('no',): [0.4, 0.4, 0.1, 0.1]})
+    after = care_table('exact')
+    assert after is not before
+    assert after.version == care_network().version
+    assert care_table('weighted') is weighted
+    for codes in product(range(4), repeat=4):
+        levels = [LEVELS[c] for c in codes]
+        assert after.probability(*codes) == member_probability(levels, 'exact')
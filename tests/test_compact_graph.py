@@ -0,0 +1,74 @@
+"""CompactGraph (CSR) storage and compact-mode A* against the dict map."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, CompactGraph, HeuristicType
+from conftest import dijkstra, path_cost, random_street_graph
+
+
+def test_compact_graph_mirrors_community_map():
+    community = CommunityMap()
+    graph = community.to_compact()
+    assert graph.node_count == len(community.locations)
+    assert graph.edge_count == sum(len(n) for n in community.edges.values())
+    for loc_id in community.locations:
+        assert graph.name(graph.index_of(loc_id)) == loc_id
+        assert sorted(graph.get_neighbors(loc_id)) == sorted(community.get_neighbors(loc_id))
+        for other in community.locations:
+            assert graph.edge_cost(loc_id, other) == community.edge_cost(loc_id, other)
+    assert graph.index_of('nowhere') is None
+
+
+def test_reversed_graph_flips_every_arc():
+    graph = random_street_graph(3, oneway=0.5)
+    reverse = graph.reversed()
+    for u in range(graph.node_count):
+        for k in graph.arcs(u):
+            arc = (graph.name(u), graph.costs[k])
+            assert arc in reverse.get_neighbors(graph.name(graph.targets[k]))
+    assert reverse.edge_count == graph.edge_count
+    assert reverse.reversed() is graph
+
+
+def test_to_compact_is_rebuilt_after_edge_change():
+    community = CommunityMap()
+    graph = community.to_compact()
+    assert community.to_compact() is graph
+    community.update_edge_cost('clinic', 'chen', 50)
+    assert community.to_compact() is not graph
+    assert ('clinic', 50) in community.to_compact().get_neighbors('chen')
+
+
+@pytest.mark.parametrize('heuristic', [HeuristicType.MANHATTAN, HeuristicType.EUCLIDEAN,
+                                       HeuristicType.COMPASSION])
+def test_compact_search_matches_dict_search(heuristic):
+    community = CommunityMap()
+    dict_search = AStarSearch(community)
+    compact_search = AStarSearch(community, compact=True)
+    for start in community.locations:
+        for goal in community.locations:
+            assert (compact_search.search(start, goal, heuristic)
+                    == dict_search.search(start, goal, heuristic))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_compact_search_is_optimal(seed):
+    graph = random_street_graph(seed)
+    search = AStarSearch(graph)
+    for s in range(0, graph.node_count, 4):
+        for g in range(1, graph.node_count, 5):
+            start, goal = graph.name(s), graph.name(g)
+            path = search.search(start, goal, HeuristicType.EUCLIDEAN)
+            expected = dijkstra(graph, start, goal)
+            if path is None:
+                assert expected == float('inf')
+            else:
+                assert path_cost(graph, path) == pytest.approx(expected)
+
+
+def test_build_skips_arcs_to_unknown_nodes():
+    graph = CompactGraph.build([('a', 0, 0, False), ('b', 1, 0, True)],
+                               [('a', 'b', 1.0), ('a', 'c', 2.0)])
+    assert graph.edge_count == 1
+    assert graph.get_neighbors('a') == [('b', 1.0)]
+    assert graph.resident[graph.index_of('b')] == 1
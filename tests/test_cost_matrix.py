@@ -0,0 +1,43 @@
+"""Many-to-many cost matrix against per-pair Dijkstra."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, np
+from conftest import dijkstra, path_cost, random_street_graph
+
+
+@pytest.mark.parametrize('rows, cols', [(3, 8), (8, 3)])  # forward and reversed trees
+@pytest.mark.parametrize('seed', range(3))
+def test_cost_matrix_matches_dijkstra(seed, rows, cols):
+    graph = random_street_graph(seed, oneway=0.5)
+    sources = [graph.name(v) for v in range(0, 2 * rows, 2)]
+    targets = [graph.name(v) for v in range(1, 3 * cols, 3)]
+    result = AStarSearch(graph).cost_matrix(sources, targets, with_paths=True, as_array=False)
+    for i, source in enumerate(sources):
+        for j, target in enumerate(targets):
+            expected = dijkstra(graph, source, target)
+            assert result['costs'][i][j] == pytest.approx(expected)
+            path = result['paths'][i][j]
+            if expected == float('inf'):
+                assert path is None
+            else:
+                assert path[0] == source and path[-1] == target
+                assert path_cost(graph, path) == pytest.approx(expected)
+
+
+def test_cost_matrix_defaults_to_residents():
+    community = CommunityMap()
+    result = AStarSearch(community).cost_matrix(['start', 'market'])
+    assert sorted(result['targets']) == sorted(community.resident_ids())
+    assert result['paths'] is None
+
+
+def test_cost_matrix_rejects_unknown_locations():
+    with pytest.raises(KeyError):
+        AStarSearch(CommunityMap()).cost_matrix(['start'], ['nowhere'])
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+def test_cost_matrix_as_array():
+    result = AStarSearch(CommunityMap()).cost_matrix(['start', 'school'], as_array=True)
+    assert result['costs'].shape == (2, len(result['targets']))
@@ -0,0 +1,86 @@
+"""D* Lite replanning against a from-scratch Dijkstra after every change."""
+
+import gc
+import random
+import weakref
+
+import pytest
+
+from astar_search import CommunityMap, DStarLitePlanner, HeuristicType
+from conftest import INF, dijkstra, path_cost
+
+
+def street_map(seed=0):
+    """
+    The community map with every cost at least its straight-line length.
+    
+    D* Lite's repairs rely on a consistent heuristic, which the stock
+    costs are not (start-market is shorter than the straight line).
+    """
+    rng = random.Random(seed)
+    community = CommunityMap()
+    for a, b in street_edges(community):
+        straight = community.euclidean_distance(community.locations[a], community.locations[b])
+        community.update_edge_cost(a, b, straight * rng.uniform(1.0, 1.5))
+    return community
+
+
+def street_edges(community):
+    return sorted({tuple(sorted((a, b))) for a in community.edges for b, _ in community.edges[a]})
+
+
+def assert_optimal(planner, community):
+    path = planner.plan()
+    expected = dijkstra(community, planner.start, planner.goal)
+    if expected == INF:
+        assert path is None
+    else:
+        assert path[0] == planner.start and path[-1] == planner.goal
+        assert path_cost(community, path) == pytest.approx(expected)
+    return path
+
+
+def test_replans_after_closures_and_cost_changes():
+    community = street_map()
+    planner = DStarLitePlanner(community, 'start', 'chen')
+    path = assert_optimal(planner, community)
+    planner.move_to(path[1])
+    community.remove_edge('park', 'clinic')
+    assert_optimal(planner, community)
+    community.update_edge_cost('garcia', 'chen', 20)
+    assert_optimal(planner, community)
+    community.update_edge_cost('garcia', 'chen', 4.2)  # just above the straight line
+    assert_optimal(planner, community)
+    community.remove_edge('garcia', 'chen')
+    assert planner.plan() is None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_edit_sequences(seed):
+    rng = random.Random(seed)
+    community = street_map(seed)
+    planner = DStarLitePlanner(community, 'start', 'chen')
+    assert_optimal(planner, community)
+    edges = street_edges(community)
+    for _ in range(8):
+        a, b = rng.choice(edges)
+        straight = community.euclidean_distance(community.locations[a], community.locations[b])
+        community.update_edge_cost(a, b, straight * rng.uniform(1.0, 3.0))
+        assert_optimal(planner, community)
+
+
+def test_close_detaches_from_the_map():
+    community = CommunityMap()
+    planner = DStarLitePlanner(community, 'start', 'chen')
+    planner.plan()
+    planner.close()
+    assert community._edge_listeners == []
+    ref = weakref.ref(planner)
+    del planner
+    gc.collect()
+    assert ref() is None
+
+
+def test_rejects_landmark_heuristic():
+    with pytest.raises(ValueError):
+        DStarLitePlanner(CommunityMap(), 'start', 'chen', HeuristicType.LANDMARK)
@@ -0,0 +1,59 @@
+"""Contraction hierarchy queries against a plain Dijkstra."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, ContractionHierarchy
+from conftest import INF, dijkstra, path_cost, random_street_graph
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_hierarchy_matches_dijkstra(seed):
+    graph = random_street_graph(seed, oneway=0.4)
+    search = AStarSearch(graph)
+    search.preprocess_hierarchy()
+    for s in range(0, graph.node_count, 3):
+        for g in range(1, graph.node_count, 4):
+            start, goal = graph.name(s), graph.name(g)
+            expected = dijkstra(graph, start, goal)
+            path = search.search_hierarchy(start, goal)
+            if expected == INF:
+                assert path is None
+            else:
+                assert path[0] == start and path[-1] == goal
+                assert path_cost(graph, path) == pytest.approx(expected)
+                assert search.search_stats['cost'] == pytest.approx(expected)
+
+
+def test_hierarchy_rebuilds_after_cost_change():
+    community = CommunityMap()
+    search = AStarSearch(community)
+    assert search.search_hierarchy('start', 'chen') == ['start', 'market', 'park', 'clinic', 'chen']
+    community.update_edge_cost('clinic', 'chen', 50)
+    path = search.search_hierarchy('start', 'chen')
+    expected = dijkstra(community, 'start', 'chen')
+    assert path_cost(community, path) == pytest.approx(expected)
+    assert search.search_stats['cost'] == pytest.approx(expected)
+
+
+def test_saved_hierarchy_round_trip(tmp_path):
+    graph = random_street_graph(5, oneway=0.4)
+    AStarSearch(graph).preprocess_hierarchy().save(str(tmp_path / 'map.ch'))
+    search = AStarSearch(graph)
+    assert search.load_hierarchy(str(tmp_path / 'map.ch'))
+    for g in range(graph.node_count):
+        path = search.search_hierarchy('n0', graph.name(g))
+        if path is not None:
+            assert path_cost(graph, path) == pytest.approx(dijkstra(graph, 'n0', graph.name(g)))
+    with pytest.raises(ValueError):
+        AStarSearch(random_street_graph(6)).load_hierarchy(str(tmp_path / 'map.ch'))
+
+
+def test_saved_hierarchy_is_tied_to_costs(tmp_path):
+    community = CommunityMap()
+    AStarSearch(community).preprocess_hierarchy().save(str(tmp_path / 'map.ch'))
+    assert AStarSearch(community).load_hierarchy(str(tmp_path / 'map.ch'))
+    community.update_edge_cost('clinic', 'chen', 50)
+    with pytest.raises(ValueError):
+        AStarSearch(community).load_hierarchy(str(tmp_path / 'map.ch'))
+    loaded = ContractionHierarchy.load(str(tmp_path / 'map.ch'))
+    assert not loaded.matches(community.to_compact())
@@ -0,0 +1,62 @@
+"""ALT landmark heuristic: admissibility on one-way streets and staleness."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType, LandmarkIndex
+from conftest import INF, dijkstra, path_cost, random_street_graph
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_lower_bound_is_admissible_on_directed_graphs(seed):
+    graph = random_street_graph(seed, oneway=0.5)
+    index = LandmarkIndex.build(graph, k=4)
+    for v in range(graph.node_count):
+        for g in range(0, graph.node_count, 3):
+            true_cost = dijkstra(graph, graph.name(v), graph.name(g))
+            bound = index.lower_bound(v, g)
+            assert bound <= true_cost + 1e-9
+            if true_cost < INF:
+                assert bound < INF
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_landmark_search_matches_dijkstra_on_directed_graphs(seed):
+    graph = random_street_graph(seed, oneway=0.5)
+    search = AStarSearch(graph)
+    search.preprocess_landmarks(4)
+    for s in range(0, graph.node_count, 5):
+        for g in range(1, graph.node_count, 4):
+            start, goal = graph.name(s), graph.name(g)
+            expected = dijkstra(graph, start, goal)
+            path = search.search(start, goal, HeuristicType.LANDMARK)
+            if expected == INF:
+                assert path is None
+            else:
+                assert path[0] == start and path[-1] == goal
+                assert path_cost(graph, path) == pytest.approx(expected)
+
+
+def test_landmarks_rebuild_after_cost_change():
+    community = CommunityMap()
+    search = AStarSearch(community)
+    search.preprocess_landmarks()
+    search.search('start', 'chen', HeuristicType.LANDMARK)
+    community.update_edge_cost('garcia', 'chen', 0.1)
+    for start, goal in (('start', 'chen'), ('park', 'chen'), ('clinic', 'garcia')):
+        path = search.search(start, goal, HeuristicType.LANDMARK)
+        assert path_cost(community, path) == pytest.approx(dijkstra(community, start, goal))
+
+
+def test_saved_tables_round_trip(tmp_path):
+    graph = random_street_graph(7, oneway=0.5)
+    index = LandmarkIndex.build(graph, k=3)
+    index.save(str(tmp_path / 'alt.bin'))
+    search = AStarSearch(graph)
+    loaded = search.load_landmarks(str(tmp_path / 'alt.bin'))
+    assert loaded.landmarks == index.landmarks
+    assert all(loaded.lower_bound(v, 0) == index.lower_bound(v, 0)
+               for v in range(graph.node_count))
+    
+    other = random_street_graph(8, oneway=0.5)
+    with pytest.raises(ValueError):
+        AStarSearch(other).load_landmarks(str(tmp_path / 'alt.bin'))
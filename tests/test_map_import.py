@@ -0,0 +1,102 @@
+"""Streaming importer and the memory-mapped map format."""
+
+import json
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, CompactGraph
+from conftest import dijkstra, random_street_graph
+from map_import import MapImporter, is_true, iter_features
+
+
+def same_graph(a, b):
+    assert a.node_count == b.node_count and a.edge_count == b.edge_count
+    for v in range(a.node_count):
+        name = a.name(v)
+        w = b.index_of(name)
+        assert (a.xs[v], a.ys[v], a.resident[v]) == (b.xs[w], b.ys[w], b.resident[w])
+        assert sorted(a.get_neighbors(name)) == sorted(b.get_neighbors(name))
+
+
+def test_saved_map_opens_memory_mapped(tmp_path):
+    graph = random_street_graph(4, oneway=0.3)
+    graph.save(str(tmp_path / 'city.jokmap'))
+    mapped = CompactGraph.open(str(tmp_path / 'city.jokmap'))
+    same_graph(graph, mapped)
+    assert mapped.fingerprint() == graph.fingerprint()
+    search = AStarSearch(mapped)
+    for goal in range(1, graph.node_count, 6):
+        path = search.search('n0', graph.name(goal))
+        expected = dijkstra(graph, 'n0', graph.name(goal))
+        assert (path is None) == (expected == float('inf'))
+
+
+def test_mapped_graph_saves_again(tmp_path):
+    graph = random_street_graph(2, oneway=0.3)
+    graph.save(str(tmp_path / 'city.jokmap'))
+    CompactGraph.open(str(tmp_path / 'city.jokmap')).save(str(tmp_path / 'copy.jokmap'))
+    assert (tmp_path / 'copy.jokmap').read_bytes() == (tmp_path / 'city.jokmap').read_bytes()
+    copy = CompactGraph.open(str(tmp_path / 'copy.jokmap'))
+    same_graph(graph, copy)
+    assert copy.fingerprint() == graph.fingerprint()
+
+
+def test_truncated_map_is_rejected(tmp_path):
+    random_street_graph(1).save(str(tmp_path / 'city.jokmap'))
+    data = (tmp_path / 'city.jokmap').read_bytes()
+    (tmp_path / 'cut.jokmap').write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        CompactGraph.open(str(tmp_path / 'cut.jokmap'))
+    (tmp_path / 'other.bin').write_bytes(b'NOTAMAP!' + data[8:])
+    with pytest.raises(ValueError):
+        CompactGraph.open(str(tmp_path / 'other.bin'))
+
+
+def test_csv_import_matches_community_map(tmp_path):
+    community = CommunityMap()
+    nodes = tmp_path / 'nodes.csv'
+    edges = tmp_path / 'edges.csv'
+    nodes.write_text('id,x,y,has_resident\n' + ''.join(
+        f"{loc.id},{loc.x},{loc.y},{'yes' if loc.has_resident else 'no'}\n"
+        for loc in community.locations.values()), encoding='utf-8')
+    pairs = sorted({tuple(sorted((a, b))) for a in community.edges for b, _ in community.edges[a]})
+    edges.write_text('from,to,cost,oneway\n' + ''.join(
+        f"{a},{b},{community.edge_cost(a, b)},false\n" for a, b in pairs), encoding='utf-8')
+    importer = MapImporter()
+    importer.read_csv(str(nodes), str(edges))
+    same_graph(community.to_compact(), importer.build())
+
+
+@pytest.mark.parametrize('value, oneway', [
+    ('no', False), ('false', False), ('0', False), (' No ', False), ('', False),
+    (0, False), (False, False), (None, False),
+    ('yes', True), ('true', True), ('1', True), ('T', True), (1, True), (True, True),
+])
+def test_geojson_oneway_property(tmp_path, value, oneway):
+    assert is_true(value) == oneway
+    feature = {'type': 'Feature',
+               'geometry': {'type': 'LineString', 'coordinates': [[0, 0], [3, 4]]},
+               'properties': {'from': 'a', 'to': 'b', 'oneway': value}}
+    path = tmp_path / 'street.geojson'
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [feature]}),
+                    encoding='utf-8')
+    importer = MapImporter()
+    importer.read_geojson(str(path))
+    graph = importer.build()
+    assert graph.edge_cost('a', 'b') == 5.0
+    assert (graph.edge_cost('b', 'a') is None) == oneway
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 1 << 16])
+def test_iter_features_matches_json_load(tmp_path, chunk_size):
+    features = [{'type': 'Feature',
+                 'geometry': {'type': 'LineString', 'coordinates': [[i, 0], [i, 1.5], [i + 1, 2]]},
+                 'properties': {'name': f'street {i} ]"features": ['}}
+                for i in range(40)]
+    collection = tmp_path / 'all.geojson'
+    collection.write_text(json.dumps({'type': 'FeatureCollection', 'features': features},
+                                     indent=1), encoding='utf-8')
+    lines = tmp_path / 'all.ndjson'
+    lines.write_text(''.join(json.dumps(f) + '\n' for f in features), encoding='utf-8')
+    assert list(iter_features(str(collection), chunk_size)) == features
+    assert list(iter_features(str(lines), chunk_size)) == features
@@ -0,0 +1,90 @@
+"""Compiled arrays and vectorized value iteration against dict-based references."""
+
+from dataclasses import replace
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaAction, MayaMDP, MayaState
+from conftest import numpy_switch, reference_q, reference_value_iteration, story_successors
+
+STATES = list(MayaState)
+
+numpy = numpy_switch(mdp_maya)
+
+
+@pytest.mark.skipif(mdp_maya.np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize('gamma', [0.5, 0.9, 0.99])
+def test_compiled_q_values_match_the_transition_list(gamma):
+    np = mdp_maya.np
+    mdp = MayaMDP(gamma)
+    compiled = mdp.compile()
+    assert compiled.states == STATES and compiled.actions == list(MayaAction)
+    values = {s: 10.0 * i - 7 for i, s in enumerate(STATES)}
+    q = compiled.q_values(np.array([values[s] for s in STATES]), gamma)
+    expected = reference_q(STATES, story_successors(mdp), gamma, values)
+    for i, s in enumerate(STATES):
+        for j, a in enumerate(MayaAction):
+            if a in expected[s]:
+                assert compiled.mask[i, j]
+                assert q[i, j] == pytest.approx(expected[s][a])
+            else:
+                assert not compiled.mask[i, j]
+                assert q[i, j] == -np.inf
+
+
+@pytest.mark.parametrize('sweeps', [1, 2, 7, 40])
+def test_each_sweep_matches_the_reference(numpy, sweeps):
+    mdp = MayaMDP()
+    values = mdp.value_iteration(iterations=sweeps, threshold=0)
+    expected = reference_value_iteration(STATES, story_successors(mdp), mdp.gamma,
+                                         tolerance=0, sweeps=sweeps)
+    for s in STATES:
+        assert values[s] == pytest.approx(expected[s], abs=1e-9)
+    assert mdp.solver_stats['iterations'] == sweeps
+
+
+@pytest.mark.parametrize('gamma', [0.5, 0.9, 0.95])
+def test_converged_values_and_policy(numpy, gamma):
+    mdp = MayaMDP(gamma)
+    values = mdp.value_iteration(iterations=10_000, threshold=1e-10)
+    successors = story_successors(mdp)
+    expected = reference_value_iteration(STATES, successors, gamma)
+    for s in STATES:
+        assert values[s] == pytest.approx(expected[s], rel=1e-8, abs=1e-8)
+    
+    q = reference_q(STATES, successors, gamma, expected)
+    for s, action in mdp.extract_policy().items():
+        assert q[s][action] == pytest.approx(max(q[s].values()), abs=1e-6)
+    assert set(mdp.policy) == {s for s in STATES if q[s]}
+
+
+def test_dense_arrays_need_numpy(monkeypatch):
+    monkeypatch.setattr(mdp_maya, 'np', None)
+    with pytest.raises(ImportError):
+        MayaMDP().compile()
+
+
+def edit_in_place(transitions):
+    transitions[0].reward = 500.0
+
+
+def swap_an_element(transitions):
+    transitions[1] = replace(transitions[1], reward=-300.0)
+
+
+def pop_and_append(transitions):
+    transitions.append(replace(transitions.pop(0), reward=500.0))
+
+
+@pytest.mark.parametrize('edit', [edit_in_place, swap_an_element, pop_and_append])
+def test_edits_to_the_transition_list_reach_the_solver(numpy, edit):
+    mdp = MayaMDP()
+    mdp.value_iteration(iterations=40, threshold=0)
+    edit(mdp.transitions)
+    mdp.reset_values()
+    values = mdp.value_iteration(iterations=40, threshold=0)
+    expected = reference_value_iteration(STATES, story_successors(mdp), mdp.gamma,
+                                         tolerance=0, sweeps=40)
+    for s in STATES:
+        assert values[s] == pytest.approx(expected[s], abs=1e-9)
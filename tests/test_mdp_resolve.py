@@ -0,0 +1,75 @@
+"""Warm-started resolve() after model edits against a fresh value iteration."""
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaAction, MayaMDP, MayaState, MDPTransition
+from conftest import numpy_switch, reference_value_iteration, story_successors
+
+TIGHT = 1e-9
+
+numpy = numpy_switch(mdp_maya)
+
+
+def assert_matches_fresh(mdp):
+    expected = reference_value_iteration(list(MayaState), story_successors(mdp), mdp.gamma)
+    for state in MayaState:
+        assert mdp.values[state] == pytest.approx(expected[state], abs=1e-6)
+    
+    fresh = MayaMDP(mdp.gamma)
+    fresh.transitions = list(mdp.transitions)
+    fresh.value_iteration(iterations=10_000, threshold=TIGHT)
+    assert mdp.policy == fresh.extract_policy()
+
+
+def solved_story():
+    mdp = MayaMDP()
+    mdp.value_iteration(iterations=10_000, threshold=TIGHT)
+    mdp.extract_policy()
+    return mdp
+
+
+def test_removing_the_last_action_of_a_state(numpy):
+    mdp = solved_story()
+    assert mdp.values[MayaState.INSPIRING] > 1000
+    mdp.remove_transition(MayaState.INSPIRING, MayaAction.SHARE_STORY, MayaState.INSPIRING)
+    diff = mdp.resolve(threshold=TIGHT)
+    assert mdp.values[MayaState.INSPIRING] == 0.0
+    assert MayaState.INSPIRING not in mdp.policy
+    assert diff[MayaState.INSPIRING] == (MayaAction.SHARE_STORY, None)
+    assert_matches_fresh(mdp)
+    assert mdp.extract_policy() == mdp.policy
+
+
+def test_updates_and_additions(numpy):
+    mdp = solved_story()
+    mdp.update_transition(MayaState.LEADING, MayaAction.SHARE_STORY, MayaState.INSPIRING,
+                          probability=0.2)
+    mdp.resolve(threshold=TIGHT)
+    assert_matches_fresh(mdp)
+    
+    mdp.add_transition(MDPTransition(MayaState.STRUGGLING, MayaAction.MENTOR, MayaState.LEADING,
+                                     0.5, 0, {'en': '', 'zh': ''}))
+    diff = mdp.resolve(threshold=TIGHT)
+    assert diff[MayaState.STRUGGLING] == (MayaAction.ACCEPT_HELP, MayaAction.MENTOR)
+    assert_matches_fresh(mdp)
+
+
+def test_edit_sequence_stays_in_step_with_fresh_solves(numpy):
+    mdp = solved_story()
+    edits = [
+        lambda: mdp.update_transition(MayaState.HELPING, MayaAction.MENTOR, MayaState.LEADING,
+                                      reward=-40),
+        lambda: mdp.remove_transition(MayaState.LEADING, MayaAction.MENTOR, MayaState.LEADING),
+        lambda: mdp.remove_transition(MayaState.LEADING, MayaAction.SHARE_STORY,
+                                      MayaState.INSPIRING),
+        lambda: mdp.add_transition(MDPTransition(MayaState.LEADING, MayaAction.STAY,
+                                                 MayaState.HELPING, 1.0, 5, {})),
+        lambda: mdp.update_transition(MayaState.INSPIRING, MayaAction.SHARE_STORY,
+                                      MayaState.INSPIRING, reward=10),
+    ]
+    for edit in edits:
+        edit()
+        mdp.resolve(threshold=TIGHT)
+        assert_matches_fresh(mdp)
+    assert mdp.solver_stats['dirty'] == 1
@@ -0,0 +1,110 @@
+"""Batched parameter sweeps against solving each variant on its own."""
+
+from dataclasses import replace
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaAction, MayaMDP, MayaState, SparseMDP, ladder_mdp, volunteer_pipeline
+from conftest import reference_value_iteration, story_successors
+
+np = pytest.importorskip('numpy')
+
+GAMMAS = [0.3, 0.6, 0.9, 0.97]
+
+
+def scaled(model, factor, gamma):
+    """The same model with every reward multiplied by factor."""
+    def successors(state):
+        for action, to_state, p, r in model.successors(state):
+            yield action, to_state, p, r * factor
+    return SparseMDP(successors, states=list(model.states), actions=list(model.actions),
+                     discount_factor=gamma)
+
+
+@pytest.mark.parametrize('make', [lambda: ladder_mdp(30), lambda: volunteer_pipeline(3)])
+def test_every_variant_matches_its_own_solve(make):
+    model = make().build()
+    factors = [1.0, -0.5, 3.0]
+    base = np.array(model._csr()[5])
+    grid = model.sweep(GAMMAS, [base * f for f in factors], iterations=5000, threshold=1e-6)
+    assert list(grid['gamma']) == GAMMAS * len(factors)
+    assert list(grid['rewards']) == [i for i in range(len(factors)) for _ in GAMMAS]
+    for i, (gamma, r) in enumerate(zip(grid['gamma'], grid['rewards'])):
+        single = scaled(model, factors[r], gamma)
+        values = single.value_iteration(iterations=5000, threshold=1e-6)
+        assert grid['iterations'][i] == single.solver_stats['iterations']
+        assert grid['values'][i] == pytest.approx(values, rel=1e-12, abs=1e-9)
+        assert list(grid['policy'][i]) == list(single.extract_policy())
+
+
+def test_default_rewards_and_untouched_model():
+    model = ladder_mdp(20)
+    grid = model.sweep([0.9], iterations=10_000, threshold=1e-10)
+    expected = reference_value_iteration(model.states, model.successors, 0.9)
+    assert grid['values'][0] == pytest.approx([expected[s] for s in model.states], rel=1e-8)
+    assert not model.value_vector.any()
+    assert model.policy_vector is None
+
+
+def test_processes_split_the_grid():
+    model = volunteer_pipeline(3)
+    one = model.sweep(GAMMAS, iterations=500, threshold=1e-6)
+    pooled = model.sweep(GAMMAS, iterations=500, threshold=1e-6, processes=3)
+    for key in one:
+        assert (one[key] == pooled[key]).all()
+
+
+def test_story_overrides_match_edited_models():
+    overrides = [{}, {(MayaState.HELPING, MayaAction.MENTOR, MayaState.LEADING): -200,
+                      (MayaState.STRUGGLING, MayaAction.ACCEPT_HELP, MayaState.CURIOUS): 50}]
+    mdp = MayaMDP()
+    before = list(mdp.transitions)
+    result = mdp.sweep(GAMMAS, overrides, iterations=10_000, threshold=1e-10)
+    assert mdp.transitions == before
+    
+    for variant in result['variants']:
+        edited = MayaMDP(variant['gamma'])
+        override = overrides[variant['rewards']]
+        edited.transitions = [replace(t, reward=override.get((t.from_state, t.action, t.to_state),
+                                                            t.reward))
+                              for t in edited.transitions]
+        edited.compile()
+        expected = reference_value_iteration(list(MayaState), story_successors(edited),
+                                             variant['gamma'])
+        for s in MayaState:
+            assert variant['values'][s.value] == pytest.approx(expected[s], rel=1e-8, abs=1e-8)
+        edited.value_iteration(iterations=10_000, threshold=1e-10)
+        assert variant['policy'] == {s.value: a.value
+                                     for s, a in edited.extract_policy().items()}
+
+
+def test_change_points_follow_consecutive_policies():
+    mdp = MayaMDP()
+    gammas = [0.05, 0.2, 0.5, 0.8, 0.95]
+    overrides = [{}, {(MayaState.LEADING, MayaAction.SHARE_STORY, MayaState.INSPIRING): -500}]
+    result = mdp.sweep(gammas, overrides, iterations=10_000, threshold=1e-10)
+    expected = []
+    variants = result['variants']
+    for before, after in zip(variants, variants[1:]):
+        if before['rewards'] != after['rewards']:
+            continue
+        changes = {s: (before['policy'].get(s), after['policy'].get(s))
+                   for s in {m.value for m in MayaState}
+                   if before['policy'].get(s) != after['policy'].get(s)}
+        if changes:
+            expected.append((before['rewards'], before['gamma'], after['gamma'], changes))
+    assert [(c['rewards'], c['from_gamma'], c['to_gamma'], c['changes'])
+            for c in result['change_points']] == expected
+    assert expected
+
+
+def test_bad_sweeps(monkeypatch):
+    mdp = MayaMDP()
+    with pytest.raises(ValueError, match='No transition'):
+        mdp.sweep([0.9], [{(MayaState.STRUGGLING, MayaAction.SHARE_STORY, MayaState.LEADING): 1}])
+    with pytest.raises(ValueError, match='entries'):
+        ladder_mdp(5).sweep([0.9], [[1.0, 2.0]])
+    monkeypatch.setattr(mdp_maya, 'np', None)
+    with pytest.raises(ImportError):
+        ladder_mdp(5).sweep([0.9])
@@ -0,0 +1,118 @@
+"""Columnar member scoring against per-member loops and a full sort."""
+
+import random
+from dataclasses import replace
+
+import pytest
+
+import bayesian_network as bn
+from bayesian_network import (BayesianCareNetwork, CORRECT_ELO, CARING_ELO, EvidenceLevel,
+                              LEVELS, MemberColumns, OVERRIDE_ELO, OVERRIDE_THRESHOLD,
+                              calculate_care_probability, care_network, encode_evidence)
+from conftest import numpy_switch
+
+numpy = numpy_switch(bn)
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables(monkeypatch):
+    """Lookup tables built under this test's NumPy setting."""
+    monkeypatch.setattr(bn, '_care_tables', {})
+
+
+def random_population(n, seed):
+    rng = random.Random(seed)
+    ids = [f'm{rng.randrange(n)}' for _ in range(n)]  # repeated ids on purpose
+    codes = [rng.randrange(256) for _ in range(n)]
+    needs_care = [rng.random() < 0.4 for _ in range(n)]
+    return MemberColumns(ids, codes, needs_care)
+
+
+def reference_elo(probability, needs_care):
+    if not needs_care:
+        return CARING_ELO
+    return OVERRIDE_ELO if probability < OVERRIDE_THRESHOLD else CORRECT_ELO
+
+
+@pytest.mark.parametrize('inference', ['weighted', 'exact'])
+def test_scores_match_per_member_lookup(numpy, inference):
+    columns = random_population(500, 1)
+    scores = columns.scores(inference)
+    for row, code in enumerate(columns.codes):
+        assert scores[row] == bn.care_probability_code(int(code), inference)
+
+
+@pytest.mark.parametrize('k', [0, 1, 7, 100, 2000])
+def test_top_k_is_the_head_of_a_stable_sort(numpy, k):
+    columns = random_population(1000, 2)
+    scores = list(columns.scores())
+    expected = sorted(range(len(scores)), key=lambda r: -scores[r])[:k]
+    assert [row for row, _ in columns.top_k(k)] == expected
+    assert [p for _, p in columns.top_k(k)] == [scores[r] for r in expected]
+
+
+def test_evaluate_matches_a_per_member_loop(numpy):
+    columns = random_population(300, 3)
+    selected = [f'm{i}' for i in range(0, 400, 3)] + ['nobody']
+    result = columns.evaluate(selected)
+    scores = columns.scores()
+    expected = [reference_elo(scores[columns.index[i]], columns.needs_care[columns.index[i]])
+                for i in selected if i in columns.index]
+    assert list(result['elo']) == expected
+    assert result['total_elo'] == sum(expected)
+    assert columns.index == {i: columns.ids.index(i) for i in set(columns.ids)}
+
+
+def test_evaluate_decision_reports_the_scored_probability(fresh_care_network):
+    network = BayesianCareNetwork(inference='exact')
+    before = network.evaluate_decision(['johnson', 'devon'])
+    net = care_network()
+    needs_care = {(s, c): [0.9, 0.1] for s in LEVELS for c in LEVELS}
+    net.set_cpt('needs_care', needs_care)
+    after = network.evaluate_decision(['johnson', 'devon'])
+    
+    for decision, member_id in zip(after['decisions'], ['johnson', 'devon']):
+        member = network.get_member(member_id)
+        expected = net.query('needs_care', member.evidence())['yes'] * 100
+        assert decision['probability'] == pytest.approx(expected)
+        assert decision['elo'] == reference_elo(decision['probability'], member.actual_needs_care)
+    assert after['decisions'][0]['probability'] != before['decisions'][0]['probability']
+    assert after['total_elo'] == sum(d['elo'] for d in after['decisions'])
+
+
+def test_network_lookups_follow_the_members():
+    network = BayesianCareNetwork()
+    assert network.get_member('chen').name == 'Mrs. Chen'
+    assert network.get_member('nobody') is None
+    ranked = network.get_all_probabilities()
+    assert [p for _, p in ranked] == sorted((m.care_probability for m in network.members),
+                                            reverse=True)
+    assert network.top_members(2) == ranked[:2]
+    
+    code = encode_evidence(2, 3, 3, 2)  # high, none, none, high
+    assert network.columns().codes[network.columns().row('devon')] == code
+
+
+def test_columns_follow_member_edits():
+    network = BayesianCareNetwork()
+    network.get_all_probabilities()
+    
+    network.members[0] = replace(network.members[0], id='rivera', name='Ms. Rivera')
+    assert network.get_member('rivera').name == 'Ms. Rivera'
+    assert network.get_member('johnson') is None
+    
+    network.members.append(network.members.pop(0))
+    assert network.get_member('rivera') is network.members[-1]
+    
+    chen = network.get_member('chen')
+    chen.life_stress = chen.social_connection = EvidenceLevel.NONE
+    expected = calculate_care_probability({'stress': 'none', 'connection': 'none',
+                                           'interaction': chen.recent_interaction,
+                                           'behavior': chen.visible_behavior})
+    assert ('Mrs. Chen', expected) in network.get_all_probabilities()
+    chen.actual_needs_care = True
+    elo = network.evaluate_decision(['chen'])['total_elo']
+    assert elo == reference_elo(expected, True)
+    
+    network.members = network.members[:2]
+    assert len(network.get_all_probabilities()) == 2
@@ -0,0 +1,88 @@
+"""Multi-volunteer planning: capacities hold at every tick, trips stay short."""
+
+import heapq
+import math
+from collections import Counter
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, MultiVolunteerPlanner
+from conftest import INF
+
+
+def ticks(community, a, b, tick=1.0):
+    return max(1, math.ceil(community.edge_cost(a, b) / tick))
+
+
+def tick_distance(community, start_id, goal_id):
+    """Reference Dijkstra in whole ticks."""
+    dist = {start_id: 0}
+    heap = [(0, start_id)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == goal_id:
+            return d
+        if d > dist[u]:
+            continue
+        for v, _ in community.get_neighbors(u):
+            if d + ticks(community, u, v) < dist.get(v, INF):
+                dist[v] = d + ticks(community, u, v)
+                heapq.heappush(heap, (dist[v], v))
+    return INF
+
+
+def occupancy(community, result, dwell):
+    """(location, tick) and (street, tick) use rebuilt from the reported paths."""
+    locations, streets = Counter(), Counter()
+    for plan in result['volunteers'].values():
+        path, times = plan['path'], plan['times']
+        if path is None:
+            continue
+        for i, (here, t) in enumerate(zip(path, times)):
+            if i + 1 < len(path):
+                leave = times[i + 1] - ticks(community, here, path[i + 1])
+                street = tuple(sorted((here, path[i + 1])))
+                streets.update((street, s) for s in range(leave, times[i + 1]))
+            else:
+                leave = t + dwell - 1
+            locations.update((here, s) for s in range(t, leave + 1))
+    return locations, streets
+
+
+ASSIGNMENTS = {'amy': 'chen', 'ben': 'garcia', 'cai': 'johnson', 'dee': 'chen', 'eli': 'park'}
+
+
+@pytest.mark.parametrize('dwell', [1, 3])
+def test_capacities_hold_at_every_tick(dwell):
+    community = CommunityMap()
+    planner = MultiVolunteerPlanner(AStarSearch(community))
+    result = planner.plan(ASSIGNMENTS, dwell=dwell)
+    assert result['unplanned'] == []
+    locations, streets = occupancy(community, result, dwell)
+    assert all(n <= 1 for (loc, _), n in locations.items() if loc != 'start')
+    assert all(n <= 1 for n in streets.values())
+    for name, plan in result['volunteers'].items():
+        assert plan['path'][0] == 'start' and plan['path'][-1] == ASSIGNMENTS[name]
+        assert plan['arrival'] >= tick_distance(community, 'start', ASSIGNMENTS[name])
+
+
+def test_single_volunteer_takes_a_shortest_trip():
+    community = CommunityMap()
+    planner = MultiVolunteerPlanner(AStarSearch(community))
+    for goal in ('chen', 'garcia', 'johnson', 'clinic'):
+        result = planner.plan({'amy': goal})
+        assert result['volunteers']['amy']['arrival'] == tick_distance(community, 'start', goal)
+        assert result['volunteers']['amy']['waits'] == 0
+
+
+@pytest.mark.parametrize('capacity', [1, 2, 5])
+def test_start_that_is_not_a_depot_is_capacity_checked(capacity):
+    community = CommunityMap()
+    planner = MultiVolunteerPlanner(AStarSearch(community), location_capacity=capacity,
+                                    depots=())
+    result = planner.plan(ASSIGNMENTS)
+    planned = len(ASSIGNMENTS) - len(result['unplanned'])
+    assert planned == min(capacity, len(ASSIGNMENTS))
+    locations, _ = occupancy(community, result, 1)
+    assert locations[('start', 0)] == planned
+    assert all(n <= capacity for n in locations.values())
@@ -0,0 +1,75 @@
+"""Policy iteration and modified policy iteration against value iteration."""
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaMDP, MayaState, SparseMDP, ladder_mdp, volunteer_pipeline
+from conftest import numpy_switch, reference_q, reference_value_iteration, story_successors
+
+# Without a direct solver, policy evaluation stops once a sweep changes the
+# values by at most EVAL_TOLERANCE (relative), which leaves an error up to
+# γ / (1 - γ) times that
+ITERATED = 1e-6
+
+numpy = numpy_switch(mdp_maya)
+
+
+def models():
+    return [ladder_mdp(40), volunteer_pipeline(3, discount_factor=0.9)]
+
+
+def assert_optimal(mdp, tolerance):
+    expected = reference_value_iteration(mdp.states, mdp.successors, mdp.gamma)
+    for s in mdp.states:
+        assert mdp.value(s) == pytest.approx(expected[s], rel=tolerance, abs=tolerance)
+    q = reference_q(mdp.states, mdp.successors, mdp.gamma, expected)
+    mdp.extract_policy()
+    for s in mdp.states:
+        if q[s]:
+            assert q[s][mdp.action(s)] == pytest.approx(max(q[s].values()), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('index', [0, 1])
+def test_policy_iteration(numpy, index):
+    mdp = models()[index]
+    mdp.policy_iteration()
+    assert_optimal(mdp, 1e-7 if numpy else ITERATED)
+    assert mdp.solver_stats['iterations'] < 20
+    assert mdp.solver_stats['residual'] < 1e-4
+
+
+def test_iterative_evaluation_beyond_the_dense_limit(monkeypatch):
+    if mdp_maya.np is None:
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(SparseMDP, 'DENSE_SOLVE_LIMIT', 5)
+    monkeypatch.setattr(mdp_maya, 'sparse', None)
+    mdp = ladder_mdp(40)
+    mdp.policy_iteration()
+    assert_optimal(mdp, ITERATED)
+
+
+@pytest.mark.parametrize('k', [1, 5, 50])
+@pytest.mark.parametrize('index', [0, 1])
+def test_modified_policy_iteration(numpy, k, index):
+    mdp = models()[index]
+    mdp.modified_policy_iteration(k=k, iterations=100_000, threshold=1e-10)
+    assert_optimal(mdp, 1e-7)
+
+
+def test_one_step_modified_policy_iteration_is_value_iteration(numpy):
+    a, b = ladder_mdp(25), ladder_mdp(25)
+    a.modified_policy_iteration(k=1, iterations=12, threshold=0)
+    b.value_iteration(iterations=12, threshold=0)
+    assert list(a.value_vector) == pytest.approx(list(b.value_vector))
+
+
+@pytest.mark.parametrize('method', ['policy_iteration', 'modified_policy_iteration'])
+def test_story_solvers_fill_the_values_dict(numpy, method):
+    mdp = MayaMDP()
+    values = getattr(mdp, method)()
+    expected = reference_value_iteration(list(MayaState), story_successors(mdp), mdp.gamma)
+    assert values is mdp.values
+    tolerance = (1e-7 if numpy else ITERATED) if method == 'policy_iteration' else 1e-3
+    for s in MayaState:
+        assert values[s] == pytest.approx(expected[s], rel=tolerance, abs=tolerance)
+    assert mdp.solver_stats['solver'] == method
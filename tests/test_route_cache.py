@@ -0,0 +1,58 @@
+"""Versioned route cache: cached answers must equal fresh searches."""
+
+import gc
+import weakref
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType
+
+PAIRS = [('start', 'chen'), ('start', 'garcia'), ('johnson', 'clinic'), ('school', 'chen')]
+
+
+def assert_matches_uncached(cached, community):
+    fresh = AStarSearch(community)
+    for start, goal in PAIRS:
+        assert cached.search(start, goal) == fresh.search(start, goal)
+
+
+def test_cache_hits_repeat_queries():
+    search = AStarSearch(CommunityMap(), cache_size=16)
+    first = search.search('start', 'chen')
+    assert search.search('start', 'chen') == first
+    assert search.search_stats['cache_hit']
+    assert search.route_cache.stats()['hits'] == 1
+
+
+def test_cache_follows_edge_changes():
+    community = CommunityMap()
+    search = AStarSearch(community, cache_size=16)
+    assert_matches_uncached(search, community)
+    for change in (lambda: community.update_edge_cost('clinic', 'chen', 50),
+                   lambda: community.update_edge_cost('garcia', 'chen', 0.5),
+                   lambda: community.remove_edge('park', 'garcia'),
+                   lambda: community._add_edge('school', 'clinic', 1.0)):
+        change()
+        assert_matches_uncached(search, community)
+
+
+def test_cache_evicts_least_recently_used():
+    search = AStarSearch(CommunityMap(), cache_size=2)
+    for start, goal in PAIRS[:3]:
+        search.search(start, goal)
+    assert search.route_cache.stats()['size'] == 2
+    assert search.route_cache.stats()['evictions'] == 1
+    search.search(*PAIRS[0])
+    assert not search.search_stats.get('cache_hit')
+
+
+def test_close_unregisters_the_listener():
+    community = CommunityMap()
+    search = AStarSearch(community, cache_size=16)
+    search.search('start', 'chen', HeuristicType.EUCLIDEAN)
+    search.close()
+    assert community._edge_listeners == []
+    
+    ref = weakref.ref(search)
+    del search
+    gc.collect()
+    assert ref() is None
+    community.update_edge_cost('clinic', 'chen', 50)  # no dangling listener to call
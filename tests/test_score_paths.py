@@ -0,0 +1,67 @@
+"""Batch route scoring against a hop-by-hop sum, with and without NumPy."""
+
+import random
+
+import pytest
+
+import astar_search
+from astar_search import AStarSearch, CommunityMap
+from conftest import INF, numpy_switch, random_street_graph
+
+numpy = numpy_switch(astar_search)
+
+
+def reference_score(graph, path):
+    if path is None:
+        return INF, []
+    total, missing = 0.0, []
+    for a, b in zip(path, path[1:]):
+        cost = graph.edge_cost(a, b)
+        if cost is None:
+            missing.append((a, b))
+            cost = INF
+        total += cost
+    return total, missing
+
+
+def candidate_paths(graph, rng, count=200):
+    names = [graph.name(v) for v in range(graph.node_count)]
+    paths = [None, [], [names[0]], ['nowhere', names[1]]]
+    for _ in range(count):
+        node = rng.randrange(graph.node_count)
+        path = [graph.name(node)]
+        for _ in range(rng.randrange(1, 8)):
+            arcs = graph.arcs(node)
+            if arcs and rng.random() < 0.9:
+                node = graph.targets[rng.choice(arcs)]
+            else:
+                node = rng.randrange(graph.node_count)  # probably not an arc
+            path.append(graph.name(node))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_score_paths_matches_hop_sum(seed, numpy):
+    graph = random_street_graph(seed, oneway=0.4)
+    paths = candidate_paths(graph, random.Random(seed))
+    result = AStarSearch(graph).score_paths(paths, as_array=False)
+    expected_missing = []
+    for p, path in enumerate(paths):
+        cost, missing = reference_score(graph, path)
+        assert result['costs'][p] == pytest.approx(cost)
+        expected_missing.extend((p, a, b) for a, b in missing)
+    assert sorted(result['missing']) == sorted(expected_missing)
+
+
+def test_path_cost_of_a_search_result():
+    search = AStarSearch(CommunityMap())
+    path = search.search('start', 'chen')
+    assert search.score_paths([path])['costs'][0] == pytest.approx(
+        search._calculate_path_cost(path))
+
+
+def test_path_cost_skips_missing_hops():
+    search = AStarSearch(CommunityMap())
+    assert search._calculate_path_cost(['start', 'market', 'chen', 'clinic']) == pytest.approx(3.5 + 2.0)
+    assert search.score_paths([['start', 'market', 'chen', 'clinic']])['missing'] == [(0, 'market', 'chen')]
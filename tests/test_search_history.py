@@ -0,0 +1,46 @@
+"""A* inner loop: optimal paths, bounded history and the expansion callback."""
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType
+from conftest import dijkstra, path_cost, random_street_graph
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_search_is_optimal_on_the_community_map(compact):
+    community = CommunityMap()
+    search = AStarSearch(community, compact=compact)
+    for start in community.locations:
+        for goal in community.locations:
+            path = search.search(start, goal, HeuristicType.EUCLIDEAN)
+            assert path[0] == start and path[-1] == goal
+            assert path_cost(community, path) == pytest.approx(dijkstra(community, start, goal))
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_history_limit_keeps_the_first_expansions(compact):
+    community = CommunityMap()
+    full = AStarSearch(community, compact=compact)
+    path = full.search('start', 'chen')
+    
+    bounded = AStarSearch(community, compact=compact, history_limit=2)
+    assert bounded.search('start', 'chen') == path
+    assert bounded.search_history == full.search_history[:2]
+    assert bounded.search_stats['history_truncated']
+    
+    silent = AStarSearch(community, compact=compact, history_limit=0)
+    assert silent.search('start', 'chen') == path
+    assert silent.search_history == []
+
+
+def test_on_expand_streams_every_expansion():
+    graph = random_street_graph(2, n=80, extra=120)
+    streamed = []
+    search = AStarSearch(graph, history_limit=0, on_expand=streamed.append)
+    reference = AStarSearch(graph)
+    for goal in range(1, 80, 9):
+        del streamed[:]
+        path = search.search(graph.name(0), graph.name(goal))
+        assert path == reference.search(graph.name(0), graph.name(goal))
+        assert streamed == reference.search_history
+        assert search.search_history == []
@@ -0,0 +1,163 @@
+"""Batch Monte Carlo statistics against exact enumeration of trajectories."""
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaMDP, MayaState, SparseMDP, ladder_mdp
+
+np = pytest.importorskip('numpy')
+
+N = 200_000
+
+
+def enumerate_paths(mdp, start, max_steps, stop):
+    """
+    Every trajectory of the extracted policy as (probability, return,
+    hit step or None, state after each step), with unassigned row mass
+    on the first transition as simulate_batch() does.
+    """
+    paths = []
+    
+    def walk(state, probability, total, discount, visited):
+        step = len(visited) - 1
+        action = mdp.action(state)
+        if state in stop or action is None or step == max_steps:
+            hit = step if state in stop else None
+            paths.append((probability, total, hit, visited + [state] * (max_steps - step)))
+            return
+        entries = [[to, p, r] for a, to, p, r in mdp.successors(state) if a == action]
+        entries[0][1] += max(1.0 - sum(p for _, p, _ in entries), 0.0)
+        for to, p, r in entries:
+            if p > 0:
+                walk(to, probability * p, total + discount * r, discount * mdp.gamma,
+                     visited + [to])
+    
+    walk(start, 1.0, 0.0, 1.0, [start])
+    return paths
+
+
+def exact_summary(mdp, start, max_steps, stop):
+    paths = enumerate_paths(mdp, start, max_steps, stop)
+    mean = sum(p * r for p, r, _, _ in paths)
+    hits = [0.0] * (max_steps + 1)
+    occupancy = np.zeros((max_steps + 1, len(mdp.states)))
+    for p, _, hit, visited in paths:
+        if hit is not None:
+            hits[hit] += p
+        for step, state in enumerate(visited):
+            occupancy[step, mdp.state_index[state]] += p
+    return {
+        'mean': mean,
+        'variance': sum(p * (r - mean) ** 2 for p, r, _, _ in paths),
+        'min': min(r for _, r, _, _ in paths),
+        'max': max(r for _, r, _, _ in paths),
+        'hits': hits,
+        'occupancy': occupancy
+    }
+
+
+def leaky_model():
+    """Rows that leave mass unassigned, a dead end and a stop state."""
+    table = {
+        'a': [('go', 'b', 0.5, 1.0), ('go', 'c', 0.3, 2.0), ('wait', 'a', 1.0, -10.0)],
+        'b': [('go', 'a', 0.6, -1.0), ('go', 'd', 0.4, 5.0)],
+        'c': [],
+        'd': [('stay', 'd', 1.0, 0.0)],
+    }
+    mdp = SparseMDP(lambda s: table[s], states=list(table), discount_factor=0.8)
+    mdp.value_iteration(iterations=1000, threshold=1e-9)
+    mdp.extract_policy()
+    return mdp
+
+
+def assert_matches_exact(summary, exact):
+    sigma = exact['variance'] ** 0.5 / N ** 0.5
+    assert summary['return']['mean'] == pytest.approx(exact['mean'], abs=5 * sigma + 1e-12)
+    assert summary['return']['variance'] == pytest.approx(exact['variance'], rel=0.03, abs=1e-9)
+    assert summary['return']['min'] >= exact['min'] - 1e-9
+    assert summary['return']['max'] <= exact['max'] + 1e-9
+    hits = np.array(summary['hitting_time']['histogram']) / N
+    assert hits == pytest.approx(exact['hits'], abs=0.006)
+    assert summary['reached'] == pytest.approx(sum(exact['hits']), abs=0.006)
+    assert summary['occupancy'] == pytest.approx(exact['occupancy'], abs=0.006)
+
+
+def test_leaky_rows_and_dead_ends():
+    mdp = leaky_model()
+    assert mdp.action('a') == 'go' and mdp.action('c') is None
+    summary = mdp.simulate_batch('a', N, max_steps=8, stop_states=['d'], seed=1)
+    assert_matches_exact(summary, exact_summary(mdp, 'a', 8, {'d'}))
+
+
+def test_ladder():
+    mdp = ladder_mdp(5)
+    mdp.value_iteration(iterations=1000, threshold=1e-9)
+    summary = mdp.simulate_batch(0, N, max_steps=9, stop_states=[4], seed=2)
+    exact = exact_summary(mdp, 0, 9, {4})
+    assert_matches_exact(summary, exact)
+    cumulative = np.cumsum(exact['hits'])
+    median = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+    assert summary['hitting_time']['median'] == median
+
+
+def test_story_batch_follows_the_policy_dict():
+    mdp = MayaMDP()
+    mdp.value_iteration(iterations=1000, threshold=1e-9)
+    mdp.extract_policy()
+    summary = mdp.simulate_batch(MayaState.STRUGGLING, N, max_steps=10, seed=3)
+    exact = exact_summary(mdp, MayaState.STRUGGLING, 10, {MayaState.INSPIRING})
+    assert summary['return']['mean'] == pytest.approx(
+        exact['mean'], abs=5 * (exact['variance'] / N) ** 0.5)
+    assert summary['reached'] == pytest.approx(sum(exact['hits']), abs=0.006)
+    for i, state in enumerate(mdp.states):
+        assert summary['occupancy'][state.value] == pytest.approx(exact['occupancy'][:, i],
+                                                                   abs=0.006)
+
+
+def test_starting_on_a_stop_state():
+    summary = ladder_mdp(5).simulate_batch(4, 100, stop_states=[4], seed=0)
+    assert summary['reached'] == 1.0
+    assert summary['hitting_time']['histogram'][0] == 100
+    assert summary['return']['max'] == 0.0
+
+
+def test_results_depend_only_on_seed_and_count(monkeypatch):
+    monkeypatch.setattr(SparseMDP, 'SIMULATION_CHUNK', 3000)
+    mdp = leaky_model()
+    one = mdp.simulate_batch('a', 10_000, stop_states=['d'], seed=42)
+    again = mdp.simulate_batch('a', 10_000, stop_states=['d'], seed=one['seed'])
+    pooled = mdp.simulate_batch('a', 10_000, stop_states=['d'], seed=42, processes=2)
+    for other in (again, pooled):
+        assert other['return'] == pytest.approx(one['return'], rel=1e-12)
+        assert other['hitting_time'] == one['hitting_time']
+        assert (other['occupancy'] == one['occupancy']).all()
+    other_seed = mdp.simulate_batch('a', 10_000, stop_states=['d'], seed=43)
+    assert other_seed['return']['mean'] != one['return']['mean']
+
+
+def test_bad_arguments(monkeypatch):
+    with pytest.raises(ValueError):
+        ladder_mdp(3).simulate_batch(0, 0)
+    monkeypatch.setattr(mdp_maya, 'np', None)
+    with pytest.raises(ImportError):
+        ladder_mdp(3).simulate_batch(0, 10)
+
+
+class AlmostOne:
+    """Generator stand-in whose draws all sit just below 1."""
+    
+    def random(self, size):
+        return np.full(size, 1.0 - 2.0 ** -40)
+
+
+def test_draws_near_one_stay_in_their_row(monkeypatch):
+    # With ~10^5 rows, row + u rounds up to row + 1 for u this close to 1
+    rungs, start = 50_000, 49_990
+    mdp = ladder_mdp(rungs)
+    mdp.extract_policy()
+    monkeypatch.setattr(np.random, 'default_rng', lambda seed: AlmostOne())
+    summary = mdp.simulate_batch(start, 10, max_steps=5, seed=0)
+    # u near 1 picks the last entry of VOLUNTEER: slip back one rung for -1
+    assert [np.flatnonzero(row).tolist() for row in summary['occupancy']] == [
+        [start - step] for step in range(6)]
+    assert summary['return']['mean'] == pytest.approx(-sum(0.9 ** t for t in range(5)))
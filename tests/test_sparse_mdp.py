@@ -0,0 +1,74 @@
+"""SparseMDP on generated models against dict-based value iteration."""
+
+from math import comb
+
+import pytest
+
+import mdp_maya
+from mdp_maya import MayaAction, SparseMDP, ladder_mdp, volunteer_pipeline
+from conftest import numpy_switch, reference_q, reference_value_iteration
+
+TIGHT = 1e-10
+
+numpy = numpy_switch(mdp_maya)
+
+
+def assert_solved(mdp):
+    """Values and extracted policy agree with the reference on every state."""
+    expected = reference_value_iteration(mdp.states, mdp.successors, mdp.gamma)
+    for s in mdp.states:
+        assert mdp.value(s) == pytest.approx(expected[s], rel=1e-8, abs=1e-8)
+    q = reference_q(mdp.states, mdp.successors, mdp.gamma, expected)
+    mdp.extract_policy()
+    for s in mdp.states:
+        action = mdp.action(s)
+        if q[s]:
+            assert q[s][action] == pytest.approx(max(q[s].values()), rel=1e-9, abs=1e-6)
+        else:
+            assert action is None
+
+
+@pytest.mark.parametrize('rungs', [1, 2, 30])
+def test_ladder(numpy, rungs):
+    mdp = ladder_mdp(rungs)
+    mdp.value_iteration(iterations=100_000, threshold=TIGHT)
+    assert_solved(mdp)
+    if rungs > 1:
+        assert mdp.action(0) == MayaAction.VOLUNTEER
+
+
+@pytest.mark.parametrize('cohort', [1, 3])
+def test_volunteer_pipeline(numpy, cohort):
+    mdp = volunteer_pipeline(cohort, discount_factor=0.9).build()
+    assert len(mdp.states) == comb(cohort + 5, 5)
+    assert len(set(mdp.states)) == len(mdp.states)
+    assert mdp.nonzeros == sum(len(list(mdp.successors(s))) for s in mdp.states)
+    mdp.value_iteration(iterations=100_000, threshold=TIGHT)
+    assert_solved(mdp)
+
+
+@pytest.mark.skipif(mdp_maya.np is None, reason="NumPy is not installed")
+def test_dense_form_matches_the_successors():
+    np = mdp_maya.np
+    mdp = volunteer_pipeline(2).build()
+    dense = mdp.to_dense()
+    values = {s: float(i % 7) for i, s in enumerate(mdp.states)}
+    q = dense.q_values(np.array([values[s] for s in mdp.states]), mdp.gamma)
+    expected = reference_q(mdp.states, mdp.successors, mdp.gamma, values)
+    for i, s in enumerate(mdp.states):
+        for j, a in enumerate(mdp.actions):
+            if a in expected[s]:
+                assert q[i, j] == pytest.approx(expected[s][a])
+            else:
+                assert q[i, j] == -np.inf
+
+
+def test_listed_states_reject_unknown_successors():
+    mdp = SparseMDP(lambda s: [('go', s + 1, 1.0, 0.0)], states=[0, 1])
+    with pytest.raises(ValueError, match='unknown state'):
+        mdp.build()
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError, match='Unknown solver'):
+        ladder_mdp(3).solve('simulated_annealing')
@@ -0,0 +1,75 @@
+"""Grid spatial index and compassion factors against brute-force scans."""
+
+import random
+
+import pytest
+
+from astar_search import CommunityMap, GridIndex, Location
+
+
+def brute_force_factor(community, loc, days_since_visit):
+    """The original compassion factor: scan every resident on the map."""
+    factor = 1.0
+    for other in community.locations.values():
+        if not other.has_resident or other.id not in days_since_visit:
+            continue
+        if ((other.x - loc.x) ** 2 + (other.y - loc.y) ** 2) ** 0.5 < community.COMPASSION_RADIUS:
+            factor -= 0.1 * min(days_since_visit[other.id], 7) / 7
+    return max(factor, 0.5)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_within_matches_brute_force(seed):
+    rng = random.Random(seed)
+    points = [(i, rng.uniform(-30, 30), rng.uniform(-30, 30)) for i in range(300)]
+    index = GridIndex(points, cell_size=rng.choice([1.0, 3.0, 7.5]))
+    for _ in range(50):
+        x, y, radius = rng.uniform(-35, 35), rng.uniform(-35, 35), rng.uniform(0.5, 12)
+        expected = {key for key, px, py in points if (px - x) ** 2 + (py - y) ** 2 < radius ** 2}
+        assert set(index.within(x, y, radius)) == expected
+
+
+DAYS = [{}, {'garcia': 7}, {'garcia': 3, 'chen': 10, 'johnson': 1}]
+
+
+@pytest.mark.parametrize('days', DAYS)
+def test_compassion_heuristic_matches_brute_force(days):
+    community = CommunityMap()
+    goal = community.locations['chen']
+    for loc in community.locations.values():
+        expected = community.euclidean_distance(loc, goal) * brute_force_factor(community, loc, days)
+        assert community.compassion_heuristic(loc, goal, days) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('days', DAYS)
+def test_compassion_factors_match_brute_force(days):
+    community = CommunityMap()
+    factors = community.compassion_factors(days)
+    compact = community.to_compact()
+    compact_factors = compact.compassion_factors(days)
+    for loc in community.locations.values():
+        expected = brute_force_factor(community, loc, days)
+        assert factors.get(loc.id, 1.0) == pytest.approx(expected)
+        assert compact_factors.get(compact.index_of(loc.id), 1.0) == pytest.approx(expected)
+
+
+def test_location_changes_reach_the_heuristic():
+    community = CommunityMap()
+    goal = community.locations['chen']
+    days = {'garcia': 7, 'chen': 4, 'mrs_lee': 6}
+    for loc in community.locations.values():
+        community.compassion_heuristic(loc, goal, days)  # build the indexes
+    
+    community.add_location(Location('mrs_lee', "Mrs. Lee's Home", '李太太家', 4, 4,
+                                    True, True, 'Mrs. Lee'))
+    community.update_location('garcia', x=1, y=1)
+    community.update_location('chen', has_resident=False)
+    community.update_location('park', has_resident=True)
+    days['park'] = 5
+    for loc in community.locations.values():
+        expected = community.euclidean_distance(loc, goal) * brute_force_factor(community, loc, days)
+        assert community.compassion_heuristic(loc, goal, days) == pytest.approx(expected)
+        assert community.compassion_factors(days).get(loc.id, 1.0) == pytest.approx(
+            brute_force_factor(community, loc, days))
+    with pytest.raises(AttributeError):
+        community.update_location('park', colour='red')
@@ -0,0 +1,74 @@
+"""Time-dependent routing against a time-dependent Dijkstra and a full scan."""
+
+import heapq
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, HeuristicType
+from conftest import INF, random_street_graph
+
+RUSH_HOUR = ([0, 420, 600, 960, 1140], [1.0, 2.5, 1.0, 3.0, 0.8])
+
+
+def earliest_arrival(community, start_id, goal_id, depart):
+    """Reference: Dijkstra on arrival times, no heuristic."""
+    arrivals = {start_id: depart}
+    heap = [(depart, start_id)]
+    while heap:
+        t, u = heapq.heappop(heap)
+        if u == goal_id:
+            return t
+        if t > arrivals[u]:
+            continue
+        for v, _ in community.get_neighbors(u):
+            arrive = t + community.travel_time(u, v, t)
+            if arrive < arrivals.get(v, INF):
+                arrivals[v] = arrive
+                heapq.heappush(heap, (arrive, v))
+    return INF
+
+
+def rush_hour_map():
+    community = CommunityMap()
+    community.set_time_profile('start', 'market', *RUSH_HOUR)
+    community.set_time_profile('park', 'clinic', *RUSH_HOUR)
+    community.set_time_profile('market', 'park', [0, 480, 540], [1.0, 4.0, 1.0])
+    community.set_time_profile('garcia', 'chen', [0, 1000], [0.5, 1.5], bidirectional=False)
+    return community
+
+
+@pytest.mark.parametrize('heuristic', [HeuristicType.EUCLIDEAN, HeuristicType.LANDMARK])
+def test_search_departing_matches_reference(heuristic):
+    community = rush_hour_map()
+    search = AStarSearch(community)
+    for depart in range(0, 2 * community.DAY_MINUTES, 37):
+        for goal in ('chen', 'garcia', 'johnson'):
+            path = search.search_departing('start', goal, depart, heuristic)
+            expected = earliest_arrival(community, 'start', goal, depart)
+            assert path[0] == 'start' and path[-1] == goal
+            assert search.search_stats['arrive'] == pytest.approx(expected)
+            t = depart
+            for a, b in zip(path, path[1:]):
+                t += community.travel_time(a, b, t)
+            assert t == pytest.approx(expected)
+
+
+def test_travel_time_is_fifo():
+    community = rush_hour_map()
+    for a, b in (('start', 'market'), ('market', 'park'), ('garcia', 'chen')):
+        arrivals = [t + community.travel_time(a, b, t) for t in range(0, 1500)]
+        assert all(x <= y + 1e-9 for x, y in zip(arrivals, arrivals[1:]))
+
+
+def test_best_departure_matches_full_scan():
+    community = rush_hour_map()
+    search = AStarSearch(community)
+    best = search.best_departure('start', 'chen', 360, 720)
+    durations = [earliest_arrival(community, 'start', 'chen', t) - t for t in range(360, 721)]
+    assert best['duration'] <= min(durations) + 1e-9
+    assert best['searches'] < len(durations)
+
+
+def test_compact_graph_is_rejected():
+    with pytest.raises(TypeError):
+        AStarSearch(random_street_graph(0)).search_departing('n0', 'n5', 480)
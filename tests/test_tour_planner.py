@@ -0,0 +1,62 @@
+"""Multi-stop tour planner against brute-force enumeration of orders."""
+
+from itertools import permutations
+
+import pytest
+
+from astar_search import AStarSearch, CommunityMap, TourPlanner
+from conftest import INF, dijkstra, path_cost, random_street_graph
+
+
+def brute_force_tour(graph, depot, stops, return_to_depot):
+    best = INF
+    for order in permutations(stops):
+        legs = [depot] + list(order) + ([depot] if return_to_depot else [])
+        best = min(best, sum(dijkstra(graph, a, b) for a, b in zip(legs, legs[1:])))
+    return best
+
+
+@pytest.mark.parametrize('return_to_depot', [True, False])
+@pytest.mark.parametrize('seed', range(3))
+def test_exact_tour_matches_brute_force(seed, return_to_depot):
+    graph = random_street_graph(seed, oneway=0.0)
+    depot, stops = graph.name(0), [graph.name(v) for v in range(5, 35, 6)]
+    plan = TourPlanner(AStarSearch(graph)).plan(depot, stops, return_to_depot=return_to_depot)
+    assert plan['method'] == 'exact'
+    assert sorted(plan['order']) == sorted(stops)
+    assert plan['cost'] == pytest.approx(brute_force_tour(graph, depot, stops, return_to_depot))
+    assert plan['path'][0] == depot
+    assert path_cost(graph, plan['path']) == pytest.approx(plan['cost'])
+
+
+def test_heuristic_tour_is_valid_and_close():
+    graph = random_street_graph(11, n=60, oneway=0.0)
+    depot, stops = graph.name(0), [graph.name(v) for v in range(1, 60, 4)]
+    planner = TourPlanner(AStarSearch(graph))
+    plan = planner.plan(depot, stops)
+    assert plan['method'] == 'heuristic'
+    assert sorted(plan['order']) == sorted(stops)
+    assert path_cost(graph, plan['path']) == pytest.approx(plan['cost'])
+    assert plan['path'][0] == plan['path'][-1] == depot
+    
+    # Never worse than visiting the stops in the given order
+    legs = [depot] + stops + [depot]
+    assert plan['cost'] <= sum(dijkstra(graph, a, b) for a, b in zip(legs, legs[1:])) + 1e-9
+
+
+def test_urgent_residents_come_first():
+    community = CommunityMap()
+    stops = ['johnson', 'garcia', 'chen']
+    plan = TourPlanner(AStarSearch(community)).plan(
+        'start', stops, days_since_visit={'chen': 9}, urgent_after_days=7)
+    assert plan['order'][0] == 'chen'
+    assert sorted(plan['order']) == sorted(stops)
+
+
+def test_unreachable_stops_are_reported():
+    community = CommunityMap()
+    community.remove_edge('garcia', 'chen')
+    community.remove_edge('clinic', 'chen')
+    plan = TourPlanner(AStarSearch(community)).plan('start', ['garcia', 'chen'])
+    assert plan['unreachable'] == ['chen']
+    assert plan['order'] == ['garcia']
@@ -0,0 +1,108 @@
+"""Variable elimination against brute-force enumeration of the joint."""
+
+import random
+from itertools import combinations, product
+
+import pytest
+
+from bayesian_network import DiscreteBayesNet, build_care_network
+
+
+def brute_force(net, target, evidence):
+    """P(target | evidence) by summing the full joint distribution."""
+    names = list(net.domains)
+    totals = dict.fromkeys(net.domains[target], 0.0)
+    for assignment in product(*(net.domains[n] for n in names)):
+        values = dict(zip(names, assignment))
+        if any(values[v] != value for v, value in evidence.items()):
+            continue
+        p = 1.0
+        for name in names:
+            cpt = net.cpts[name]
+            index = 0
+            for variable, stride in zip(cpt.variables, cpt._strides):
+                index += stride * net.domains[variable].index(values[variable])
+            p *= cpt.values[index]
+        totals[values[target]] += p
+    total = sum(totals.values())
+    return {value: p / total for value, p in totals.items()}
+
+
+def random_distribution(rng, size):
+    weights = [rng.uniform(0.05, 1) for _ in range(size)]
+    return [w / sum(weights) for w in weights]
+
+
+def random_network(seed):
+    """A seven-variable DAG with shared parents and an undirected cycle."""
+    rng = random.Random(seed)
+    structure = [('a', 2, ()), ('b', 3, ()), ('c', 2, ('a',)), ('d', 3, ('a', 'b')),
+                 ('e', 2, ('c', 'd')), ('f', 2, ('d',)), ('g', 3, ('e', 'f', 'b'))]
+    net = DiscreteBayesNet()
+    for name, size, parents in structure:
+        domain = [f'{name}{i}' for i in range(size)]
+        cpt = {combo: random_distribution(rng, size)
+               for combo in product(*(net.domains[p] for p in parents))}
+        net.add_variable(name, domain, parents, cpt)
+    return net
+
+
+def assert_close(result, expected):
+    assert result.keys() == expected.keys()
+    for value, p in expected.items():
+        assert result[value] == pytest.approx(p, abs=1e-12)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_random_network_matches_enumeration(seed):
+    net = random_network(seed)
+    rng = random.Random(seed)
+    names = list(net.domains)
+    for target in names:
+        for size in range(4):
+            for observed in combinations([n for n in names if n != target], size):
+                if rng.random() > 0.3:
+                    continue
+                evidence = {v: rng.choice(net.domains[v]) for v in observed}
+                assert_close(net.query(target, evidence), brute_force(net, target, evidence))
+
+
+def test_care_network_matches_enumeration_for_every_evidence_subset():
+    net = build_care_network()
+    observed = [n for n in net.domains if n != 'needs_care']
+    for size in range(len(observed) + 1):
+        for subset in combinations(observed, size):
+            for values in product(*(net.domains[v] for v in subset)):
+                evidence = dict(zip(subset, values))
+                assert_close(net.query('needs_care', evidence),
+                             brute_force(net, 'needs_care', evidence))
+
+
+def test_cached_factors_follow_cpt_changes():
+    net = random_network(4)
+    evidence = {'g': 'g1', 'c': 'c0'}
+    net.query('a', evidence)
+    net.query('a', {'g': 'g2', 'c': 'c0'})
+    version = net.version
+    net.set_cpt('c', {('a0',): [0.9, 0.1], ('a1',): [0.2, 0.8]})
+    assert net.version == version + 1
+    assert_close(net.query('a', evidence), brute_force(net, 'a', evidence))
+
+
+def test_observed_target_and_bad_evidence():
+    net = random_network(5)
+    assert net.query('b', {'b': 'b2', 'g': 'g0'}) == {'b0': 0.0, 'b1': 0.0, 'b2': 1.0}
+    with pytest.raises(ValueError, match='Unknown variable'):
+        net.query('a', {'z': 'z0'})
+    with pytest.raises(ValueError, match='has no value'):
+        net.query('a', {'b': 'b9'})
+    with pytest.raises(ValueError, match='sum to 1'):
+        net.set_cpt('a', {(): [0.5, 0.6]})
+
+
+def test_impossible_evidence_is_rejected():
+    net = DiscreteBayesNet()
+    net.add_variable('x', ('on', 'off'), cpt={(): [1.0, 0.0]})
+    net.add_variable('y', ('on', 'off'), ('x',), {('on',): [1.0, 0.0], ('off',): [0.5, 0.5]})
+    with pytest.raises(ValueError, match='probability zero'):
+        net.query('x', {'y': 'off'})